@@ -4,6 +4,8 @@ import compas
 from compas.colors import Color
 from compas.datastructures import Mesh
 from compas_viewer import Viewer
+from knitcandela import ForceDensity
+from knitcandela import Session
 
 # ==============================================================================
 # Define the data files
@@ -11,7 +13,7 @@ from compas_viewer import Viewer
 
 here = pathlib.Path(__file__).parent
 cablemeshpath = here / "data" / "CableMesh.json"
-sessionpath = here / "data" / "session.json"
+sessionpath = here / "data" / "session"
 
 # ==============================================================================
 # Load the cablemesh
@@ -19,23 +21,50 @@ sessionpath = here / "data" / "session.json"
 
 cablemesh: Mesh = compas.json_load(cablemeshpath)
 
-# for vertex in cablemesh.vertices():
-#     cablemesh.unset_vertex_attribute(vertex, "constraint")
+# ==============================================================================
+# Open the work session
+# ==============================================================================
+
+# Every key of the session is stored in a separate file,
+# and later stages only load and write the keys they use.
+
+session = Session(sessionpath)
+
+# ==============================================================================
+# Form finding
+# ==============================================================================
+
+# The anchors, constraints and force densities are those of the cablemesh file.
+# The form found geometry of the previous session is the start geometry,
+# such that the constrained anchors only have to move a little.
+# The stiffness is factorized once, and the constraint iterations reuse the factorization.
+
+previous = session["cablemesh"] if "cablemesh" in session else None
+
+fd = ForceDensity.from_cablemesh(cablemesh, start=previous)
+result = fd.solve()
+fd.update_cablemesh(cablemesh, result)
+
+# Modified force densities of a few edges are a low-rank update of the factorization.
+# For example, to stiffen the boundary edges:
+
+# boundary = [index for index, edge in enumerate(cablemesh.edges()) if cablemesh.is_edge_on_boundary(edge)]
+# fd.set_forcedensities(boundary, fd.q[boundary] * 2)
+# result = fd.solve()
+# fd.update_cablemesh(cablemesh, result)
 
 # ==============================================================================
-# Define and export a work session
+# Export the work session
 # ==============================================================================
 
-session = {
-    "cablemesh": cablemesh,
-    "params": {
-        "thickness": 0.15,
-        "ribs": 0.05,
-        "shell": 0.05,
-    },
+session["cablemesh"] = cablemesh
+session["params"] = {
+    "thickness": 0.15,
+    "ribs": 0.05,
+    "shell": 0.05,
 }
 
-compas.json_dump(session, sessionpath)
+session.save()
 
 # ==============================================================================
 # Viz
@@ -1,22 +1,26 @@
 import pathlib
 
-import compas
 from compas.datastructures import Mesh
-from compas.itertools import pairwise
 from compas_viewer import Viewer
+from knitcandela import Session
+from knitcandela import StageCache
+from knitcandela import geometric_hash
+from knitcandela import shell_from_cablemesh
 
 # ==============================================================================
 # Define the data files
 # ==============================================================================
 
 here = pathlib.Path(__file__).parent
-sessionpath = here / "data" / "session.json"
+sessionpath = here / "data" / "session"
+legacypath = here / "data" / "session.json"
+cachepath = here / "data" / "cache"
 
 # ==============================================================================
 # Import the session
 # ==============================================================================
 
-session = compas.json_load(sessionpath)
+session = Session.open(sessionpath, legacy=legacypath)
 
 # ==============================================================================
 # Load the cablemesh from the work session
@@ -28,33 +32,21 @@ cablemesh: Mesh = session["cablemesh"]
 params = session["params"]
 
 # ==============================================================================
-# Create a thickened shell mesh
+# Stage cache
 # ==============================================================================
 
-edos: Mesh = cablemesh.copy()
-
-for vertex in edos.vertices():
-    point = cablemesh.vertex_point(vertex)
-    normal = cablemesh.vertex_normal(vertex)
-    edos.vertex_attributes(vertex, "xyz", point + normal * params["thickness"])
-
-max_vertex = cablemesh._max_vertex + 1
-shell: Mesh = cablemesh.copy()
-shell.flip_cycles()
-shell.join(edos, weld=False)
-
-for boundary in cablemesh.vertices_on_boundaries():
-    for u, v in pairwise(boundary):
-        shell.add_face([v, u, u + max_vertex, v + max_vertex])
+cache = StageCache(cachepath)
+key = geometric_hash(cablemesh, params)
 
 # ==============================================================================
-# Project supports to plane
+# Create a thickened shell mesh
 # ==============================================================================
 
-for vertex in shell.vertices():
-    point = shell.vertex_point(vertex)
-    if point.z < 0.1:
-        shell.vertex_attribute(vertex, "z", 0)
+# The offset, the side strips along the boundaries,
+# and the projection of the supports to the plane (z < 0.1)
+# are computed on vertex and face arrays.
+
+shell: Mesh = cache.cached("shell", key, lambda: shell_from_cablemesh(cablemesh, params["thickness"], support_height=0.1, mesh=True))
 
 # ==============================================================================
 # Add the shell to the session
@@ -66,7 +58,9 @@ session["shell"] = shell
 # Export
 # ==============================================================================
 
-compas.json_dump(session, sessionpath)
+session.save()
+
+print(cache.summary())
 
 # ==============================================================================
 # Viz
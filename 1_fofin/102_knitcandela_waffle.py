@@ -1,131 +1,130 @@
 import pathlib
 
-import compas
 from compas.colors import Color
 from compas.datastructures import Mesh
 from compas.geometry import Brep
-from compas.geometry import Point
-from compas.geometry import offset_polygon
-from compas.itertools import pairwise
 from compas.tolerance import Tolerance
 from compas_viewer import Viewer
 from compas_viewer.config import Config
+from knitcandela import CutterBuffer
+from knitcandela import Session
+from knitcandela import StageCache
+from knitcandela import arrays_to_mesh
+from knitcandela import cutter_buffer
+from knitcandela import geometric_hash
+from knitcandela import mesh_to_arrays
+from knitcandela import offset_vertices
+from knitcandela import waffle_boolean
+from knitcandela import waffle_boolean_serial
 
-# ==============================================================================
-# Define the data files
-# ==============================================================================
+# The batched boolean runs in a process pool,
+# and the worker processes re-import this script.
 
-here = pathlib.Path(__file__).parent
-sessionpath = here / "data" / "session.json"
+if __name__ == "__main__":
+    # ==============================================================================
+    # Define the data files
+    # ==============================================================================
 
-# ==============================================================================
-# Import the session
-# ==============================================================================
+    here = pathlib.Path(__file__).parent
+    sessionpath = here / "data" / "session"
+    legacypath = here / "data" / "session.json"
+    cachepath = here / "data" / "cache"
 
-session = compas.json_load(sessionpath)
+    # ==============================================================================
+    # Import the session
+    # ==============================================================================
 
-# ==============================================================================
-# Load the cablemesh from the work session
-# ==============================================================================
+    session = Session.open(sessionpath, legacy=legacypath)
 
-cablemesh: Mesh = session["cablemesh"]
-shell: Mesh = session["shell"]
+    # ==============================================================================
+    # Load the cablemesh from the work session
+    # ==============================================================================
 
-params = session["params"]
+    cablemesh: Mesh = session["cablemesh"]
+    shell: Mesh = session["shell"]
 
-cablemesh.scale(1e3)
-shell.scale(1e3)
+    params = session["params"]
 
-# ==============================================================================
-# Make an intrados
-# ==============================================================================
+    batched = True
 
-idos: Mesh = cablemesh.copy()
+    # ==============================================================================
+    # Stage cache
+    # ==============================================================================
 
-for vertex in idos.vertices():
-    point = cablemesh.vertex_point(vertex)
-    normal = cablemesh.vertex_normal(vertex)
-    idos.vertex_attributes(vertex, "xyz", point + normal * (-params["shell"] * 1e3))
+    # The key is computed before scaling,
+    # and is the same as in the previous stage.
 
-# =============================================================================
-# Blocks
-# =============================================================================
+    cache = StageCache(cachepath)
+    key = geometric_hash(cablemesh, params)
 
-boxes: list[Brep] = []
+    cablemesh.scale(1e3)
+    shell.scale(1e3)
 
-vertex_point = {vertex: idos.vertex_point(vertex) for vertex in idos.vertices()}
-vertex_normal = {vertex: idos.vertex_normal(vertex) for vertex in idos.vertices()}
+    # ==============================================================================
+    # Make an intrados
+    # ==============================================================================
 
-for face in idos.faces():
-    # vertices of the face
-    vertices = idos.face_vertices(face)
+    vertices, faces = mesh_to_arrays(cablemesh)
+    vertices = offset_vertices(vertices, faces, -params["shell"] * 1e3)
 
-    # coordinates and normals of the face vertices
-    points = [vertex_point[vertex] for vertex in vertices]
-    normals = [vertex_normal[vertex] for vertex in vertices]
+    idos: Mesh = arrays_to_mesh(vertices, faces)
 
-    # bottom face of the box as an inward offset of the face polygon
-    bottom = [Point(*point) for point in offset_polygon(points, distance=0.5 * params["ribs"] * 1e3)]
+    # =============================================================================
+    # Blocks
+    # =============================================================================
 
-    # additional offset to create tapering
-    inset = [Point(*point) for point in offset_polygon(points, distance=0.5 * params["ribs"] * 1e3)]
+    # All cutter prisms are generated in one pass,
+    # as a flat vertex and face buffer.
 
-    # top face of the box
-    top = [point + normal * params["thickness"] * 1e3 for point, normal in zip(inset, normals)]
+    boxes: CutterBuffer = cache.cached("cutters", key, lambda: cutter_buffer(vertices, faces, ribs=params["ribs"] * 1e3, thickness=params["thickness"] * 1e3))
 
-    # box sides
-    bottomloop = bottom + bottom[:1]
-    toploop = top + top[:1]
-    sides = []
-    for (a, b), (aa, bb) in zip(pairwise(bottomloop[::-1]), pairwise(toploop[::-1])):
-        sides.append([a, aa, bb, b])
+    # ==============================================================================
+    # Waffle
+    # ==============================================================================
 
-    # box mesh from polygons
-    polygons = [bottom[::-1], top] + sides
-    box = Mesh.from_polygons(polygons)
-    brep = Brep.from_mesh(box)
-    boxes.append(brep)
+    # In batched mode the shell is cut patch by patch in a process pool,
+    # with all cutters per patch combined into one compound tool.
+    # In serial mode all cutters are subtracted from the full shell at once.
 
-# ==============================================================================
-# Waffle
-# ==============================================================================
+    if batched:
+        waffle: Brep = cache.cached("waffle", key, lambda: waffle_boolean(shell, boxes, patches=(4, 4)))
+    else:
+        waffle: Brep = cache.cached("waffle", key, lambda: waffle_boolean_serial(shell, boxes))
 
-A: Brep = Brep.from_mesh(shell)
+    filepath = here / "data" / "waffle.stp"
+    waffle.to_step(filepath)
 
-waffle = A - boxes
+    print(cache.summary())
 
-filepath = here / "data" / "waffle.stp"
-waffle.to_step(filepath)
+    # ==============================================================================
+    # Add the intrados to the session
+    # ==============================================================================
 
-# ==============================================================================
-# Add the intrados to the session
-# ==============================================================================
+    # ==============================================================================
+    # Export
+    # ==============================================================================
 
-# ==============================================================================
-# Export
-# ==============================================================================
+    # session.save()
 
-# compas.json_dump(session, sessionpath)
+    # ==============================================================================
+    # Viz
+    # ==============================================================================
 
-# ==============================================================================
-# Viz
-# ==============================================================================
+    tolerance = Tolerance()
+    tolerance.lineardeflection = 1
 
-tolerance = Tolerance()
-tolerance.lineardeflection = 1
+    config = Config()
+    config.renderer.gridsize = (20000, 20, 20000, 20)
+    config.camera.pandelta = 100
+    config.camera.near = 1e0
+    config.camera.far = 1e5
+    config.camera.target = [0, 0, 2000]
+    config.camera.position = [3000, -7000, 3000]
 
-config = Config()
-config.renderer.gridsize = (20000, 20, 20000, 20)
-config.camera.pandelta = 100
-config.camera.near = 1e0
-config.camera.far = 1e5
-config.camera.target = [0, 0, 2000]
-config.camera.position = [3000, -7000, 3000]
+    viewer = Viewer(config=config)
 
-viewer = Viewer(config=config)
+    viewer.scene.add(session["shell"])
+    viewer.scene.add(idos, facecolor=Color.blue().lightened(50), linecolor=Color.blue())
+    viewer.scene.add(waffle)
 
-viewer.scene.add(session["shell"])
-viewer.scene.add(idos, facecolor=Color.blue().lightened(50), linecolor=Color.blue())
-viewer.scene.add(waffle)
-
-viewer.show()
+    viewer.show()
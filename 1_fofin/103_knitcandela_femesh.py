@@ -1,71 +1,130 @@
 import pathlib
+import sys
 
-import compas
+import numpy
 from compas_gmsh.models import MeshModel
 from compas_viewer import Viewer
 from compas_viewer.config import Config
+from compas_viewer.scene import BufferGeometry
+from knitcandela import FEMesh
+from knitcandela import Session
+from knitcandela import StageCache
+from knitcandela import femesh_from_gmsh
+from knitcandela import geometric_hash
+from knitcandela.meshing import femesh_parallel
+from knitcandela.meshing import femesh_serial
 
-# ==============================================================================
-# Define the data files
-# ==============================================================================
+# The volumetric mesh is generated in a process pool,
+# and the worker processes re-import this script.
 
-here = pathlib.Path(__file__).parent
-sessionpath = here / "data" / "session.json"
+if __name__ == "__main__":
+    # ==============================================================================
+    # Define the data files
+    # ==============================================================================
 
-# ==============================================================================
-# Import the session
-# ==============================================================================
+    here = pathlib.Path(__file__).parent
+    sessionpath = here / "data" / "session"
+    legacypath = here / "data" / "session.json"
+    cachepath = here / "data" / "cache"
 
-session = compas.json_load(sessionpath)
+    # ==============================================================================
+    # Import the session
+    # ==============================================================================
 
-# ==============================================================================
-# Mesh Model
-# ==============================================================================
+    session = Session.open(sessionpath, legacy=legacypath)
 
-# Create a model directly from the STEP file
-filepath = str(here / "data" / "waffle.stp")
-model = MeshModel.from_step(filepath)
+    # ==============================================================================
+    # Stage cache
+    # ==============================================================================
 
-# Set the maximum mesh size
-model.options.mesh.meshsize_max = 100
+    # The waffle is fully defined by the cablemesh and the params of the session.
+    # The mesh stages are additionally keyed on the meshing options.
+    # The maximum mesh size can be passed as the first argument of the script,
+    # for example `python 103_knitcandela_femesh.py 600` for the volume mesh of the analysis of 104.
 
-# ==============================================================================
-# Surface Mesh
-# ==============================================================================
+    meshsize_max = float(sys.argv[1]) if len(sys.argv) > 1 else 100.0
 
-# Generate and optimize a mesh
-model.generate_mesh(2)
-# model.optimize_mesh(niter=10)
+    cache = StageCache(cachepath)
+    key = geometric_hash(session["cablemesh"], session["params"], {"meshsize_max": meshsize_max})
 
-# Convert to a COMPAS mesh
-meshmodel = model.mesh_to_compas()
+    # ==============================================================================
+    # Mesh Model
+    # ==============================================================================
 
-# ==============================================================================
-# volumetric Mesh
-# ==============================================================================
+    def surface_mesh():
+        # Create a model directly from the STEP file
+        filepath = str(here / "data" / "waffle.stp")
+        model = MeshModel.from_step(filepath)
 
-# ==============================================================================
-# Export
-# ==============================================================================
+        # Set the maximum mesh size
+        model.options.mesh.meshsize_max = meshsize_max
 
-# compas.json_dump(session, sessionpath)
+        # Generate and optimize a mesh
+        model.generate_mesh(2)
+        # model.optimize_mesh(niter=10)
 
-# ==============================================================================
-# Viz
-# ==============================================================================
+        # Read nodes and elements directly into arrays
+        # model.mesh_to_compas() builds a half-edge mesh vertex by vertex
+        # which on fine meshes takes longer than the meshing itself
+        return femesh_from_gmsh(model)
 
-config = Config()
-config.renderer.show_gridz = False
-config.camera.target = [0, 0, 2000]
-config.camera.position = [3000, -7000, 3000]
-config.camera.near = 1e0
-config.camera.far = 1e5
-config.camera.pandelta = 100
-config.renderer.gridsize = (20000, 20, 20000, 20)
+    # ==============================================================================
+    # Surface Mesh
+    # ==============================================================================
 
-viewer = Viewer(config=config)
+    surfacemesh: FEMesh = cache.cached("surfacefemesh", key, surface_mesh)
 
-viewer.scene.add(meshmodel)
-# viewer.scene.add(tetmesh)
+    # ==============================================================================
+    # Volumetric Mesh
+    # ==============================================================================
 
-viewer.show()
+    # The volume is meshed subdomain by subdomain in a process pool.
+    # Set to False for the serial reference path.
+    # The mesh is stored once in the cache, as a binary file of contiguous arrays,
+    # and is memory mapped by the visualisation below and by the analysis of 104.
+
+    parallel = True
+
+    def volume_mesh():
+        filepath = here / "data" / "waffle.stp"
+        if parallel:
+            return femesh_parallel(filepath, meshsize_max=meshsize_max, patches=(4, 4))
+        return femesh_serial(filepath, meshsize_max=meshsize_max)
+
+    tetmesh: FEMesh = cache.cached("volumefemesh", key, volume_mesh)
+
+    print(cache.summary())
+
+    # ==============================================================================
+    # Export
+    # ==============================================================================
+
+    # session.save()
+
+    # ==============================================================================
+    # Viz
+    # ==============================================================================
+
+    config = Config()
+    config.renderer.show_gridz = False
+    config.camera.target = [0, 0, 2000]
+    config.camera.position = [3000, -7000, 3000]
+    config.camera.near = 1e0
+    config.camera.far = 1e5
+    config.camera.pandelta = 100
+    config.renderer.gridsize = (20000, 20, 20000, 20)
+
+    viewer = Viewer(config=config)
+
+    triangles = surfacemesh.triangle_coordinates().reshape(-1, 3)
+    facecolor = numpy.tile([0.8, 0.8, 0.8, 1.0], (len(triangles), 1))
+
+    viewer.scene.add(BufferGeometry(faces=triangles, facecolor=facecolor), name="Surface Mesh")
+
+    # the exterior faces of the tetrahedra are taken directly from the arrays
+    # converting the volume mesh to a COMPAS mesh is not needed for display
+
+    boundary = tetmesh.nodes[tetmesh.boundary()].reshape(-1, 3)
+    viewer.scene.add(BufferGeometry(faces=boundary, facecolor=numpy.tile([0.6, 0.6, 0.9, 1.0], (len(boundary), 1))), name="Volume Mesh")
+
+    viewer.show()
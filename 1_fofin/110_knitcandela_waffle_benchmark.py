@@ -0,0 +1,65 @@
+import os
+import pathlib
+import time
+
+import compas
+from compas.datastructures import Mesh
+from knitcandela import compare_waffles
+from knitcandela import cutter_buffer
+from knitcandela import mesh_to_arrays
+from knitcandela import offset_vertices
+from knitcandela import shell_from_cablemesh
+from knitcandela import waffle_boolean
+from knitcandela import waffle_boolean_serial
+
+# The batched boolean runs in a process pool,
+# and the worker processes re-import this script.
+
+if __name__ == "__main__":
+    # ==============================================================================
+    # Define the data files
+    # ==============================================================================
+
+    here = pathlib.Path(__file__).parent
+    cablemeshpath = here / "data" / "CableMesh.json"
+
+    params = {
+        "thickness": 0.15,
+        "ribs": 0.05,
+        "shell": 0.05,
+    }
+
+    # ==============================================================================
+    # Benchmark
+    # ==============================================================================
+
+    # The face count is increased by quad subdivision of the cablemesh.
+    # Per level, the serial boolean is the reference for the batched results.
+
+    cablemesh: Mesh = compas.json_load(cablemeshpath)
+    cablemesh.scale(1e3)
+
+    processes = [1, 2, 4, os.cpu_count()]
+
+    for k in range(3):
+        mesh: Mesh = cablemesh.subdivided("quad", k=k) if k else cablemesh.copy()
+
+        shell = shell_from_cablemesh(mesh, params["thickness"] * 1e3, support_height=100, mesh=True)
+
+        vertices, faces = mesh_to_arrays(mesh)
+        vertices = offset_vertices(vertices, faces, -params["shell"] * 1e3)
+        boxes = cutter_buffer(vertices, faces, ribs=params["ribs"] * 1e3, thickness=params["thickness"] * 1e3)
+
+        t0 = time.perf_counter()
+        reference = waffle_boolean_serial(shell, boxes)
+        serial = time.perf_counter() - t0
+
+        print(f"faces: {mesh.number_of_faces():>6}  serial: {serial:8.2f}s")
+
+        for n in processes:
+            t0 = time.perf_counter()
+            waffle = waffle_boolean(shell, boxes, patches=(4, 4), processes=n)
+            batched = time.perf_counter() - t0
+
+            check = "OK" if compare_waffles(waffle, reference) else "MISMATCH"
+            print(f"faces: {mesh.number_of_faces():>6}  processes: {n:>3}  batched: {batched:8.2f}s  speedup: {serial / batched:6.2f}  {check}")
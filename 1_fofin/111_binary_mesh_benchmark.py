@@ -0,0 +1,108 @@
+import json
+import pathlib
+import subprocess
+import sys
+import tempfile
+import time
+
+import compas
+from compas.datastructures import Mesh
+from knitcandela import dump_binary
+from knitcandela import load_binary
+from knitcandela import load_mesh_buffers
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def peak_rss() -> float:
+    """Peak resident set size of the current process, in MB."""
+    # on linux, ru_maxrss survives exec and reports the peak of the parent process
+    # the high water mark of the address space of the process itself is used instead
+    status = pathlib.Path("/proc/self/status")
+    if status.exists():
+        for line in status.read_text().splitlines():
+            if line.startswith("VmHWM:"):
+                return int(line.split()[1]) / 1024
+    if resource is None:
+        return float("nan")
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024**2 if sys.platform == "darwin" else rss / 1024
+
+
+def measure(mode: str, filepath: str) -> None:
+    """Load a file in one of the benchmark modes and report time and peak RSS increase as JSON."""
+    before = peak_rss()
+    t0 = time.perf_counter()
+    if mode == "json":
+        data = compas.json_load(filepath)
+    elif mode == "binary":
+        data = load_binary(filepath)
+    elif mode == "buffers":
+        data = load_mesh_buffers(filepath)
+        data = [buffer.xyz.sum() for buffer in data]
+    else:
+        raise ValueError(mode)
+    t1 = time.perf_counter()
+    print(json.dumps({"time": t1 - t0, "rss": peak_rss() - before}))
+
+
+def run(mode: str, filepath: pathlib.Path) -> dict:
+    # every measurement runs in a fresh process
+    # otherwise the peak RSS of one mode hides the peak of the next
+    output = subprocess.run([sys.executable, __file__, mode, str(filepath)], capture_output=True, text=True, check=True, cwd=here)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+here = pathlib.Path(__file__).parent
+
+if __name__ == "__main__" and len(sys.argv) == 3:
+    measure(sys.argv[1], sys.argv[2])
+
+elif __name__ == "__main__":
+    # ==============================================================================
+    # Data files
+    # ==============================================================================
+
+    tmp = pathlib.Path(tempfile.mkdtemp())
+
+    cablemesh: Mesh = compas.json_load(here / "data" / "CableMesh.json")
+
+    files = {
+        "CableMesh": here / "data" / "CableMesh.json",
+        "barrel": here.parent / "data" / "barrel.json",
+        "model_with_interactions": here.parent / "data" / "model_with_interactions.json",
+    }
+
+    # larger meshes are generated by subdivision of the cablemesh
+    for k in (3, 4, 5):
+        filepath = tmp / f"CableMesh_k{k}.json"
+        compas.json_dump(cablemesh.subdivided("quad", k=k), filepath)
+        files[f"CableMesh_k{k}"] = filepath
+
+    # ==============================================================================
+    # Benchmark
+    # ==============================================================================
+
+    print(f"{'file':<26}{'json MB':>9}{'bin MB':>9}{'json s':>9}{'bin s':>9}{'mmap s':>9}{'json RSS':>10}{'bin RSS':>10}{'mmap RSS':>10}")
+
+    for name, jsonpath in files.items():
+        binpath = tmp / f"{name}.bin"
+        try:
+            dump_binary(compas.json_load(jsonpath), binpath)
+        except Exception as e:
+            print(f"{name:<26}skipped: {e}")
+            continue
+
+        a = run("json", jsonpath)
+        b = run("binary", binpath)
+        c = run("buffers", binpath)
+
+        print(
+            f"{name:<26}"
+            f"{jsonpath.stat().st_size / 1024**2:>9.2f}{binpath.stat().st_size / 1024**2:>9.2f}"
+            f"{a['time']:>9.3f}{b['time']:>9.3f}{c['time']:>9.3f}"
+            f"{a['rss']:>10.1f}{b['rss']:>10.1f}{c['rss']:>10.1f}"
+        )
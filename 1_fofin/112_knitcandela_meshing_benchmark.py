@@ -0,0 +1,56 @@
+import os
+import pathlib
+import time
+
+from compas_gmsh.models import MeshModel
+from knitcandela.meshing import femesh_parallel
+from knitcandela.meshing import femesh_serial
+
+# The subdomains are meshed in a process pool,
+# and the worker processes re-import this script.
+
+if __name__ == "__main__":
+    # ==============================================================================
+    # Define the data files
+    # ==============================================================================
+
+    here = pathlib.Path(__file__).parent
+    filepath = here / "data" / "waffle.stp"
+
+    # ==============================================================================
+    # Benchmark
+    # ==============================================================================
+
+    # The serial path of 103 and of DeformablePart.from_step_file is the reference.
+    # The volume of the tetrahedra should match, up to the discretization error of curved faces.
+    # The mesh is conforming if the free faces of the tetrahedra are exactly the exterior triangles,
+    # that is, if no faces are left unmatched on the interfaces between the subdomains.
+
+    processes = [1, 2, 4, os.cpu_count()]
+
+    for meshsize_max in (600, 300, 150):
+        t0 = time.perf_counter()
+        model = MeshModel.from_step(str(filepath))
+        model.options.mesh.meshsize_max = meshsize_max
+        model.generate_mesh(3)
+        model.destroy()
+        gmsh = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        reference = femesh_serial(filepath, meshsize_max=meshsize_max)
+        serial = time.perf_counter() - t0
+        volume = reference.volumes().sum()
+
+        print(f"size: {meshsize_max:>5}  tets: {len(reference.tetrahedra):>8}  MeshModel.from_step: {gmsh:8.2f}s  serial: {serial:8.2f}s")
+
+        for n in processes:
+            t0 = time.perf_counter()
+            femesh = femesh_parallel(filepath, meshsize_max=meshsize_max, patches=(4, 4), processes=n)
+            parallel = time.perf_counter() - t0
+
+            error = abs(femesh.volumes().sum() - volume) / volume
+            conforming = "OK" if len(femesh.boundary()) == len(femesh.triangles) else "NONCONFORMING"
+            print(
+                f"size: {meshsize_max:>5}  tets: {len(femesh.tetrahedra):>8}  processes: {n:>3}  parallel: {parallel:8.2f}s  "
+                f"speedup: {serial / parallel:6.2f}  volume error: {error:.2e}  {conforming}"
+            )
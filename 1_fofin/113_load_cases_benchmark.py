@@ -0,0 +1,47 @@
+import time
+
+import numpy
+from knitcandela import LinearStatics
+from knitcandela import femesh_box
+
+# ==============================================================================
+# Benchmark
+# ==============================================================================
+
+# A structured slab of tetrahedra stands in for the volume mesh of the waffle,
+# such that the benchmark does not depend on gmsh.
+# The cost of the first load case includes assembly and factorization.
+# Every additional load case only adds a forward and backward substitution,
+# and combinations of solved load cases are superposed without any solve.
+# Refactorizing per load case is what re-running the analysis per case amounts to.
+
+rng = numpy.random.default_rng(0)
+
+for n in (20, 40, 60):
+    femesh = femesh_box((10000, 10000, 300), (n, n, 3))
+    nodes, tetrahedra = femesh.nodes, femesh.tetrahedra
+    supports = numpy.flatnonzero((nodes[:, 2] == 0) & ((nodes[:, 0] == 0) | (nodes[:, 0] == 10000)))
+
+    t0 = time.perf_counter()
+    statics = LinearStatics(nodes, tetrahedra, E=30e3, v=0.17, fixed=supports)
+    setup = time.perf_counter() - t0
+
+    print(f"nodes: {len(nodes):>7}  tets: {len(tetrahedra):>8}  assembly + factorization: {setup:8.3f}s")
+
+    for count in (1, 4, 16, 64):
+        cases = {f"LC{i}": rng.normal(size=nodes.shape) for i in range(count)}
+
+        t0 = time.perf_counter()
+        results = statics.solve_cases(cases)
+        solve = time.perf_counter() - t0
+
+        factors = {name: rng.uniform(0.5, 1.5) for name in results.names}
+        t0 = time.perf_counter()
+        for _ in range(100):
+            results.combination(factors)
+        combination = (time.perf_counter() - t0) / 100
+
+        print(
+            f"  cases: {count:>4}  solve: {solve:8.3f}s  per case: {solve / count * 1e3:8.2f}ms  "
+            f"refactorized per case: {(setup + solve / count) * count:8.2f}s  combination: {combination * 1e3:6.2f}ms"
+        )
@@ -0,0 +1,79 @@
+import time
+
+import numpy
+from compas.geometry import Plane
+from compas.geometry import Point
+from compas_fea2.model import ElasticIsotropic
+from compas_fea2.model import SolidSection
+from knitcandela import SpatialIndex
+from knitcandela import femesh_box
+from knitcandela.fea import node_index
+from knitcandela.fea import nodes_by_key
+from knitcandela.fea import part_from_femesh
+
+# ==============================================================================
+# Benchmark
+# ==============================================================================
+
+# A structured slab of tetrahedra stands in for the volume mesh of the waffle.
+# The linear scans of compas_fea2 are timed on parts of moderate size,
+# the index queries also on a point set of one million nodes.
+
+section = SolidSection(material=ElasticIsotropic(E=30e3, v=0.17, density=2.35e-9))
+plane = Plane.worldXY()
+rng = numpy.random.default_rng(0)
+
+for n in (20, 40):
+    part = part_from_femesh(femesh_box((10000, 10000, 300), (n, n, 3)), section)
+
+    t0 = time.perf_counter()
+    scan = part.find_nodes_on_plane(plane, tolerance=1)
+    for point in rng.uniform(0, 10000, (10, 3)):
+        part.find_closest_nodes_to_point(Point(*point), distance=1000)
+    scanned = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    index = node_index(part)
+    build = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    query = nodes_by_key(part, index.on_plane(plane.point, plane.normal, tolerance=1))
+    index.nearest(rng.uniform(0, 10000, (10, 3)), distance=1000)
+    queried = time.perf_counter() - t0
+
+    assert set(scan) == set(query)
+    print(f"nodes: {len(part.nodes):>8}  scan: {scanned * 1e3:10.2f}ms  index: {build * 1e3:8.2f}ms  query: {queried * 1e3:8.3f}ms")
+
+femesh = femesh_box((10000, 10000, 300), (400, 400, 5))
+points = femesh.nodes
+
+t0 = time.perf_counter()
+index = SpatialIndex(points)
+build = time.perf_counter() - t0
+
+timings = {}
+
+t0 = time.perf_counter()
+supports = index.on_plane([0, 0, 0], [0, 0, 1], tolerance=1)
+timings["plane"] = time.perf_counter() - t0
+
+t0 = time.perf_counter()
+loaded = index.in_box([-numpy.inf, -numpy.inf, -numpy.inf], [5000, numpy.inf, numpy.inf])
+timings["box"] = time.perf_counter() - t0
+
+t0 = time.perf_counter()
+spheres = index.in_spheres(rng.uniform(0, 10000, (100, 3)), 200)
+timings["100 spheres"] = time.perf_counter() - t0
+
+t0 = time.perf_counter()
+distances, probes = index.nearest(rng.uniform(0, 10000, (1000, 3)))
+timings["1000 nearest"] = time.perf_counter() - t0
+
+t0 = time.perf_counter()
+scan = numpy.flatnonzero(numpy.abs(points[:, 2]) <= 1)
+timings["vectorized scan"] = time.perf_counter() - t0
+
+assert numpy.array_equal(scan, supports)
+print(f"nodes: {len(points):>8}  index: {build * 1e3:8.2f}ms")
+for name, duration in timings.items():
+    print(f"  {name:<16} {duration * 1e3:8.3f}ms")
@@ -0,0 +1,52 @@
+import time
+import tracemalloc
+
+from compas_fea2.model import ElasticIsotropic
+from compas_fea2.model import Model
+from compas_fea2.model import SolidSection
+from compas_fea2.problem import Problem
+from knitcandela import femesh_box
+from knitcandela.fea import node_index
+from knitcandela.fea import nodes_by_key
+from knitcandela.fea import part_from_femesh
+from knitcandela.parts import ArrayPart
+
+# ==============================================================================
+# Benchmark
+# ==============================================================================
+
+# A structured slab of tetrahedra stands in for the volume mesh of the waffle.
+# The model set up of 104 is repeated with a part of node and element objects,
+# and with an array part that only creates objects for the supported and loaded nodes.
+# Memory is the peak of the Python allocations during the set up.
+
+section = SolidSection(material=ElasticIsotropic(E=30e3, v=0.17, density=2.35e-9))
+
+
+def setup(make_part, femesh):
+    model = Model()
+    part = make_part(femesh, section)
+    model.add_part(part)
+
+    index = node_index(part)
+    model.add_pin_bc(nodes=nodes_by_key(part, index.on_plane([0, 0, 0], [0, 0, 1], tolerance=1)))
+
+    problem = Problem(name="SLS")
+    model.add_problem(problem=problem)
+    step = problem.add_static_step(name="TEST")
+    step.add_node_pattern(nodes_by_key(part, index.in_box([0, 0, 299], [5000, 10000, 301])), load_case="DL", z=-1000)
+    return model, part
+
+
+for n in (10, 20, 40):
+    femesh = femesh_box((10000, 10000, 300), (n, n, 3))
+
+    for make_part in (part_from_femesh, ArrayPart.from_femesh):
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        model, part = setup(make_part, femesh)
+        duration = time.perf_counter() - t0
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        print(f"{type(part).__name__:<16} nodes: {len(part.nodes):>7}  tets: {len(part.elements):>8}  set up: {duration:8.2f}s  memory: {peak / 1024**2:8.1f} MB")
@@ -0,0 +1,82 @@
+import pathlib
+import tempfile
+import time
+import tracemalloc
+
+import numpy
+from knitcandela import OpenSeesWriter
+from knitcandela import femesh_box
+from knitcandela import load_recorder
+
+# ==============================================================================
+# Benchmark
+# ==============================================================================
+
+# The reference writer formats and writes one line per node and element,
+# and the reference parser splits lines into Python strings and floats.
+# Memory is the peak of the Python allocations, not counting the arrays of the model.
+
+
+def write_lines(filepath, xyz, tetrahedra):
+    with open(filepath, "w") as f:
+        for i, (x, y, z) in enumerate(xyz.tolist()):
+            f.write(f"node {i + 1} {x} {y} {z}\n")
+        for i, (a, b, c, d) in enumerate(tetrahedra.tolist()):
+            f.write(f"element FourNodeTetrahedron {i + 1} {a + 1} {b + 1} {c + 1} {d + 1} 1\n")
+
+
+def write_blocks(filepath, xyz, tetrahedra):
+    with OpenSeesWriter(filepath) as writer:
+        writer.nodes(xyz)
+        writer.tetrahedra(tetrahedra, material=1)
+
+
+def parse_lines(filepath, components):
+    with open(filepath, "r") as f:
+        lines = f.read().splitlines()
+    return numpy.array([float(value) for value in lines[-1].split()]).reshape(-1, components)
+
+
+def parse_blocks(filepath, components):
+    return load_recorder(filepath, components)
+
+
+def measure(func, *args):
+    # tracing allocations slows down Python code much more than NumPy code
+    # so time and memory are measured in separate runs
+    t0 = time.perf_counter()
+    result = func(*args)
+    duration = time.perf_counter() - t0
+    tracemalloc.start()
+    func(*args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, duration, peak
+
+
+with tempfile.TemporaryDirectory() as folder:
+    folder = pathlib.Path(folder)
+
+    for n in (50, 100, 200):
+        femesh = femesh_box((10000, 10000, 300), (n, n, 5))
+        xyz, tetrahedra = femesh.nodes, femesh.tetrahedra
+        lines = len(xyz) + len(tetrahedra)
+
+        for name, func in (("lines", write_lines), ("blocks", write_blocks)):
+            filepath = folder / f"{name}.tcl"
+            _, duration, peak = measure(func, filepath, xyz, tetrahedra)
+            size = filepath.stat().st_size / 1024**2
+            print(f"write  {name:<7} lines: {lines:>9}  {duration:7.2f}s  {lines / duration / 1e6:6.2f}M lines/s  {size / duration:7.1f} MB/s  memory: {peak / 1024**2:7.1f} MB")
+
+        # a displacement recorder, with a row of zeros and a row of results
+        displacements = numpy.random.default_rng(0).normal(size=xyz.shape)
+        filepath = folder / "U.out"
+        with open(filepath, "w") as f:
+            f.write(" ".join(["0"] * displacements.size) + "\n")
+            numpy.savetxt(f, displacements.reshape(1, -1), fmt="%.10g")
+
+        for name, func in (("lines", parse_lines), ("blocks", parse_blocks)):
+            values, duration, peak = measure(func, filepath, 3)
+            assert numpy.allclose(values, displacements, rtol=1e-9)
+            size = filepath.stat().st_size / 1024**2
+            print(f"parse  {name:<7} nodes: {len(xyz):>9}  {duration:7.2f}s  {size / duration:7.1f} MB/s  memory: {peak / 1024**2:7.1f} MB")
@@ -0,0 +1,74 @@
+import os
+import pathlib
+import tempfile
+import time
+
+import numpy
+from knitcandela import LinearStatics
+from knitcandela import ResultStore
+from knitcandela import femesh_box
+from knitcandela import run_variants
+from knitcandela import store_metrics
+
+# ==============================================================================
+# Task
+# ==============================================================================
+
+# A structured slab of tetrahedra stands in for the volume mesh of the waffle,
+# such that the benchmark does not depend on gmsh or on an analysis backend.
+# Every variant has its own mesh density, material and support layout,
+# and writes its fields into a result store in its own working directory.
+
+
+def analyse(params, folder):
+    femesh = femesh_box((10000, 10000, 300), (params["n"], params["n"], 3))
+    nodes, tetrahedra = femesh.nodes, femesh.tetrahedra
+    bottom = nodes[:, 2] == 0
+    if params["supports"] == "edges":
+        fixed = numpy.flatnonzero(bottom & ((nodes[:, 0] == 0) | (nodes[:, 0] == 10000)))
+    else:
+        fixed = numpy.flatnonzero(bottom & numpy.isin(nodes[:, 0], [0, 10000]) & numpy.isin(nodes[:, 1], [0, 10000]))
+
+    statics = LinearStatics(nodes, tetrahedra, E=params["E"], v=params["v"], fixed=fixed)
+    loads = numpy.zeros_like(nodes)
+    loads[nodes[:, 2] == 300, 2] = -1000
+    displacements, reactions = statics.solve(loads)
+    tensors = statics.stresses(displacements)
+
+    store = ResultStore(folder / "results")
+    keys = numpy.arange(len(nodes))
+    store.write("SLS", "U", "slab", keys, {f"U{i + 1}": displacements[:, i] for i in range(3)})
+    store.write("SLS", "RF", "slab", keys, {f"RF{i + 1}": reactions[:, i] for i in range(3)})
+    columns = {"S11": (0, 0), "S22": (1, 1), "S33": (2, 2), "S12": (0, 1), "S13": (0, 2), "S23": (1, 2)}
+    store.write("SLS", "S3D", "slab", numpy.arange(len(tetrahedra)), {column: tensors[:, i, j] for column, (i, j) in columns.items()})
+    return {"nodes": len(nodes), **store_metrics(store, "SLS")}
+
+
+# ==============================================================================
+# Benchmark
+# ==============================================================================
+
+# the workers import this script to find the task
+# the benchmark itself therefore only runs in the main process
+
+if __name__ == "__main__":
+    variants = {}
+    for n in (20, 30):
+        for E in (20e3, 30e3):
+            for supports in ("edges", "corners"):
+                variants[f"n{n}-E{E / 1e3:.0f}-{supports}"] = {"n": n, "E": E, "v": 0.17, "supports": supports}
+
+    with tempfile.TemporaryDirectory() as folder:
+        folder = pathlib.Path(folder)
+
+        timings = {}
+        for processes in sorted({1, os.cpu_count() or 1}):
+            t0 = time.perf_counter()
+            results = run_variants(analyse, variants, folder, processes=processes)
+            timings[processes] = time.perf_counter() - t0
+
+        assert not any(results.errors)
+        print(results.table(["nodes", "U", "RF3", "S_vm"]))
+        print()
+        for processes, duration in timings.items():
+            print(f"processes: {processes:>3}  variants: {len(variants):>3}  wall clock: {duration:8.2f}s  sum of tasks: {results.durations.sum():8.2f}s")
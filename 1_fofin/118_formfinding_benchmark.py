@@ -0,0 +1,76 @@
+import time
+
+import numpy
+from compas.datastructures import Mesh
+from compas.geometry import Line
+from compas_fd.constraints import Constraint
+from compas_fd.solvers import fd_constrained_numpy
+from compas_fd.solvers import fd_numpy
+from knitcandela import ForceDensity
+
+# ==============================================================================
+# Benchmark
+# ==============================================================================
+
+# A square grid of cables, anchored along its boundary, stands in for the cablemesh.
+# Every tenth boundary vertex slides on a vertical line.
+# compas_fd solves from scratch for every design iteration,
+# and runs a new sparse solve in every constraint iteration.
+# The solver of the package factorizes once,
+# and applies modified force densities of a few edges as a low-rank update.
+# compas_fd writes into the vertex array it receives, and therefore gets a copy.
+
+rng = numpy.random.default_rng(0)
+
+for n in (50, 100, 200):
+    grid = Mesh.from_meshgrid(dx=10, nx=n)
+    vertex_index = grid.vertex_index()
+    vertices = numpy.array(grid.vertices_attributes("xyz"))
+    edges = [(vertex_index[u], vertex_index[v]) for u, v in grid.edges()]
+    fixed = [vertex_index[vertex] for vertex in grid.vertices_on_boundary()]
+    q = rng.uniform(1, 2, len(edges))
+    loads = numpy.zeros_like(vertices)
+    loads[:, 2] = -0.1
+
+    lines = {index: Line(vertices[index] - [0, 0, 5], vertices[index] + [0, 0, 5]) for index in fixed[::10]}
+
+    t0 = time.perf_counter()
+    reference = fd_numpy(vertices=vertices.copy(), fixed=fixed, edges=edges, forcedensities=q, loads=loads)
+    unconstrained = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    constraints = [Constraint(lines[index]) if index in lines else None for index in range(len(vertices))]
+    fd_constrained_numpy(vertices=vertices.copy(), fixed=fixed, edges=edges, forcedensities=q, loads=loads, constraints=constraints)
+    constrained = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    fd = ForceDensity(vertices, edges, q, fixed, loads=loads)
+    result = fd.solve()
+    setup = time.perf_counter() - t0
+    assert numpy.allclose(result.vertices, reference.vertices)
+
+    # a design iteration modifies the force densities of ten edges
+    selection = rng.choice(len(edges), 10, replace=False)
+    t0 = time.perf_counter()
+    fd.set_forcedensities(selection, q[selection] * 2)
+    result = fd.solve()
+    update = time.perf_counter() - t0
+
+    q[selection] *= 2
+    assert numpy.allclose(result.vertices, fd_numpy(vertices=vertices.copy(), fixed=fixed, edges=edges, forcedensities=q, loads=loads).vertices)
+
+    t0 = time.perf_counter()
+    fd = ForceDensity(vertices, edges, q, fixed, loads=loads, constraints={index: Constraint(line) for index, line in lines.items()})
+    fd.solve()
+    cold = time.perf_counter() - t0
+
+    # the next design iteration starts from the previous equilibrium
+    t0 = time.perf_counter()
+    fd.set_forcedensities(selection, q[selection] / 2)
+    fd.solve()
+    warm = time.perf_counter() - t0
+
+    print(
+        f"edges: {len(edges):>7}  compas_fd: {unconstrained:7.3f}s  constrained: {constrained:7.3f}s  |  "
+        f"factorized: {setup:7.3f}s  update of 10 edges: {update * 1e3:7.2f}ms  constrained: {cold:7.3f}s  warm update: {warm:7.3f}s"
+    )
@@ -0,0 +1,130 @@
+import pathlib
+import tempfile
+
+import numpy
+from compas.datastructures import Mesh
+from knitcandela import LinearStatics
+from knitcandela import Session
+from knitcandela import SpatialIndex
+from knitcandela import Stage
+from knitcandela import StageCache
+from knitcandela import cutter_buffer
+from knitcandela import mesh_to_arrays
+from knitcandela import offset_vertices
+from knitcandela import parameter_grid
+from knitcandela import parameter_samples
+from knitcandela import run_sweep
+from knitcandela import selfweight_loads
+from knitcandela import shell_from_cablemesh
+from knitcandela import von_mises
+from knitcandela import waffle_boolean_serial
+from knitcandela.meshing import femesh_serial
+
+# ==============================================================================
+# Stages
+# ==============================================================================
+
+# Every stage declares the parameters it depends on.
+# Samples that only differ in downstream parameters share the upstream artifacts,
+# for example all samples with the same thickness share the shell.
+# The samples already run in parallel,
+# so the stages use the serial boolean and the serial mesher.
+# Lengths are in millimeters, forces in Newton.
+
+
+def shell_stage(inputs, params):
+    shell = shell_from_cablemesh(inputs["cablemesh"], params["thickness"] * 1e3, support_height=100, mesh=True)
+    return shell, {}
+
+
+def cutters_stage(inputs, params):
+    vertices, faces = mesh_to_arrays(inputs["cablemesh"])
+    vertices = offset_vertices(vertices, faces, -params["shell"] * 1e3)
+    return cutter_buffer(vertices, faces, ribs=params["ribs"] * 1e3, thickness=params["thickness"] * 1e3), {}
+
+
+def waffle_stage(inputs, params):
+    waffle = waffle_boolean_serial(inputs["shell"], inputs["cutters"])
+    return waffle, {"volume": waffle.volume * 1e-9}
+
+
+def femesh_stage(inputs, params):
+    with tempfile.TemporaryDirectory() as folder:
+        filepath = pathlib.Path(folder) / "waffle.stp"
+        inputs["waffle"].to_step(str(filepath))
+        femesh = femesh_serial(filepath, meshsize_max=params["meshsize_max"])
+    return femesh, {"nodes": len(femesh.nodes), "tetrahedra": len(femesh.tetrahedra)}
+
+
+def fea_stage(inputs, params):
+    femesh = inputs["femesh"]
+    nodes, tetrahedra = femesh.nodes, femesh.tetrahedra
+    supports = SpatialIndex(nodes).on_plane([0, 0, 0], [0, 0, 1], tolerance=1)
+    statics = LinearStatics(nodes, tetrahedra, E=params["E"], v=params["v"], fixed=supports)
+    displacements, reactions = statics.solve(selfweight_loads(nodes, tetrahedra, params["weight"]))
+    metrics = {
+        "U": numpy.linalg.norm(displacements, axis=1).max(),
+        "U3": -displacements[:, 2].min(),
+        "RF3": reactions[:, 2].sum(),
+        "S_vm": von_mises(statics.stresses(displacements)).max(),
+    }
+    return displacements, metrics
+
+
+STAGES = [
+    Stage("shell", shell_stage, inputs=("cablemesh",), params=("thickness",)),
+    Stage("cutters", cutters_stage, inputs=("cablemesh",), params=("shell", "ribs", "thickness")),
+    Stage("waffle", waffle_stage, inputs=("shell", "cutters")),
+    Stage("femesh", femesh_stage, inputs=("waffle",), params=("meshsize_max",)),
+    Stage("fea", fea_stage, inputs=("femesh",), params=("E", "v", "weight")),
+]
+
+# The samples run in a process pool,
+# and the worker processes re-import this script.
+
+if __name__ == "__main__":
+    # ==============================================================================
+    # Define the data files
+    # ==============================================================================
+
+    here = pathlib.Path(__file__).parent
+    sessionpath = here / "data" / "session"
+    legacypath = here / "data" / "session.json"
+    cachepath = here / "data" / "cache"
+
+    # ==============================================================================
+    # Import the session
+    # ==============================================================================
+
+    session = Session.open(sessionpath, legacy=legacypath)
+
+    cablemesh: Mesh = session["cablemesh"]
+    cablemesh.scale(1e3)
+
+    # ==============================================================================
+    # Samples
+    # ==============================================================================
+
+    # The parameters that are not swept are the same for all samples.
+
+    base = {"meshsize_max": 200, "E": 30e3, "v": 0.17, "weight": 2.35e-5}
+
+    sampling = "grid"
+
+    if sampling == "grid":
+        samples = parameter_grid({"thickness": [0.12, 0.15, 0.18], "ribs": [0.04, 0.05], "shell": [0.04, 0.05]}, base=base)
+    else:
+        samples = parameter_samples({"thickness": (0.12, 0.18), "ribs": (0.03, 0.06), "shell": (0.03, 0.06)}, n=16, base=base, seed=0)
+
+    # ==============================================================================
+    # Sweep
+    # ==============================================================================
+
+    cache = StageCache(cachepath)
+
+    results = run_sweep(STAGES, samples, cache, data={"cablemesh": cablemesh})
+
+    print(results.table(["thickness", "ribs", "shell", "volume", "U", "RF3", "S_vm"] + [f"time_{stage.name}" for stage in STAGES]))
+    print(cache.summary())
+
+    results.to_csv(here / "__temp" / "sweep.csv")
@@ -0,0 +1,96 @@
+import pathlib
+import time
+
+import numpy
+from knitcandela import LinearStatics
+from knitcandela import SpatialIndex
+from knitcandela import StiffnessCache
+from knitcandela import element_sizes
+from knitcandela import mark_elements
+from knitcandela import recovery_errors
+from knitcandela import selfweight_loads
+from knitcandela import von_mises
+from knitcandela.meshing import AdaptiveMesher
+from knitcandela.meshing import femesh_parallel
+
+E = 30e3
+v = 0.17
+weight = 2.35e-5
+
+
+def analyse(femesh, element_matrices=None):
+    nodes, tetrahedra = femesh.nodes, femesh.tetrahedra
+    supports = SpatialIndex(nodes).on_plane([0, 0, 0], [0, 0, 1], tolerance=1)
+    statics = LinearStatics(nodes, tetrahedra, E=E, v=v, fixed=supports, element_matrices=element_matrices)
+    displacements, _ = statics.solve(selfweight_loads(nodes, tetrahedra, weight))
+    return statics.stresses(displacements)
+
+
+# The subdomains are meshed in a process pool,
+# and the worker processes re-import this script.
+
+if __name__ == "__main__":
+    # ==============================================================================
+    # Define the data files
+    # ==============================================================================
+
+    here = pathlib.Path(__file__).parent
+    filepath = here / "data" / "waffle.stp"
+
+    # ==============================================================================
+    # Benchmark
+    # ==============================================================================
+
+    # The adaptive loop halves the size of the elements that account for half of the estimated error.
+    # Only the subdomains with such elements are meshed again,
+    # and the element matrices of all other subdomains are reused.
+    # Uniform refinement halves the size of all elements in every iteration.
+    # Lengths are in millimeters, forces in Newton.
+
+    meshsize_max = 600
+    iterations = 4
+
+    print("adaptive")
+
+    cache = StiffnessCache(E, v)
+    with AdaptiveMesher(filepath, meshsize_max=meshsize_max) as mesher:
+        femesh, subdomains = mesher.femesh()
+        for iteration in range(iterations):
+            t0 = time.perf_counter()
+            tensors = analyse(femesh, cache.element_matrices(femesh.nodes, femesh.tetrahedra, subdomains))
+            errors = recovery_errors(femesh.nodes, femesh.tetrahedra, tensors)
+            analysis = time.perf_counter() - t0
+
+            print(
+                f"  iteration: {iteration}  dofs: {3 * len(femesh.nodes):>8}  S_vm: {von_mises(tensors).max():8.3f}  "
+                f"error: {numpy.sqrt((errors**2).sum()):10.3f}  analysis: {analysis:7.2f}s  cached: {cache.hits:>3}  computed: {cache.misses:>3}"
+            )
+
+            if iteration == iterations - 1:
+                break
+
+            t0 = time.perf_counter()
+            sizes = element_sizes(femesh.nodes, femesh.tetrahedra)
+            marked = mark_elements(errors, fraction=0.5)
+            refined = mesher.refine(femesh, subdomains, numpy.where(marked, sizes / 2, sizes))
+            femesh, subdomains = mesher.femesh()
+            meshing = time.perf_counter() - t0
+
+            print(f"  remeshed subdomains: {len(refined):>3}  meshing: {meshing:7.2f}s")
+
+    print("uniform")
+
+    for iteration in range(iterations):
+        t0 = time.perf_counter()
+        femesh = femesh_parallel(filepath, meshsize_max=meshsize_max / 2**iteration)
+        meshing = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        tensors = analyse(femesh)
+        errors = recovery_errors(femesh.nodes, femesh.tetrahedra, tensors)
+        analysis = time.perf_counter() - t0
+
+        print(
+            f"  iteration: {iteration}  dofs: {3 * len(femesh.nodes):>8}  S_vm: {von_mises(tensors).max():8.3f}  "
+            f"error: {numpy.sqrt((errors**2).sum()):10.3f}  analysis: {analysis:7.2f}s  meshing: {meshing:7.2f}s"
+        )
@@ -1,19 +1,15 @@
 import pathlib
+import sys
 import time
 
-import compas
 import compas_fea2
 import numpy
 from compas.colors import Color
 from compas.colors import ColorMap
-from compas.datastructures import Mesh
 from compas.geometry import Brep
-from compas.geometry import Line
 from compas.geometry import Plane
 from compas.geometry import Sphere
 from compas.tolerance import Tolerance
-from compas.utilities import print_profile
-from compas_fea2.model import DeformablePart
 from compas_fea2.model import ElasticIsotropic
 from compas_fea2.model import Model
 from compas_fea2.model import PinnedBC
@@ -28,6 +24,20 @@ from compas_viewer.config import Config
 from compas_viewer.scene import BufferGeometry
 from compas_viewer.scene import Collection
 
+sys.path.append(str(pathlib.Path(__file__).parent.parent))
+
+from knitcandela import Session  # noqa: E402
+from knitcandela import StageCache  # noqa: E402
+from knitcandela import geometric_hash  # noqa: E402
+from knitcandela.fea import linear_statics  # noqa: E402
+from knitcandela.fea import load_cases  # noqa: E402
+from knitcandela.fea import node_coordinates  # noqa: E402
+from knitcandela.fea import node_index  # noqa: E402
+from knitcandela.fea import nodes_by_key  # noqa: E402
+from knitcandela.fea import store_results  # noqa: E402
+from knitcandela.meshing import femesh_serial  # noqa: E402
+from knitcandela.parts import ArrayPart  # noqa: E402
+
 compas_fea2.set_backend("compas_fea2_opensees")
 
 units = units(system="SI_mm")
@@ -39,71 +49,21 @@ tolerance.precision = 3
 tolerance.lineardeflection = 1
 
 
-@print_profile
-def stressvectors_from_result(stress, step):
-    tension = []
-    compression = []
-
-    for r in stress.results(step):
-        point = r.location.reference_point
-        for val, vec in r.principal_stresses:
-            v1 = vec * +500
-            v2 = vec * -500
-            l1 = Line.from_point_and_vector(point, v1)
-            l2 = Line.from_point_and_vector(point, v2)
-            if val > 0:
-                tension.append(l1)
-                tension.append(l2)
-            else:
-                compression.append(l1)
-                compression.append(l2)
-
-    return numpy.asarray(compression), numpy.asarray(tension)
-
-
-@print_profile
-def stressmesh_from_result(part, stress, step, cmap):
-    stressmesh: Mesh = part.discretized_boundary_mesh
-    gkey_vertex = stressmesh.gkey_vertex()
-
-    vertex_color = {}
-    node_stress = {}
-
-    for result in stress.results(step):
-        n = len(result.location.nodes)
-        for node in result.location.nodes:
-            if node not in node_stress:
-                node_stress[node] = 2.0
-            node_stress[node] += result.von_mises_stress / n
-
-    values = list(node_stress.values())
-    min_value = min(values)
-    max_value = max(values)
-
-    for node, value in node_stress.items():
-        color = cmap(value, minval=min_value, maxval=max_value)
-        if node.gkey in gkey_vertex:
-            vertex = gkey_vertex[node.gkey]
-            vertex_color[vertex] = color
-        else:
-            print(f"not found: {node.gkey}")
-
-    return stressmesh, vertex_color
-
-
 # ==============================================================================
 # Define the data files
 # ==============================================================================
 
 here = pathlib.Path(__file__).parent
-sessionpath = here / "data" / "session.json"
-breppath = str(here / "data" / "waffle.stp")
+sessionpath = here.parent / "data" / "session"
+legacypath = here.parent / "data" / "session.json"
+breppath = str(here.parent / "data" / "waffle.stp")
+cachepath = here.parent / "data" / "cache"
 
 # ==============================================================================
 # Import the session
 # ==============================================================================
 
-session = compas.json_load(sessionpath)
+session = Session.open(sessionpath, legacy=legacypath)
 
 # =============================================================================
 # Model
@@ -114,10 +74,29 @@ model = Model()
 material = ElasticIsotropic(E=30 * units("GPa"), v=0.17, density=2350 * units("kg/m**3"))
 section = SolidSection(material=material)
 
-part = DeformablePart.from_step_file(breppath, section=section, meshsize_max=600)
+# the volume mesh of 103 is loaded from the stage cache as memory mapped arrays
+# the key and the mesh size have to match those of 103, otherwise the STEP file is meshed here and cached for the next run
+# the analysis uses a coarser mesh than the default of 103, which is therefore run as `python 103_knitcandela_femesh.py 600`
+
+meshsize_max = 600.0
+
+cache = StageCache(cachepath)
+key = geometric_hash(session["cablemesh"], session["params"], {"meshsize_max": meshsize_max})
+tetmesh = cache.cached("volumefemesh", key, lambda: femesh_serial(breppath, meshsize_max=meshsize_max))
+
+# the part stores nodes and tetrahedra in arrays
+# node and element objects are only created for the nodes of supports and loads
+
+part = ArrayPart.from_femesh(tetmesh, section)
 model.add_part(part)
 
-nodes = model.find_nodes_on_plane(plane=Plane.worldXY(), tolerance=1)
+# the node index is built once per part
+# and every selection below is a query instead of a scan over all nodes
+
+index = node_index(part)
+
+plane = Plane.worldXY()
+nodes = nodes_by_key(part, index.on_plane(plane.point, plane.normal, tolerance=1))
 model.add_pin_bc(nodes=nodes)
 
 model.summary()
@@ -133,10 +112,33 @@ model.add_problem(problem=problem)
 step = problem.add_static_step(name="TEST")
 step.combination = LoadCombination.SLS()
 
-step.add_node_pattern(part.nodes, z=-1000 * units.N)
+# the dead load is applied to views of all nodes, by key,
+# since iterating over the nodes of an array part would create a node object for every node
+
+step.add_node_pattern(part.node_views(), load_case="DL", z=-1000 * units.N)
+step.add_node_pattern(nodes_by_key(part, index.in_box([-numpy.inf] * 3, [0, numpy.inf, numpy.inf])), load_case="LL", z=-500 * units.N)
 
 step.add_outputs([DisplacementFieldOutput(), ReactionFieldOutput()])
 
+# =============================================================================
+# Load cases
+# =============================================================================
+
+# the stiffness is factorized once
+# every load case is a right-hand side of the same system
+# and combinations are superposed without solving again
+
+statics = linear_statics(model, part)
+cases = statics.solve_cases(load_cases(step, part))
+
+combinations = {
+    "SLS": LoadCombination.SLS().factors,
+    "ULS": LoadCombination.ULS().factors,
+}
+for name, factors in combinations.items():
+    displacements, _ = cases.combination(factors)
+    print(f"{name}: max displacement {numpy.linalg.norm(displacements, axis=1).max():.3f}")
+
 # # =============================================================================
 # # Analysis
 # # =============================================================================
@@ -149,14 +151,19 @@ model.analyse_and_extract(problems=[problem], path=tmp, VERBOSE=True)
 # problem.show_deformed(scale_results=1000, show_original=0.2, show_bcs=0.3, show_loads=10)
 problem.show_displacements(step, show_bcs=0.3, show_loads=10, show_contour=False, show_vectors=100)
 
-disp_sls = step.displacement_field
-reactions_sls = step.reaction_field
+# the fields are copied from the results database into a columnar store
+# and are memory mapped when they are accessed
+
+results = store_results(problem, here / "__temp" / "results", fields=["U", "RF"])
+
+disp_sls = results.field(step.name, "U")
+reactions_sls = results.field(step.name, "RF")
 
 # # ==============================================================================
 # # Export
 # # ==============================================================================
 
-# # compas.json_dump(session, sessionpath)
+# # session.save()
 
 # # =============================================================================
 # # Pre-process boundary conditions
@@ -183,20 +190,27 @@ for bc, nodes in model.bcs.items():
 # #     faces = [(0, 1, 2), (0, 1, 3), (1, 2, 3), (0, 2, 3)]
 # #     deformed.join(Mesh.from_vertices_and_faces(vertices, faces), weld=False)
 
-reactions = []
-for r in reactions_sls.results(step):
-    point = r.location.xyz
-    vector = r.vector
-    reactions.append(Line.from_point_and_vector(point, vector * -0.3))
+xyz = node_coordinates(part)
+points = xyz[reactions_sls.keys]
+vectors = reactions_sls.array(["RF1", "RF2", "RF3"])
+reactions = numpy.stack([points, points - 0.3 * vectors], axis=1)
 
 # # =============================================================================
 # # Pre-process stress fields
 # # =============================================================================
 
-# compression, tension = stressvectors_from_result(stress_sls, step)
+# principal = principal_stresses_from_result(problem, step, part)
+# compression, tension = stress_glyphs(principal, scale=500)
+
+# the contour map depends only on the part
+# recoloring for another step or field only repeats the lines below it
+
+# contours = contour_map(part)
 
 # cmap = ColorMap.from_palette("davos")
-# stressmesh, vertex_color = stressmesh_from_result(part, stress_sls, step, cmap)
+# keys, tensors = stress_arrays(problem, step, part)
+# stresses = contours.vertex_values(contours.nodal(von_mises(tensors), keys))
+# stressfaces, stresscolors = contours.buffers(colormap_array(cmap, stresses))
 
 # # ==============================================================================
 # # Viz prep
@@ -227,13 +241,13 @@ for r in reactions_sls.results(step):
 
 # # results = [
 # #     # (deformed, {"name": "Deformed Geometry", "show_faces": True, "facecolor": Color(0.8, 0.8, 0.8), "linecolor": Color(0.75, 0.75, 0.75)}),
-# #     (Collection(reactions), {"name": "Reactions", "linecolor": Color.green().darkened(50), "linewidth": 3}),
+# #     (BufferGeometry(lines=reactions, linecolor=line_colors(reactions, Color.green().darkened(50).rgba)), {"name": "Reactions", "linewidth": 3}),
 # #     # (stressmesh, {"name": "Von Mises Stress", "vertexcolor": vertex_color, "use_vertexcolors": True}),
 # # ]
 # # viewer.scene.add(results, name="Results")
-# # viewer.scene.add(stressmesh, name="Von Mises Stresses", vertexcolor=vertex_color, use_vertexcolors=True)
+# viewer.scene.add(BufferGeometry(faces=stressfaces, facecolor=stresscolors), name="Von Mises Stresses")
 
-# viewer.scene.add(BufferGeometry(lines=compression, linecolor=numpy.array([[0.0, 0.0, 1.0, 1.0, 0.0, 0.0, 1.0, 1.0] for i in range(len(compression))])))
-# viewer.scene.add(BufferGeometry(lines=tension, linecolor=numpy.array([[1.0, 0.0, 0.0, 1.0, 1.0, 0.0, 0.0, 1.0] for i in range(len(tension))])))
+# viewer.scene.add(BufferGeometry(lines=compression, linecolor=line_colors(compression, (0.0, 0.0, 1.0, 1.0))))
+# viewer.scene.add(BufferGeometry(lines=tension, linecolor=line_colors(tension, (1.0, 0.0, 0.0, 1.0))))
 
 # viewer.show()
@@ -0,0 +1,145 @@
+from .arrays import mesh_to_arrays
+from .arrays import arrays_to_mesh
+from .arrays import pad_faces
+from .arrays import unpad_faces
+from .arrays import face_normals
+from .arrays import vertex_normals
+from .arrays import boundary_halfedges
+from .thickening import offset_vertices
+from .thickening import thicken
+from .thickening import shell_from_cablemesh
+from .cutters import CutterBuffer
+from .cutters import offset_faces
+from .cutters import cutter_buffer
+from .waffle import waffle_cutters
+from .waffle import patch_bounds
+from .waffle import waffle_boolean
+from .waffle import waffle_boolean_serial
+from .waffle import compare_waffles
+from .femesh import FEMesh
+from .femesh import femesh_from_gmsh
+from .femesh import femesh_box
+from .stresses import PrincipalStresses
+from .stresses import stress_tensors
+from .stresses import principal_stresses
+from .stresses import stress_glyphs
+from .stresses import line_colors
+from .contours import ContourMap
+from .contours import vertex_node_index
+from .contours import nodal_average
+from .contours import von_mises
+from .contours import colormap_array
+from .statics import LinearStatics
+from .statics import LoadCaseResults
+from .statics import elasticity_matrix
+from .statics import stiffness_matrix
+from .statics import element_stiffness
+from .statics import assemble_stiffness
+from .statics import selfweight_loads
+from .adaptivity import element_sizes
+from .adaptivity import recovery_errors
+from .adaptivity import mark_elements
+from .adaptivity import StiffnessCache
+from .formfinding import ForceDensity
+from .formfinding import connectivity_matrix
+from .spatial import SpatialIndex
+from .results import ResultStore
+from .results import FieldView
+from .results import FieldWriter
+from .opensees import OpenSeesWriter
+from .opensees import read_recorder
+from .opensees import load_recorder
+from .opensees import store_recorder
+from .variants import VariantResults
+from .variants import run_variants
+from .variants import store_metrics
+from .sweep import Stage
+from .sweep import SweepResults
+from .sweep import parameter_grid
+from .sweep import parameter_samples
+from .sweep import run_sweep
+from .cache import geometric_hash
+from .cache import StageCache
+from .storage import dump_artifact
+from .storage import load_artifact
+from .session import Session
+from .binary import MeshBuffer
+from .binary import dump_binary
+from .binary import load_binary
+from .binary import load_mesh_buffers
+from .binary import dump_femesh
+from .binary import load_femesh
+
+__all__ = [
+    "mesh_to_arrays",
+    "arrays_to_mesh",
+    "pad_faces",
+    "unpad_faces",
+    "face_normals",
+    "vertex_normals",
+    "boundary_halfedges",
+    "offset_vertices",
+    "thicken",
+    "shell_from_cablemesh",
+    "CutterBuffer",
+    "offset_faces",
+    "cutter_buffer",
+    "waffle_cutters",
+    "patch_bounds",
+    "waffle_boolean",
+    "waffle_boolean_serial",
+    "compare_waffles",
+    "FEMesh",
+    "femesh_from_gmsh",
+    "femesh_box",
+    "PrincipalStresses",
+    "stress_tensors",
+    "principal_stresses",
+    "stress_glyphs",
+    "line_colors",
+    "ContourMap",
+    "vertex_node_index",
+    "nodal_average",
+    "von_mises",
+    "colormap_array",
+    "LinearStatics",
+    "LoadCaseResults",
+    "elasticity_matrix",
+    "stiffness_matrix",
+    "element_stiffness",
+    "assemble_stiffness",
+    "selfweight_loads",
+    "element_sizes",
+    "recovery_errors",
+    "mark_elements",
+    "StiffnessCache",
+    "ForceDensity",
+    "connectivity_matrix",
+    "SpatialIndex",
+    "ResultStore",
+    "FieldView",
+    "FieldWriter",
+    "OpenSeesWriter",
+    "read_recorder",
+    "load_recorder",
+    "store_recorder",
+    "VariantResults",
+    "run_variants",
+    "store_metrics",
+    "Stage",
+    "SweepResults",
+    "parameter_grid",
+    "parameter_samples",
+    "run_sweep",
+    "geometric_hash",
+    "StageCache",
+    "dump_artifact",
+    "load_artifact",
+    "Session",
+    "MeshBuffer",
+    "dump_binary",
+    "load_binary",
+    "load_mesh_buffers",
+    "dump_femesh",
+    "load_femesh",
+]
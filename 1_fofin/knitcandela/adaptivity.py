@@ -0,0 +1,155 @@
+import numpy
+
+from .cache import geometric_hash
+from .statics import element_stiffness
+from .statics import tetrahedron_gradients
+
+
+def element_sizes(nodes: numpy.ndarray, tetrahedra: numpy.ndarray) -> numpy.ndarray:
+    """Compute the size of a set of tetrahedra, as the mean length of their edges.
+
+    Parameters
+    ----------
+    nodes : numpy.ndarray
+        The (N, 3) node coordinates.
+    tetrahedra : numpy.ndarray
+        The (T, 4) node indices of the tetrahedra.
+
+    Returns
+    -------
+    numpy.ndarray
+        The (T,) sizes.
+
+    """
+    corners = nodes[tetrahedra]
+    a, b = numpy.triu_indices(4, k=1)
+    return numpy.linalg.norm(corners[:, a] - corners[:, b], axis=2).mean(axis=1)
+
+
+def recovery_errors(nodes: numpy.ndarray, tetrahedra: numpy.ndarray, tensors: numpy.ndarray) -> numpy.ndarray:
+    """Estimate the discretization error of every tetrahedron from the jumps in the stress field.
+
+    The stresses of linear tetrahedra are constant per element.
+    A continuous stress field is recovered by averaging the element stresses at the nodes, weighted by volume.
+    The error indicator of an element is the difference between its own stress and the recovered stress at its corners,
+    integrated over its volume (Zienkiewicz-Zhu).
+
+    Parameters
+    ----------
+    nodes : numpy.ndarray
+        The (N, 3) node coordinates.
+    tetrahedra : numpy.ndarray
+        The (T, 4) node indices of the tetrahedra.
+    tensors : numpy.ndarray
+        The (T, 3, 3) stress tensors of the tetrahedra.
+
+    Returns
+    -------
+    numpy.ndarray
+        The (T,) error indicators, in units of stress times the square root of a volume.
+
+    """
+    _, volumes = tetrahedron_gradients(nodes, tetrahedra)
+    stresses = tensors.reshape(-1, 9)
+    weights = numpy.repeat(volumes, 4)
+    keys = tetrahedra.reshape(-1)
+    total = numpy.bincount(keys, weights=weights, minlength=len(nodes))
+    recovered = numpy.stack([numpy.bincount(keys, weights=weights * numpy.repeat(stresses[:, i], 4), minlength=len(nodes)) for i in range(9)], axis=1)
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        recovered /= total[:, None]
+    jumps = recovered[tetrahedra] - stresses[:, None, :]
+    return numpy.sqrt(volumes * numpy.einsum("tkc,tkc->t", jumps, jumps) / 4)
+
+
+def mark_elements(errors: numpy.ndarray, fraction: float = 0.5) -> numpy.ndarray:
+    """Select the smallest set of elements that accounts for a fraction of the total estimated error (Dörfler marking).
+
+    Parameters
+    ----------
+    errors : numpy.ndarray
+        The (T,) error indicators.
+    fraction : float, optional
+        The fraction of the sum of the squared errors that the selected elements account for.
+
+    Returns
+    -------
+    numpy.ndarray
+        The (T,) boolean mask of the selected elements.
+
+    """
+    squared = numpy.asarray(errors, dtype=float) ** 2
+    order = numpy.argsort(squared)[::-1]
+    cumulative = numpy.cumsum(squared[order])
+    count = int(numpy.searchsorted(cumulative, fraction * cumulative[-1])) + 1 if len(cumulative) else 0
+    marked = numpy.zeros(len(squared), dtype=bool)
+    marked[order[:count]] = True
+    return marked
+
+
+class StiffnessCache:
+    """Element stiffness matrices per subdomain of a mesh, reused as long as the tetrahedra of the subdomain do not change.
+
+    During adaptive refinement only the subdomains with flagged elements are meshed again.
+    The element matrices of all other subdomains are looked up by the hash of their geometry,
+    which does not depend on the numbering of the nodes in the merged mesh.
+
+    Parameters
+    ----------
+    E : float
+        The Young's modulus.
+    v : float
+        The Poisson ratio.
+
+    Attributes
+    ----------
+    hits : int
+        The number of subdomains of which the matrices were reused, over all calls.
+    misses : int
+        The number of subdomains of which the matrices were computed, over all calls.
+
+    """
+
+    def __init__(self, E: float, v: float) -> None:
+        self.E = E
+        self.v = v
+        self.hits = 0
+        self.misses = 0
+        self._blocks: dict[str, numpy.ndarray] = {}
+
+    def element_matrices(self, nodes: numpy.ndarray, tetrahedra: numpy.ndarray, subdomains: numpy.ndarray) -> numpy.ndarray:
+        """Get the element stiffness matrices of a mesh, computing only those of new or modified subdomains.
+
+        Parameters
+        ----------
+        nodes : numpy.ndarray
+            The (N, 3) node coordinates.
+        tetrahedra : numpy.ndarray
+            The (T, 4) node indices of the tetrahedra.
+        subdomains : numpy.ndarray
+            The (T,) subdomain of every tetrahedron.
+
+        Returns
+        -------
+        numpy.ndarray
+            The (T, 12, 12) element matrices, to be passed to :class:`knitcandela.LinearStatics`.
+
+        Notes
+        -----
+        Only the matrices of the subdomains of the last call are kept.
+
+        """
+        matrices = numpy.empty((len(tetrahedra), 12, 12))
+        blocks = {}
+        for subdomain in numpy.unique(subdomains).tolist():
+            mask = subdomains == subdomain
+            key = geometric_hash(nodes[tetrahedra[mask]], precision=9)
+            block = self._blocks.get(key)
+            if block is None:
+                block = element_stiffness(nodes, tetrahedra[mask], self.E, self.v)
+                self.misses += 1
+            else:
+                self.hits += 1
+            blocks[key] = block
+            matrices[mask] = block
+        self._blocks = blocks
+        return matrices
@@ -0,0 +1,256 @@
+import numpy
+from compas.datastructures import Mesh
+
+
+def mesh_to_arrays(mesh: Mesh, width: int = 0) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """Convert a mesh to a vertex array and a padded face array.
+
+    Parameters
+    ----------
+    mesh : :class:`compas.datastructures.Mesh`
+        The mesh.
+    width : int, optional
+        The minimum number of columns of the face array.
+
+    Returns
+    -------
+    tuple[numpy.ndarray, numpy.ndarray]
+        The vertex coordinates, as a (V, 3) float array,
+        and the face vertex indices, as a (F, K) int array,
+        with rows of faces with fewer than K vertices padded with ``-1``.
+
+    Notes
+    -----
+    Vertices are renumbered to consecutive indices in the order of ``mesh.vertices()``.
+
+    """
+    vertices, faces = mesh.to_vertices_and_faces()
+    return numpy.asarray(vertices, dtype=float).reshape(-1, 3), pad_faces(faces, width=width)
+
+
+def arrays_to_mesh(vertices: numpy.ndarray, faces: numpy.ndarray) -> Mesh:
+    """Construct a mesh from a vertex array and a padded face array.
+
+    Parameters
+    ----------
+    vertices : numpy.ndarray
+        The vertex coordinates.
+    faces : numpy.ndarray
+        The padded face vertex indices.
+
+    Returns
+    -------
+    :class:`compas.datastructures.Mesh`
+
+    """
+    return Mesh.from_vertices_and_faces(numpy.asarray(vertices).tolist(), unpad_faces(faces))
+
+
+def pad_faces(faces: list[list[int]], width: int = 0) -> numpy.ndarray:
+    """Pack a list of faces of varying length into a padded int array.
+
+    Parameters
+    ----------
+    faces : list[list[int]]
+        The face vertex indices.
+    width : int, optional
+        The minimum number of columns of the result.
+
+    Returns
+    -------
+    numpy.ndarray
+        A (F, K) int array with unused slots set to ``-1``.
+
+    """
+    if isinstance(faces, numpy.ndarray):
+        faces = faces.astype(numpy.int64, copy=False)
+        if faces.shape[1] >= width:
+            return faces
+        padded = numpy.full((faces.shape[0], width), -1, dtype=numpy.int64)
+        padded[:, : faces.shape[1]] = faces
+        return padded
+
+    k = max([width] + [len(face) for face in faces])
+    padded = numpy.full((len(faces), k), -1, dtype=numpy.int64)
+    for i, face in enumerate(faces):
+        padded[i, : len(face)] = face
+    return padded
+
+
+def unpad_faces(faces: numpy.ndarray) -> list[list[int]]:
+    """Convert a padded face array back to a list of faces.
+
+    Parameters
+    ----------
+    faces : numpy.ndarray
+        The padded face vertex indices.
+
+    Returns
+    -------
+    list[list[int]]
+
+    """
+    return [[int(index) for index in face if index >= 0] for face in numpy.asarray(faces)]
+
+
+def face_sizes(faces: numpy.ndarray) -> numpy.ndarray:
+    """Compute the number of vertices of every face of a padded face array.
+
+    Parameters
+    ----------
+    faces : numpy.ndarray
+        The padded face vertex indices.
+
+    Returns
+    -------
+    numpy.ndarray
+
+    """
+    return (faces >= 0).sum(axis=1)
+
+
+def face_next(faces: numpy.ndarray) -> numpy.ndarray:
+    """Compute, for every slot of a padded face array, the column of the next vertex in the face cycle.
+
+    Parameters
+    ----------
+    faces : numpy.ndarray
+        The padded face vertex indices.
+
+    Returns
+    -------
+    numpy.ndarray
+        A (F, K) int array of column indices.
+        The values in the padding slots are meaningless and should be masked.
+
+    """
+    columns = numpy.arange(faces.shape[1])
+    return (columns[None, :] + 1) % face_sizes(faces)[:, None]
+
+
+def flip_faces(faces: numpy.ndarray) -> numpy.ndarray:
+    """Reverse the cycle direction of every face of a padded face array.
+
+    Parameters
+    ----------
+    faces : numpy.ndarray
+        The padded face vertex indices.
+
+    Returns
+    -------
+    numpy.ndarray
+
+    """
+    mask = faces >= 0
+    columns = numpy.arange(faces.shape[1])
+    source = numpy.where(mask, face_sizes(faces)[:, None] - 1 - columns[None, :], columns[None, :])
+    return numpy.take_along_axis(faces, source, axis=1)
+
+
+def face_centroids(vertices: numpy.ndarray, faces: numpy.ndarray) -> numpy.ndarray:
+    """Compute the centroids of the faces of a padded face array.
+
+    Parameters
+    ----------
+    vertices : numpy.ndarray
+        The vertex coordinates.
+    faces : numpy.ndarray
+        The padded face vertex indices.
+
+    Returns
+    -------
+    numpy.ndarray
+        A (F, 3) float array.
+
+    """
+    mask = faces >= 0
+    points = vertices[numpy.where(mask, faces, 0)]
+    return (points * mask[..., None]).sum(axis=1) / mask.sum(axis=1)[:, None]
+
+
+def face_normals(vertices: numpy.ndarray, faces: numpy.ndarray, unitized: bool = True) -> numpy.ndarray:
+    """Compute the normals of the faces of a padded face array.
+
+    Parameters
+    ----------
+    vertices : numpy.ndarray
+        The vertex coordinates.
+    faces : numpy.ndarray
+        The padded face vertex indices.
+    unitized : bool, optional
+        If False, the length of the normals is the (vector) area of the faces.
+
+    Returns
+    -------
+    numpy.ndarray
+        A (F, 3) float array.
+
+    Notes
+    -----
+    This is the array equivalent of :func:`compas.geometry.normal_polygon`,
+    which sums the cross products of consecutive vertices relative to the face centroid.
+
+    """
+    mask = faces >= 0
+    points = vertices[numpy.where(mask, faces, 0)]
+    centroids = (points * mask[..., None]).sum(axis=1) / mask.sum(axis=1)[:, None]
+    a = points - centroids[:, None, :]
+    b = numpy.take_along_axis(a, face_next(faces)[..., None], axis=1)
+    normals = 0.5 * (numpy.cross(a, b) * mask[..., None]).sum(axis=1)
+    if unitized:
+        normals /= numpy.linalg.norm(normals, axis=1)[:, None]
+    return normals
+
+
+def vertex_normals(vertices: numpy.ndarray, faces: numpy.ndarray) -> numpy.ndarray:
+    """Compute the vertex normals as the normalized average of the normals of the connected faces.
+
+    Parameters
+    ----------
+    vertices : numpy.ndarray
+        The vertex coordinates.
+    faces : numpy.ndarray
+        The padded face vertex indices.
+
+    Returns
+    -------
+    numpy.ndarray
+        A (V, 3) float array.
+
+    Notes
+    -----
+    This is the array equivalent of :meth:`compas.datastructures.Mesh.vertex_normal`.
+
+    """
+    mask = faces >= 0
+    normals = face_normals(vertices, faces, unitized=False)
+    result = numpy.zeros((len(vertices), 3))
+    rows, columns = numpy.nonzero(mask)
+    numpy.add.at(result, faces[rows, columns], normals[rows])
+    length = numpy.linalg.norm(result, axis=1)
+    length[length == 0] = 1.0
+    return result / length[:, None]
+
+
+def boundary_halfedges(faces: numpy.ndarray) -> numpy.ndarray:
+    """Find the face edges that have no opposite face.
+
+    Parameters
+    ----------
+    faces : numpy.ndarray
+        The padded face vertex indices.
+
+    Returns
+    -------
+    numpy.ndarray
+        A (B, 2) int array of edges ``(u, v)``, oriented as in the face cycle to which they belong.
+        The corresponding boundary halfedge of the mesh is ``(v, u)``.
+
+    """
+    mask = faces >= 0
+    u = faces[mask]
+    v = numpy.take_along_axis(faces, face_next(faces), axis=1)[mask]
+    n = int(faces.max()) + 1
+    codes = u * n + v
+    boundary = ~numpy.isin(v * n + u, codes)
+    return numpy.stack([u[boundary], v[boundary]], axis=1)
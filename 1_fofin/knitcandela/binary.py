@@ -0,0 +1,469 @@
+import gc
+import json
+import pathlib
+import re
+import struct
+from typing import Any
+from typing import NamedTuple
+from typing import Union
+
+import compas
+import numpy
+from compas.data.encoders import DataDecoder
+
+from .femesh import FEMesh
+
+MAGIC = b"CMESHBIN"
+VERSION = 1
+ALIGNMENT = 64
+
+_EDGE = re.compile(r"^\((-?\d+), (-?\d+)\)$")
+
+# ==============================================================================
+# Array views
+# ==============================================================================
+
+
+class MeshBuffer(NamedTuple):
+    """Array view of one mesh of a binary file.
+
+    Attributes
+    ----------
+    vertex_keys : numpy.ndarray
+        The (V,) identifiers of the vertices.
+    xyz : numpy.ndarray
+        The (V, 3) vertex coordinates.
+    face_keys : numpy.ndarray
+        The (F,) identifiers of the faces.
+    face_offsets : numpy.ndarray
+        The (F + 1,) offsets of the vertices of every face in ``face_vertices``.
+    face_vertices : numpy.ndarray
+        The vertex identifiers of all faces, one face after the other.
+
+    """
+
+    vertex_keys: numpy.ndarray
+    xyz: numpy.ndarray
+    face_keys: numpy.ndarray
+    face_offsets: numpy.ndarray
+    face_vertices: numpy.ndarray
+
+    def faces(self) -> numpy.ndarray:
+        """Convert the face connectivity to a padded array of vertex indices.
+
+        Returns
+        -------
+        numpy.ndarray
+            A (F, K) int array of indices into ``xyz``, with unused slots set to ``-1``.
+
+        """
+        order = numpy.argsort(self.vertex_keys)
+        indices = order[numpy.searchsorted(self.vertex_keys, self.face_vertices, sorter=order)]
+        sizes = numpy.diff(self.face_offsets)
+        width = int(sizes.max()) if len(sizes) else 0
+        rows = numpy.repeat(numpy.arange(len(sizes)), sizes)
+        columns = numpy.arange(len(indices)) - numpy.repeat(self.face_offsets[:-1], sizes)
+        faces = numpy.full((len(sizes), width), -1, dtype=numpy.int64)
+        faces[rows, columns] = indices
+        return faces
+
+
+# ==============================================================================
+# Attribute columns
+# ==============================================================================
+
+
+def _column_dtype(values: list) -> Union[str, None]:
+    types = {type(value) for value in values}
+    if types == {float}:
+        return "<f8"
+    if types == {bool}:
+        return "|b1"
+    if types == {int} and all(-(2**63) <= value < 2**63 for value in values):
+        return "<i8"
+    return None
+
+
+def _encode_attributes(attrs: list[dict], arrays: dict, prefix: str) -> dict:
+    names: dict[str, None] = {}
+    for attr in attrs:
+        names.update(dict.fromkeys(attr))
+
+    columns = {}
+    rest = [dict(attr) for attr in attrs]
+    for name in names:
+        present = numpy.array([name in attr for attr in attrs], dtype=bool)
+        values = [attr[name] for attr in attrs if name in attr]
+        dtype = _column_dtype(values)
+        if dtype is None:
+            continue
+        column = numpy.zeros(len(attrs), dtype=dtype)
+        column[present] = values
+        arrays[f"{prefix}/{name}"] = column
+        columns[name] = dtype
+        if not present.all():
+            arrays[f"{prefix}/{name}/present"] = present
+        for attr in rest:
+            attr.pop(name, None)
+
+    return {"columns": columns, "rest": rest if any(rest) else None}
+
+
+def _decode_attributes(meta: dict, arrays: dict, prefix: str, n: int, extra: Union[dict[str, list], None] = None) -> list[dict]:
+    names = list(extra or {})
+    columns = list((extra or {}).values())
+    partial = []
+    for name in meta["columns"]:
+        present = arrays.get(f"{prefix}/{name}/present")
+        if present is None:
+            names.append(name)
+            columns.append(arrays[f"{prefix}/{name}"].tolist())
+        else:
+            partial.append((name, arrays[f"{prefix}/{name}"].tolist(), present.tolist()))
+
+    attrs = [dict(zip(names, row)) for row in zip(*columns)] if names else [{} for _ in range(n)]
+
+    for name, values, present in partial:
+        for attr, value, flag in zip(attrs, values, present):
+            if flag:
+                attr[name] = value
+
+    if meta["rest"]:
+        for attr, rest in zip(attrs, meta["rest"]):
+            if rest:
+                attr.update(rest)
+
+    return attrs
+
+
+# ==============================================================================
+# Meshes
+# ==============================================================================
+
+
+def _is_mesh(node: dict) -> bool:
+    data = node.get("data")
+    return isinstance(data, dict) and all(key in data for key in ("vertex", "face", "facedata", "edgedata", "default_vertex_attributes"))
+
+
+def _encode_mesh(node: dict, index: int, arrays: dict) -> dict:
+    data = node["data"]
+    prefix = f"mesh{index}"
+
+    vertex_keys = list(data["vertex"].keys())
+    face_keys = list(data["face"].keys())
+    faces = list(data["face"].values())
+
+    arrays[f"{prefix}/vertex_keys"] = numpy.array([int(key) for key in vertex_keys], dtype=numpy.int64)
+    arrays[f"{prefix}/face_keys"] = numpy.array([int(key) for key in face_keys], dtype=numpy.int64)
+    arrays[f"{prefix}/face_offsets"] = numpy.concatenate([[0], numpy.cumsum([len(face) for face in faces], dtype=numpy.int64)]).astype(numpy.int64)
+    arrays[f"{prefix}/face_vertices"] = numpy.array([vertex for face in faces for vertex in face], dtype=numpy.int64)
+
+    # coordinates are always stored as one contiguous (V, 3) array of floats
+    # they are only removed from the vertex attributes if they are all floats already,
+    # otherwise the attributes keep them with their own types, for an exact round trip
+    vertex_attrs = [dict(attr) for attr in data["vertex"].values()]
+    columns = [[attr.get(name) for attr in vertex_attrs] for name in "xyz"]
+    xyz = numpy.asarray(columns, dtype=float).reshape(3, -1).T
+    has_xyz = all(_column_dtype(values) == "<f8" for values in columns)
+    if has_xyz:
+        for attr in vertex_attrs:
+            del attr["x"], attr["y"], attr["z"]
+    arrays[f"{prefix}/xyz"] = numpy.ascontiguousarray(xyz)
+
+    facedata = [data["facedata"].get(key, {}) for key in face_keys]
+    facedata_missing = numpy.array([key not in data["facedata"] for key in face_keys], dtype=bool)
+    if facedata_missing.any():
+        arrays[f"{prefix}/facedata_missing"] = facedata_missing
+
+    edgedata = data["edgedata"]
+    edge_keys = [_EDGE.match(key) for key in edgedata]
+    if all(match and str((int(match.group(1)), int(match.group(2)))) == match.group(0) for match in edge_keys):
+        arrays[f"{prefix}/edge_keys"] = numpy.array([[int(match.group(1)), int(match.group(2))] for match in edge_keys], dtype=numpy.int64).reshape(-1, 2)
+        edge_names = None
+    else:
+        edge_names = list(edgedata.keys())
+
+    meta = {key: value for key, value in node.items() if key != "data"}
+    meta["data"] = {key: value for key, value in data.items() if key not in ("vertex", "face", "facedata", "edgedata")}
+    meta["__mesh__"] = {
+        "index": index,
+        "xyz": has_xyz,
+        "vertex": _encode_attributes(vertex_attrs, arrays, f"{prefix}/vertex"),
+        "face": _encode_attributes(facedata, arrays, f"{prefix}/face"),
+        "edge": _encode_attributes(list(edgedata.values()), arrays, f"{prefix}/edge"),
+        "edge_names": edge_names,
+    }
+    return meta
+
+
+def _decode_mesh(meta: dict, arrays: dict) -> dict:
+    info = meta["__mesh__"]
+    prefix = f"mesh{info['index']}"
+
+    vertex_keys = arrays[f"{prefix}/vertex_keys"].tolist()
+    face_keys = arrays[f"{prefix}/face_keys"].tolist()
+    offsets = arrays[f"{prefix}/face_offsets"].tolist()
+    face_vertices = arrays[f"{prefix}/face_vertices"].tolist()
+
+    xyz = None
+    if info["xyz"]:
+        x, y, z = numpy.asarray(arrays[f"{prefix}/xyz"]).T.tolist()
+        xyz = {"x": x, "y": y, "z": z}
+    vertex_attrs = _decode_attributes(info["vertex"], arrays, f"{prefix}/vertex", len(vertex_keys), extra=xyz)
+
+    facedata = _decode_attributes(info["face"], arrays, f"{prefix}/face", len(face_keys))
+    missing = arrays.get(f"{prefix}/facedata_missing")
+    missing = missing.tolist() if missing is not None else [False] * len(face_keys)
+
+    if info["edge_names"] is None:
+        edge_names = [str((u, v)) for u, v in arrays[f"{prefix}/edge_keys"].tolist()]
+    else:
+        edge_names = info["edge_names"]
+    edgedata = _decode_attributes(info["edge"], arrays, f"{prefix}/edge", len(edge_names))
+
+    # keys are strings, as in the JSON representation
+    vertex_keys = [str(key) for key in vertex_keys]
+    face_keys = [str(key) for key in face_keys]
+
+    data = dict(meta["data"])
+    data["vertex"] = dict(zip(vertex_keys, vertex_attrs))
+    data["face"] = {key: face_vertices[start:end] for key, start, end in zip(face_keys, offsets[:-1], offsets[1:])}
+    data["facedata"] = {key: attr for key, attr, flag in zip(face_keys, facedata, missing) if not flag}
+    data["edgedata"] = dict(zip(edge_names, edgedata))
+
+    node = {key: value for key, value in meta.items() if key not in ("data", "__mesh__")}
+    node["data"] = data
+    return node
+
+
+# ==============================================================================
+# Tree
+# ==============================================================================
+
+
+def _encode(node: Any, arrays: dict, meshes: list) -> Any:
+    if isinstance(node, list):
+        return [_encode(item, arrays, meshes) for item in node]
+    if isinstance(node, dict):
+        if "dtype" in node and _is_mesh(node):
+            meshes.append(None)
+            return _encode_mesh(node, len(meshes) - 1, arrays)
+        return {key: _encode(value, arrays, meshes) for key, value in node.items()}
+    return node
+
+
+def _decode(node: Any, arrays: dict, decoder: DataDecoder) -> Any:
+    if isinstance(node, list):
+        return [_decode(item, arrays, decoder) for item in node]
+    if isinstance(node, dict):
+        if "__mesh__" in node:
+            return decoder.object_hook(_decode_mesh(node, arrays))
+        return decoder.object_hook({key: _decode(value, arrays, decoder) for key, value in node.items()})
+    return node
+
+
+# ==============================================================================
+# File format
+# ==============================================================================
+
+
+def _align(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def _write(filepath: pathlib.Path, root: Any, arrays: dict[str, numpy.ndarray]) -> None:
+    header = {"version": VERSION, "root": root, "arrays": {}}
+
+    # the header contains the offsets of the arrays, which depend on the size of the header
+    # the size of the header is therefore padded and fixed before the offsets are filled in
+    layout = {name: {"dtype": array.dtype.str, "shape": list(array.shape), "offset": 0} for name, array in arrays.items()}
+    header["arrays"] = layout
+    estimate = len(json.dumps(header).encode()) + 32 * len(arrays) + 64
+    start = _align(len(MAGIC) + 8 + estimate)
+
+    offset = start
+    for name, array in arrays.items():
+        layout[name]["offset"] = offset
+        offset = _align(offset + array.nbytes)
+
+    encoded = json.dumps(header).encode()
+    if len(MAGIC) + 8 + len(encoded) > start:
+        raise RuntimeError("Header size estimate exceeded.")
+
+    with open(filepath, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(encoded)))
+        f.write(encoded)
+        for name, array in arrays.items():
+            f.write(b"\0" * (layout[name]["offset"] - f.tell()))
+            f.write(numpy.ascontiguousarray(array).tobytes())
+
+
+def _read(filepath: pathlib.Path, mmap: bool) -> tuple[Any, dict[str, numpy.ndarray]]:
+    with open(filepath, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"Not a binary mesh file: {filepath}")
+        (size,) = struct.unpack("<Q", f.read(8))
+        header = json.loads(f.read(size).decode())
+
+    arrays = {}
+    for name, info in header["arrays"].items():
+        dtype = numpy.dtype(info["dtype"])
+        shape = tuple(info["shape"])
+        count = int(numpy.prod(shape))
+        if count == 0:
+            arrays[name] = numpy.zeros(shape, dtype=dtype)
+        elif mmap:
+            arrays[name] = numpy.memmap(filepath, dtype=dtype, mode="r", offset=info["offset"], shape=shape)
+        else:
+            arrays[name] = numpy.fromfile(filepath, dtype=dtype, count=count, offset=info["offset"]).reshape(shape)
+    return header["root"], arrays
+
+
+# ==============================================================================
+# API
+# ==============================================================================
+
+
+def dump_binary(data: Any, filepath: Union[str, pathlib.Path]) -> None:
+    """Write COMPAS data to a binary file, with the meshes stored as contiguous typed arrays.
+
+    Parameters
+    ----------
+    data : Any
+        A mesh, a model that embeds meshes, or any other data supported by :func:`compas.json_dump`.
+    filepath : str | pathlib.Path
+        The path of the file.
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    The file starts with a JSON header that describes everything but the bulk data of the meshes,
+    followed by 64-byte aligned raw arrays, which can be memory mapped.
+    Per mesh, coordinates are stored as one (V, 3) float64 array,
+    face connectivity as offsets and vertex identifiers,
+    and attributes with only float, int or bool values as typed columns.
+    Other attributes remain in the header, such that all attributes round-trip exactly.
+
+    """
+    arrays: dict[str, numpy.ndarray] = {}
+    root = _encode(json.loads(compas.json_dumps(data)), arrays, [])
+    _write(pathlib.Path(filepath), root, arrays)
+
+
+def load_binary(filepath: Union[str, pathlib.Path], mmap: bool = True) -> Any:
+    """Load COMPAS data from a binary file written by :func:`dump_binary`.
+
+    Parameters
+    ----------
+    filepath : str | pathlib.Path
+        The path of the file.
+    mmap : bool, optional
+        If True, the arrays are memory mapped instead of read.
+
+    Returns
+    -------
+    Any
+
+    """
+    root, arrays = _read(pathlib.Path(filepath), mmap=mmap)
+
+    # the decoder creates many small containers that are all kept alive
+    # and garbage collection passes during decoding are pure overhead
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return _decode(root, arrays, DataDecoder())
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def load_mesh_buffers(filepath: Union[str, pathlib.Path], mmap: bool = True) -> list[MeshBuffer]:
+    """Load the coordinates and connectivity of all meshes of a binary file, without constructing mesh objects.
+
+    Parameters
+    ----------
+    filepath : str | pathlib.Path
+        The path of the file.
+    mmap : bool, optional
+        If True, the returned arrays are zero-copy, read-only memory maps of the file.
+
+    Returns
+    -------
+    list[:class:`MeshBuffer`]
+        The meshes, in the order in which they are encountered in the data.
+
+    """
+    _, arrays = _read(pathlib.Path(filepath), mmap=mmap)
+    buffers = []
+    index = 0
+    while f"mesh{index}/xyz" in arrays:
+        prefix = f"mesh{index}"
+        buffers.append(
+            MeshBuffer(
+                arrays[f"{prefix}/vertex_keys"],
+                arrays[f"{prefix}/xyz"],
+                arrays[f"{prefix}/face_keys"],
+                arrays[f"{prefix}/face_offsets"],
+                arrays[f"{prefix}/face_vertices"],
+            )
+        )
+        index += 1
+    return buffers
+
+
+def dump_femesh(femesh: FEMesh, filepath: Union[str, pathlib.Path]) -> None:
+    """Write a finite element mesh to a binary file, with every array stored contiguously.
+
+    Parameters
+    ----------
+    femesh : :class:`knitcandela.FEMesh`
+        The mesh.
+    filepath : str | pathlib.Path
+        The path of the file.
+
+    Returns
+    -------
+    None
+
+    Notes
+    -----
+    The file has the same layout as the files of :func:`dump_binary`.
+    Node indices and tags are stored as 32-bit integers if they fit,
+    which halves the size of the connectivity of large meshes.
+
+    """
+    arrays = {}
+    for name, array in zip(FEMesh._fields, femesh):
+        array = numpy.asarray(array)
+        if array.dtype.kind in "iu" and (not array.size or numpy.abs(array).max() < 2**31):
+            array = array.astype(numpy.int32)
+        arrays[name] = array
+    _write(pathlib.Path(filepath), {"__femesh__": list(FEMesh._fields)}, arrays)
+
+
+def load_femesh(filepath: Union[str, pathlib.Path], mmap: bool = True) -> FEMesh:
+    """Load a finite element mesh from a binary file written by :func:`dump_femesh`.
+
+    Parameters
+    ----------
+    filepath : str | pathlib.Path
+        The path of the file.
+    mmap : bool, optional
+        If True, the arrays are zero-copy, read-only memory maps of the file,
+        such that only the parts of the mesh that are accessed are read from disk.
+
+    Returns
+    -------
+    :class:`knitcandela.FEMesh`
+
+    """
+    root, arrays = _read(pathlib.Path(filepath), mmap=mmap)
+    if not isinstance(root, dict) or "__femesh__" not in root:
+        raise ValueError(f"Not a binary finite element mesh file: {filepath}")
+    return FEMesh(*(arrays[name] for name in root["__femesh__"]))
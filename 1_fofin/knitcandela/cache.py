@@ -0,0 +1,338 @@
+import hashlib
+import json
+import os
+import pathlib
+import time
+from typing import Any
+from typing import Callable
+from typing import Optional
+from typing import Union
+
+import compas
+import numpy
+from compas.data import Data
+from compas.datastructures import Mesh
+
+from .arrays import mesh_to_arrays
+from .storage import dump_artifact
+from .storage import load_artifact
+
+
+def geometric_hash(*items: Any, precision: int = 6) -> str:
+    """Compute a stable content hash of geometry and parameters.
+
+    Parameters
+    ----------
+    *items : Any
+        Meshes, arrays, or JSON serializable values, like a parameter dict.
+        Hashes of upstream stages can be passed as strings, to chain stage keys.
+    precision : int, optional
+        The number of decimals to which coordinates are rounded before hashing.
+
+    Returns
+    -------
+    str
+        A hexadecimal SHA-256 digest.
+
+    Notes
+    -----
+    For meshes, only vertex coordinates and face connectivity are taken into account,
+    in the order of iteration of the vertices and faces.
+    Attributes are ignored.
+
+    """
+    h = hashlib.sha256()
+    for item in items:
+        if isinstance(item, Mesh):
+            vertices, faces = mesh_to_arrays(item)
+            h.update(b"mesh")
+            h.update(numpy.ascontiguousarray(numpy.round(vertices, precision) + 0.0).tobytes())
+            h.update(numpy.ascontiguousarray(faces).tobytes())
+        elif isinstance(item, numpy.ndarray):
+            h.update(b"array")
+            if item.dtype.kind == "f":
+                item = numpy.round(item, precision) + 0.0
+            h.update(str(item.shape).encode())
+            h.update(numpy.ascontiguousarray(item).tobytes())
+        elif isinstance(item, (tuple, list)) and item and all(isinstance(part, numpy.ndarray) for part in item):
+            h.update(geometric_hash(*item, precision=precision).encode())
+        elif isinstance(item, Data):
+            h.update(compas.json_dumps(item, pretty=False).encode())
+        else:
+            h.update(json.dumps(item, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+class StageCache:
+    """On-disk cache of pipeline artifacts, addressed by the content hash of their inputs.
+
+    Parameters
+    ----------
+    path : str | pathlib.Path
+        The folder of the cache.
+    maxsize : int, optional
+        The maximum total size of the cached files, in bytes.
+        When the cache grows beyond this size, the least recently used entries are evicted.
+
+    Attributes
+    ----------
+    stats : dict[str, dict[str, int]]
+        The number of hits and misses per stage, in this session.
+
+    Examples
+    --------
+    >>> cache = StageCache("data/cache")
+    >>> key = geometric_hash(cablemesh, params)
+    >>> shell = cache.cached("shell", key, lambda: shell_from_cablemesh(cablemesh, params["thickness"], mesh=True))
+
+    """
+
+    def __init__(self, path: Union[str, pathlib.Path], maxsize: int = 2 * 1024**3) -> None:
+        self.path = pathlib.Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.maxsize = maxsize
+        self.stats: dict[str, dict[str, int]] = {}
+        self._index = self._read_index()
+
+    def __contains__(self, item: tuple[str, str]) -> bool:
+        stage, key = item
+        return self._name(stage, key) in self._index
+
+    @property
+    def size(self) -> int:
+        return sum(entry["size"] for entry in self._index.values())
+
+    # =============================================================================
+    # Index
+    # =============================================================================
+
+    @property
+    def _indexpath(self) -> pathlib.Path:
+        return self.path / "index.json"
+
+    def _read_index(self) -> dict[str, dict]:
+        if not self._indexpath.exists():
+            return {}
+        with open(self._indexpath, "r") as f:
+            index = json.load(f)
+        return {name: entry for name, entry in index.items() if (self.path / entry["file"]).exists()}
+
+    def _write_index(self) -> None:
+        tmp = self._indexpath.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp, self._indexpath)
+
+    def _name(self, stage: str, key: str) -> str:
+        return f"{stage}/{key}"
+
+    def _count(self, stage: str, outcome: str) -> None:
+        stats = self.stats.setdefault(stage, {"hits": 0, "misses": 0})
+        stats[outcome] += 1
+
+    # =============================================================================
+    # Access
+    # =============================================================================
+
+    def locate(self, stage: str, key: str) -> Optional[tuple[str, pathlib.Path]]:
+        """Look up the file of the artifact of a stage, without loading it.
+
+        Parameters
+        ----------
+        stage : str
+            The name of the stage.
+        key : str
+            The content hash of the inputs of the stage.
+
+        Returns
+        -------
+        tuple[str, pathlib.Path] | None
+            The kind and the path of the file, to be passed to :func:`load_artifact`,
+            or None if there is no entry for the key.
+
+        Notes
+        -----
+        The access time of the entry is only updated in memory.
+        It is written to the index file with the next change of the entries, by :meth:`register` or :meth:`clear`.
+
+        """
+        name = self._name(stage, key)
+        entry = self._index.get(name)
+        if entry is None:
+            self._count(stage, "misses")
+            return None
+        self._count(stage, "hits")
+        entry["atime"] = time.time()
+        return entry["kind"], self.path / entry["file"]
+
+    def get(self, stage: str, key: str) -> Optional[Any]:
+        """Look up the artifact of a stage.
+
+        Parameters
+        ----------
+        stage : str
+            The name of the stage.
+        key : str
+            The content hash of the inputs of the stage.
+
+        Returns
+        -------
+        Any | None
+            The cached artifact, or None if there is no entry for the key.
+
+        """
+        location = self.locate(stage, key)
+        if location is None:
+            return None
+        return load_artifact(*location)
+
+    def put(self, stage: str, key: str, value: Any) -> None:
+        """Store the artifact of a stage.
+
+        Parameters
+        ----------
+        stage : str
+            The name of the stage.
+        key : str
+            The content hash of the inputs of the stage.
+        value : Any
+            A COMPAS data object, a Brep, a cutter buffer, a finite element mesh, or a (tuple of) arrays.
+
+        Returns
+        -------
+        None
+
+        """
+        kind, filepath = dump_artifact(value, self.basepath(stage, key))
+        self.register(stage, key, kind, filepath)
+
+    def basepath(self, stage: str, key: str) -> pathlib.Path:
+        """Get the path, without suffix, of the file of the artifact of a stage.
+
+        Parameters
+        ----------
+        stage : str
+            The name of the stage.
+        key : str
+            The content hash of the inputs of the stage.
+
+        Returns
+        -------
+        pathlib.Path
+
+        Notes
+        -----
+        The folder of the stage is created if it does not exist yet,
+        such that other processes can write the artifact with :func:`dump_artifact`.
+
+        """
+        folder = self.path / stage
+        folder.mkdir(exist_ok=True)
+        return folder / key
+
+    def register(self, stage: str, key: str, kind: str, filepath: pathlib.Path) -> None:
+        """Add an artifact that was written to :meth:`basepath` by another process.
+
+        Parameters
+        ----------
+        stage : str
+            The name of the stage.
+        key : str
+            The content hash of the inputs of the stage.
+        kind : str
+            The kind of artifact, as returned by :func:`dump_artifact`.
+        filepath : pathlib.Path
+            The path of the file, as returned by :func:`dump_artifact`.
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        Only one process should manage the index of a cache.
+        Worker processes write artifacts, and the managing process registers them.
+
+        """
+        filepath = pathlib.Path(filepath)
+        self._index[self._name(stage, key)] = {
+            "file": filepath.relative_to(self.path).as_posix(),
+            "kind": kind,
+            "size": filepath.stat().st_size,
+            "atime": time.time(),
+        }
+        self.evict()
+        self._write_index()
+
+    def cached(self, stage: str, key: str, compute: Callable[[], Any]) -> Any:
+        """Look up the artifact of a stage, and compute and store it on a miss.
+
+        Parameters
+        ----------
+        stage : str
+            The name of the stage.
+        key : str
+            The content hash of the inputs of the stage.
+        compute : callable
+            Function without arguments that computes the artifact.
+
+        Returns
+        -------
+        Any
+
+        Notes
+        -----
+        An artifact that is None is a hit like any other artifact.
+
+        """
+        location = self.locate(stage, key)
+        if location is not None:
+            return load_artifact(*location)
+        value = compute()
+        self.put(stage, key, value)
+        return value
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the cache fits in its maximum size.
+
+        Returns
+        -------
+        None
+
+        """
+        size = self.size
+        for name, entry in sorted(self._index.items(), key=lambda item: item[1]["atime"]):
+            if size <= self.maxsize:
+                break
+            filepath = self.path / entry["file"]
+            if filepath.exists():
+                filepath.unlink()
+            size -= entry["size"]
+            del self._index[name]
+
+    def clear(self) -> None:
+        """Remove all entries from the cache.
+
+        Returns
+        -------
+        None
+
+        """
+        maxsize = self.maxsize
+        self.maxsize = -1
+        self.evict()
+        self.maxsize = maxsize
+        self._write_index()
+
+    def summary(self) -> str:
+        """Summarize the hits and misses per stage.
+
+        Returns
+        -------
+        str
+
+        """
+        lines = [f"cache: {self.path} ({self.size / 1024**2:.1f} MB of {self.maxsize / 1024**2:.1f} MB)"]
+        for stage, stats in self.stats.items():
+            lines.append(f"{stage:<12} hits: {stats['hits']:>4}  misses: {stats['misses']:>4}")
+        return "\n".join(lines)
@@ -0,0 +1,199 @@
+from typing import NamedTuple
+from typing import Optional
+
+import numpy
+from compas.colors import ColorMap
+
+from .arrays import face_sizes
+
+
+def vertex_node_index(vertices: numpy.ndarray, nodes: numpy.ndarray, precision: int = 3) -> numpy.ndarray:
+    """Match the vertices of a mesh with coinciding nodes.
+
+    Parameters
+    ----------
+    vertices : numpy.ndarray
+        The (V, 3) vertex coordinates.
+    nodes : numpy.ndarray
+        The (N, 3) node coordinates.
+    precision : int, optional
+        The number of decimals to which coordinates are rounded before they are compared.
+
+    Returns
+    -------
+    numpy.ndarray
+        The (V,) index of the node at the location of every vertex, or ``-1`` if there is none.
+
+    """
+    points = numpy.round(numpy.vstack([nodes, vertices]), precision) + 0.0
+    _, inverse = numpy.unique(points, axis=0, return_inverse=True)
+    inverse = inverse.reshape(-1)
+    node_at = numpy.full(inverse.max() + 1, -1, dtype=numpy.int64)
+    # if nodes coincide, the first one is used
+    node_at[inverse[: len(nodes)][::-1]] = numpy.arange(len(nodes))[::-1]
+    return node_at[inverse[len(nodes) :]]
+
+
+def nodal_average(elements: numpy.ndarray, values: numpy.ndarray, n: Optional[int] = None) -> numpy.ndarray:
+    """Average element values at the nodes, by scatter-adding them to the nodes of every element.
+
+    Parameters
+    ----------
+    elements : numpy.ndarray
+        The (E, K) padded node indices of the elements.
+    values : numpy.ndarray
+        The (E,) element values.
+    n : int, optional
+        The number of nodes.
+        Default is one more than the largest node index.
+
+    Returns
+    -------
+    numpy.ndarray
+        The (N,) mean of the values of the elements connected to every node,
+        with NaN for nodes without elements.
+
+    """
+    mask = elements >= 0
+    if n is None:
+        n = int(elements.max()) + 1
+    nodes = elements[mask]
+    weights = numpy.broadcast_to(numpy.asarray(values, dtype=float)[:, None], elements.shape)[mask]
+    total = numpy.bincount(nodes, weights=weights, minlength=n)
+    count = numpy.bincount(nodes, minlength=n)
+    with numpy.errstate(invalid="ignore", divide="ignore"):
+        return total / count
+
+
+def von_mises(tensors: numpy.ndarray) -> numpy.ndarray:
+    """Compute the von Mises stress of a set of stress tensors.
+
+    Parameters
+    ----------
+    tensors : numpy.ndarray
+        The (N, 3, 3) stress tensors.
+
+    Returns
+    -------
+    numpy.ndarray
+        The (N,) von Mises stresses.
+
+    """
+    trace = numpy.trace(tensors, axis1=1, axis2=2)
+    deviatoric = tensors - numpy.eye(3) * (trace / 3)[:, None, None]
+    J2 = 0.5 * numpy.einsum("nij,nij->n", deviatoric, deviatoric)
+    return numpy.sqrt(3 * J2)
+
+
+def colormap_array(cmap: ColorMap, values: numpy.ndarray, minval: Optional[float] = None, maxval: Optional[float] = None) -> numpy.ndarray:
+    """Map an array of values to colors, with the same lookup as :meth:`compas.colors.ColorMap.__call__`.
+
+    Parameters
+    ----------
+    cmap : :class:`compas.colors.ColorMap`
+        The color map.
+    values : numpy.ndarray
+        The (N,) values.
+    minval : float, optional
+        The value mapped to the first color.
+        Default is the minimum of the values.
+    maxval : float, optional
+        The value mapped to the last color.
+        Default is the maximum of the values.
+
+    Returns
+    -------
+    numpy.ndarray
+        The (N, 4) RGBA colors.
+        NaN values and values outside the range are clipped to the first or last color.
+
+    """
+    values = numpy.asarray(values, dtype=float)
+    minval = numpy.nanmin(values) if minval is None else minval
+    maxval = numpy.nanmax(values) if maxval is None else maxval
+    colors = numpy.array([[color.r, color.g, color.b, color.a] for color in cmap.colors], dtype=float)
+    span = maxval - minval if maxval > minval else 1.0
+    key = numpy.nan_to_num((values - minval) / span, nan=0.0)
+    index = numpy.clip((key * (len(colors) - 1)).astype(numpy.int64), 0, len(colors) - 1)
+    return colors[index]
+
+
+class ContourMap(NamedTuple):
+    """Index maps for drawing nodal and element fields of a finite element part as contours on its boundary mesh.
+
+    Attributes
+    ----------
+    vertices : numpy.ndarray
+        The (V, 3) vertex coordinates of the boundary mesh.
+    faces : numpy.ndarray
+        The (F, K) padded face vertex indices of the boundary mesh.
+    vertex_node : numpy.ndarray
+        The (V,) index of the node at every vertex, or ``-1``.
+    elements : numpy.ndarray
+        The (E, K) padded node indices of the elements, by element key.
+
+    """
+
+    vertices: numpy.ndarray
+    faces: numpy.ndarray
+    vertex_node: numpy.ndarray
+    elements: numpy.ndarray
+
+    def nodal(self, values: numpy.ndarray, keys: Optional[numpy.ndarray] = None) -> numpy.ndarray:
+        """Average an element field at the nodes.
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            The (E,) element values.
+        keys : numpy.ndarray, optional
+            The keys of the elements of the values, if they are not all elements in order of their keys.
+
+        Returns
+        -------
+        numpy.ndarray
+            The (N,) nodal values.
+
+        """
+        elements = self.elements if keys is None else self.elements[keys]
+        return nodal_average(elements, values, n=int(self.elements.max()) + 1)
+
+    def vertex_values(self, values: numpy.ndarray) -> numpy.ndarray:
+        """Transfer a nodal field to the vertices of the boundary mesh.
+
+        Parameters
+        ----------
+        values : numpy.ndarray
+            The (N,) nodal values.
+
+        Returns
+        -------
+        numpy.ndarray
+            The (V,) vertex values, with NaN for vertices without node.
+
+        """
+        values = numpy.append(numpy.asarray(values, dtype=float), numpy.nan)
+        return values[self.vertex_node]
+
+    def buffers(self, colors: numpy.ndarray) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """Construct face buffers of the boundary mesh, with per vertex colors.
+
+        Parameters
+        ----------
+        colors : numpy.ndarray
+            The (V, 4) vertex colors.
+
+        Returns
+        -------
+        tuple[numpy.ndarray, numpy.ndarray]
+            The (3T, 3) corners of the triangulated faces and their (3T, 4) colors,
+            in the format of the ``faces`` and ``facecolor`` of a :class:`compas_viewer.scene.BufferGeometry`.
+
+        """
+        sizes = face_sizes(self.faces)
+        triangles = []
+        for i in range(1, self.faces.shape[1] - 1):
+            fan = self.faces[sizes > i + 1]
+            triangles.append(fan[:, [0, i, i + 1]])
+        triangles = numpy.vstack(triangles).reshape(-1)
+        return self.vertices[triangles], colors[triangles]
@@ -0,0 +1,227 @@
+from typing import Iterator
+from typing import NamedTuple
+
+import numpy
+
+from .arrays import face_normals
+from .arrays import face_sizes
+from .arrays import pad_faces
+from .arrays import vertex_normals
+
+
+class CutterBuffer(NamedTuple):
+    """Flat vertex and face buffer of a set of closed cutter prisms.
+
+    Attributes
+    ----------
+    vertices : numpy.ndarray
+        The (N, 3) vertex coordinates of all cutters.
+    faces : numpy.ndarray
+        The padded (M, K) face vertex indices of all cutters, into ``vertices``.
+    vertex_offsets : numpy.ndarray
+        The (C + 1,) offsets of the vertices of every cutter in ``vertices``.
+    face_offsets : numpy.ndarray
+        The (C + 1,) offsets of the faces of every cutter in ``faces``.
+
+    """
+
+    vertices: numpy.ndarray
+    faces: numpy.ndarray
+    vertex_offsets: numpy.ndarray
+    face_offsets: numpy.ndarray
+
+    def __len__(self) -> int:
+        return len(self.vertex_offsets) - 1
+
+    def cutter(self, index: int) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """Return the vertices and faces of one cutter, with local vertex indices.
+
+        Parameters
+        ----------
+        index : int
+            The index of the cutter.
+
+        Returns
+        -------
+        tuple[numpy.ndarray, numpy.ndarray]
+
+        """
+        start, end = self.vertex_offsets[index], self.vertex_offsets[index + 1]
+        faces = self.faces[self.face_offsets[index] : self.face_offsets[index + 1]]
+        return self.vertices[start:end], numpy.where(faces >= 0, faces - start, -1)
+
+    def cutters(self) -> Iterator[tuple[numpy.ndarray, numpy.ndarray]]:
+        """Iterate over the vertices and faces of the individual cutters.
+
+        Yields
+        ------
+        tuple[numpy.ndarray, numpy.ndarray]
+
+        """
+        for index in range(len(self)):
+            yield self.cutter(index)
+
+    def bounds(self) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """Compute the axis aligned bounds of the individual cutters.
+
+        Returns
+        -------
+        tuple[numpy.ndarray, numpy.ndarray]
+            The (C, 3) min and max corners.
+
+        """
+        starts = self.vertex_offsets[:-1]
+        return numpy.minimum.reduceat(self.vertices, starts, axis=0), numpy.maximum.reduceat(self.vertices, starts, axis=0)
+
+
+def offset_faces(vertices: numpy.ndarray, faces: numpy.ndarray, distance: float, tol: float = 1e-12) -> numpy.ndarray:
+    """Offset the polygons of all faces of a padded face array in their own plane.
+
+    Parameters
+    ----------
+    vertices : numpy.ndarray
+        The vertex coordinates.
+    faces : numpy.ndarray
+        The padded face vertex indices.
+    distance : float
+        The offset distance.
+        Positive values offset towards the inside of counter-clockwise faces.
+    tol : float, optional
+        Tolerance for considering consecutive offset edges parallel.
+
+    Returns
+    -------
+    numpy.ndarray
+        A (F, K, 3) array with the offset corners of every face.
+        Padding slots contain zeros.
+
+    Notes
+    -----
+    This is the array equivalent of :func:`compas.geometry.offset_polygon`.
+    Every edge is moved along the cross product of the face normal and the edge direction,
+    and every corner is placed at the midpoint of the closest points of its two adjacent offset edges.
+
+    """
+    mask = faces >= 0
+    k = face_sizes(faces)[:, None]
+    columns = numpy.arange(faces.shape[1])[None, :]
+
+    points = vertices[numpy.where(mask, faces, 0)]
+    normals = face_normals(vertices, faces)
+
+    # offset edges, from every corner to the next
+    a = points
+    b = numpy.take_along_axis(points, ((columns + 1) % k)[..., None], axis=1)
+    u = b - a
+    direction = numpy.cross(normals[:, None, :], u)
+    length = numpy.linalg.norm(direction, axis=2, keepdims=True)
+    length[~mask] = 1.0
+    direction /= length
+    a = a + direction * distance
+    b = b + direction * distance
+
+    # the offset edges coming into every corner
+    previous = ((columns - 1) % k)[..., None]
+    c = numpy.take_along_axis(a, previous, axis=1)
+    d = numpy.take_along_axis(b, previous, axis=1)
+    v = d - c
+
+    # closest points between the incoming and outgoing edge lines
+    w = c - a
+    uu = (u * u).sum(axis=2)
+    uv = (u * v).sum(axis=2)
+    vv = (v * v).sum(axis=2)
+    uw = (u * w).sum(axis=2)
+    vw = (v * w).sum(axis=2)
+    denominator = uu * vv - uv * uv
+    parallel = numpy.abs(denominator) <= tol * uu * vv
+    denominator[parallel] = 1.0
+    s = (uw * vv - vw * uv) / denominator
+    t = (uw * uv - vw * uu) / denominator
+    corners = 0.5 * (a + s[..., None] * u + c + t[..., None] * v)
+
+    # colinear edges meet at the midpoint of the end of the incoming and the start of the outgoing edge
+    corners[parallel] = 0.5 * (d[parallel] + a[parallel])
+    corners[~mask] = 0.0
+    return corners
+
+
+def cutter_buffer(
+    vertices: numpy.ndarray,
+    faces: numpy.ndarray,
+    ribs: float,
+    thickness: float,
+    taper: float = 0.0,
+) -> CutterBuffer:
+    """Construct the tapered cutter prisms of all faces of an intrados in one pass.
+
+    Parameters
+    ----------
+    vertices : numpy.ndarray
+        The (V, 3) vertex coordinates of the intrados.
+    faces : numpy.ndarray
+        The padded face vertex indices of the intrados.
+        Faces can have different numbers of vertices.
+    ribs : float
+        The width of the ribs between the cutters.
+    thickness : float
+        The height of the cutters along the vertex normals.
+    taper : float, optional
+        Additional inset of the top of the cutters with respect to the bottom.
+
+    Returns
+    -------
+    :class:`CutterBuffer`
+
+    Notes
+    -----
+    Per face with ``k`` vertices, the cutter has ``2k`` vertices,
+    with the ``k`` vertices of the bottom first,
+    and ``k + 2`` faces: the bottom, the top, and ``k`` sides.
+    This matches the construction of :func:`waffle_cutters`.
+
+    """
+    vertices = numpy.asarray(vertices, dtype=float)
+    faces = pad_faces(faces)
+    mask = faces >= 0
+    k = face_sizes(faces)
+    n, width = faces.shape
+    columns = numpy.arange(width)[None, :]
+
+    normals = vertex_normals(vertices, faces)[numpy.where(mask, faces, 0)]
+
+    bottom = offset_faces(vertices, faces, 0.5 * ribs)
+    inset = bottom if not taper else offset_faces(vertices, faces, 0.5 * ribs + taper)
+    top = inset + normals * thickness
+
+    # vertices
+    vertex_offsets = numpy.zeros(n + 1, dtype=numpy.int64)
+    vertex_offsets[1:] = numpy.cumsum(2 * k)
+    start = vertex_offsets[:-1, None]
+
+    xyz = numpy.empty((vertex_offsets[-1], 3))
+    xyz[(start + columns)[mask]] = bottom[mask]
+    xyz[(start + k[:, None] + columns)[mask]] = top[mask]
+
+    # faces
+    face_offsets = numpy.zeros(n + 1, dtype=numpy.int64)
+    face_offsets[1:] = numpy.cumsum(k + 2)
+
+    polygons = numpy.full((face_offsets[-1], max(width, 4)), -1, dtype=numpy.int64)
+
+    b = numpy.where(mask, start + columns, -1)
+    t = numpy.where(mask, start + k[:, None] + columns, -1)
+    reversed_columns = numpy.where(mask, k[:, None] - 1 - columns, columns)
+
+    polygons[face_offsets[:-1], :width] = numpy.take_along_axis(b, reversed_columns, axis=1)
+    polygons[face_offsets[:-1] + 1, :width] = t
+
+    # side i connects corner i and the previous corner i - 1
+    previous = (columns - 1) % k[:, None]
+    rows = (face_offsets[:-1, None] + 2 + columns)[mask]
+    polygons[rows, 0] = b[mask]
+    polygons[rows, 1] = t[mask]
+    polygons[rows, 2] = numpy.take_along_axis(t, previous, axis=1)[mask]
+    polygons[rows, 3] = numpy.take_along_axis(b, previous, axis=1)[mask]
+
+    return CutterBuffer(xyz, polygons, vertex_offsets, face_offsets)
@@ -0,0 +1,509 @@
+"""Finite element helpers based on compas_fea2.
+
+compas_fea2 is not a requirement of the other modules of the package.
+This module is therefore not imported by the package itself,
+and has to be imported explicitly as ``knitcandela.fea``.
+
+"""
+
+import pathlib
+import sqlite3
+import weakref
+from typing import Callable
+from typing import Iterable
+from typing import Optional
+
+import numpy
+from compas_fea2.model import DeformablePart
+from compas_fea2.model import Node
+from compas_fea2.model import TetrahedronElement
+from compas_fea2.problem import NodeLoadPattern
+
+from .arrays import face_centroids
+from .arrays import mesh_to_arrays
+from .arrays import pad_faces
+from .contours import ContourMap
+from .contours import vertex_node_index
+from .femesh import FEMesh
+from .opensees import OpenSeesWriter
+from .opensees import store_recorder
+from .parts import ArrayPart
+from .results import ResultStore
+from .spatial import SpatialIndex
+from .statics import LinearStatics
+from .stresses import PrincipalStresses
+from .stresses import principal_stresses
+from .stresses import stress_tensors
+
+# column order of the solid stress table of the results database
+STRESS_COLUMNS_3D = ["S11", "S22", "S23", "S12", "S13", "S33"]
+
+# derived data per part, discarded when nodes or elements are added to the part
+_PART_CACHE: "weakref.WeakKeyDictionary[DeformablePart, dict]" = weakref.WeakKeyDictionary()
+
+
+def _cached(part: DeformablePart, name: str, build: Callable):
+    cache = _PART_CACHE.setdefault(part, {})
+    size = (len(part.nodes), len(part.elements))
+    if cache.get("size") != size:
+        cache.clear()
+        cache["size"] = size
+    if name not in cache:
+        cache[name] = build(part)
+    return cache[name]
+
+
+def part_from_femesh(femesh: FEMesh, section, name: Optional[str] = None) -> DeformablePart:
+    """Create a deformable part with tetrahedral elements from a finite element mesh.
+
+    Parameters
+    ----------
+    femesh : :class:`knitcandela.FEMesh`
+        A finite element mesh with tetrahedra.
+    section : :class:`compas_fea2.model.SolidSection`
+        The section of all elements.
+    name : str, optional
+        The name of the part.
+
+    Returns
+    -------
+    :class:`compas_fea2.model.DeformablePart`
+
+    Notes
+    -----
+    This is the equivalent of :meth:`compas_fea2.model.DeformablePart.from_gmsh` for a mesh that is already in array form,
+    without a gmsh model and without converting the boundary of the part through :meth:`compas_gmsh.models.Model.mesh_to_compas`.
+
+    """
+    part = DeformablePart(name=name)
+    nodes = [part.add_node(Node(xyz)) for xyz in femesh.nodes.tolist()]
+    for tet in femesh.tetrahedra.tolist():
+        part.add_element(TetrahedronElement(nodes=[nodes[index] for index in tet], section=section))
+    part.ndf = 3
+    part._discretized_boundary_mesh = femesh.to_mesh()
+    return part
+
+
+def _part_arrays(part: DeformablePart) -> tuple[numpy.ndarray, numpy.ndarray]:
+    if isinstance(part, ArrayPart):
+        return part.xyz, part.tetrahedra
+    elements = sorted(part.elements, key=lambda element: element.key)
+    xyz = node_coordinates(part)
+    connectivity = pad_faces([[node.key for node in element.nodes] for element in elements])
+    return xyz, connectivity
+
+
+def node_coordinates(part: DeformablePart) -> numpy.ndarray:
+    """Collect the coordinates of the nodes of a part.
+
+    Parameters
+    ----------
+    part : :class:`compas_fea2.model.DeformablePart`
+
+    Returns
+    -------
+    numpy.ndarray
+        The (N, 3) coordinates, indexed by node key.
+
+    """
+    if isinstance(part, ArrayPart):
+        return part.xyz
+    return numpy.array([node.xyz for node in _sorted_nodes(part)], dtype=float).reshape(-1, 3)
+
+
+def _sorted_nodes(part: DeformablePart) -> list[Node]:
+    return _cached(part, "nodes", lambda part: sorted(part.nodes, key=lambda node: node.key))
+
+
+def node_index(part: DeformablePart) -> SpatialIndex:
+    """Get the spatial index of the nodes of a part.
+
+    Parameters
+    ----------
+    part : :class:`compas_fea2.model.DeformablePart`
+
+    Returns
+    -------
+    :class:`knitcandela.SpatialIndex`
+        The index, with the node keys as point indices.
+
+    Notes
+    -----
+    The index is built on first use, and reused until nodes or elements are added to the part.
+
+    """
+    return _cached(part, "nodeindex", lambda part: SpatialIndex(node_coordinates(part)))
+
+
+def element_index(part: DeformablePart) -> SpatialIndex:
+    """Get the spatial index of the element centroids of a part.
+
+    Parameters
+    ----------
+    part : :class:`compas_fea2.model.DeformablePart`
+
+    Returns
+    -------
+    :class:`knitcandela.SpatialIndex`
+        The index, with the element keys as point indices.
+
+    """
+    return _cached(part, "elementindex", lambda part: SpatialIndex(element_centroids(part)))
+
+
+def nodes_by_key(part: DeformablePart, keys: Iterable[int]) -> list[Node]:
+    """Get the nodes of a part from their keys, for example from the result of a query of :func:`node_index`.
+
+    Parameters
+    ----------
+    part : :class:`compas_fea2.model.DeformablePart`
+    keys : Iterable[int]
+        The node keys.
+
+    Returns
+    -------
+    list[:class:`compas_fea2.model.Node`]
+
+    """
+    if isinstance(part, ArrayPart):
+        return [part.node(key) for key in keys]
+    nodes = _sorted_nodes(part)
+    return [nodes[key] for key in keys]
+
+
+def element_centroids(part: DeformablePart) -> numpy.ndarray:
+    """Compute the centroids of the elements of a part.
+
+    Parameters
+    ----------
+    part : :class:`compas_fea2.model.DeformablePart`
+
+    Returns
+    -------
+    numpy.ndarray
+        The (E, 3) centroids, indexed by element key.
+
+    Notes
+    -----
+    For tetrahedra, this is the reference point of the stress results of the elements.
+
+    """
+    xyz, connectivity = _part_arrays(part)
+    return face_centroids(xyz, connectivity)
+
+
+def contour_map(part: DeformablePart, precision: int = 3) -> ContourMap:
+    """Build the index maps for contour plots on the boundary mesh of a part.
+
+    Parameters
+    ----------
+    part : :class:`compas_fea2.model.DeformablePart`
+    precision : int, optional
+        The number of decimals to which node and vertex coordinates are rounded to match them.
+
+    Returns
+    -------
+    :class:`knitcandela.ContourMap`
+
+    Notes
+    -----
+    The map depends only on the part, and can be reused for all steps and fields.
+
+    """
+    xyz, connectivity = _part_arrays(part)
+    vertices, faces = mesh_to_arrays(part.discretized_boundary_mesh)
+    return ContourMap(vertices, faces, vertex_node_index(vertices, xyz, precision=precision), connectivity)
+
+
+def stress_arrays(problem, step, part: DeformablePart) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """Read the solid stress results of a part directly from the results database.
+
+    Parameters
+    ----------
+    problem : :class:`compas_fea2.problem.Problem`
+        The analysed problem.
+    step : :class:`compas_fea2.problem._Step`
+        The step of the results.
+    part : :class:`compas_fea2.model.DeformablePart`
+        The part of the results.
+
+    Returns
+    -------
+    tuple[numpy.ndarray, numpy.ndarray]
+        The (N,) element keys and the (N, 3, 3) stress tensors.
+
+    Notes
+    -----
+    The rows are converted to arrays without creating a result object per element.
+
+    """
+    rows = problem.results_db.get_rows("S3D", ["part", "key"] + STRESS_COLUMNS_3D, {"step": [step.name]})
+    rows = [row[1:] for row in rows if row[0].lower() == part.name.lower()]
+    data = numpy.array(rows, dtype=float).reshape(-1, 1 + len(STRESS_COLUMNS_3D))
+    s11, s22, s23, s12, s13, s33 = data[:, 1:].T
+    return data[:, 0].astype(numpy.int64), stress_tensors(s11, s22, s33, s12, s13, s23)
+
+
+def principal_stresses_from_result(problem, step, part: DeformablePart, centroids: Optional[numpy.ndarray] = None) -> PrincipalStresses:
+    """Compute the principal stresses of the solid elements of a part, for one step.
+
+    Parameters
+    ----------
+    problem : :class:`compas_fea2.problem.Problem`
+        The analysed problem.
+    step : :class:`compas_fea2.problem._Step`
+        The step of the results.
+    part : :class:`compas_fea2.model.DeformablePart`
+        The part of the results.
+    centroids : numpy.ndarray, optional
+        The element centroids computed with :func:`element_centroids`.
+        Pass them in to avoid recomputing them for every step.
+
+    Returns
+    -------
+    :class:`knitcandela.PrincipalStresses`
+
+    """
+    if centroids is None:
+        centroids = element_centroids(part)
+    keys, tensors = stress_arrays(problem, step, part)
+    return principal_stresses(centroids[keys], tensors)
+
+
+def store_results(problem, path, fields: Optional[Iterable[str]] = None, chunksize: int = 100_000) -> ResultStore:
+    """Copy the results of an analysed problem from its SQLite database into a memory mapped result store.
+
+    Parameters
+    ----------
+    problem : :class:`compas_fea2.problem.Problem`
+        The analysed problem.
+    path : str | pathlib.Path
+        The folder of the result store.
+    fields : Iterable[str], optional
+        The names of the fields to copy, for example ``["U", "RF"]``.
+        Default is all fields in the database.
+    chunksize : int, optional
+        The number of rows that is read from the database at once.
+
+    Returns
+    -------
+    :class:`knitcandela.ResultStore`
+
+    Notes
+    -----
+    The rows are streamed from the database into the columns of the store, chunk by chunk.
+    No result objects are created, and no field is ever completely loaded in memory during the copy.
+
+    """
+    store = ResultStore(path)
+    connection = sqlite3.connect(problem.path_db)
+    try:
+        tables = [row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type='table'")]
+        for field in fields or [table for table in tables if table != "fields"]:
+            info = connection.execute(f'PRAGMA table_info("{field}")').fetchall()
+            columns = [name for _, name, kind, *_ in info if name not in ("id", "step", "part", "key") and kind.upper() in ("REAL", "FLOAT", "INTEGER", "NUMERIC")]
+            counts = connection.execute(f'SELECT step, part, COUNT(*) FROM "{field}" GROUP BY step, part').fetchall()
+            names = ", ".join(f'"{column}"' for column in columns)
+            for step, part, n in counts:
+                query = f'SELECT key, {names} FROM "{field}" WHERE step = ? AND part = ?'
+                cursor = connection.execute(query, (step, part))
+                with store.writer(step, field, part, columns, n) as writer:
+                    while True:
+                        rows = cursor.fetchmany(chunksize)
+                        if not rows:
+                            break
+                        data = numpy.array(rows, dtype=float).reshape(-1, 1 + len(columns))
+                        writer.append(data[:, 0].astype(numpy.int64), numpy.nan_to_num(data[:, 1:], nan=0.0))
+    finally:
+        connection.close()
+    return store
+
+
+def linear_statics(model, part: DeformablePart) -> LinearStatics:
+    """Set up a linear static analysis of a tetrahedral part, with its stiffness factorized once.
+
+    Parameters
+    ----------
+    model : :class:`compas_fea2.model.Model`
+        The model with the boundary conditions.
+    part : :class:`compas_fea2.model.DeformablePart`
+        A part with tetrahedral elements of one isotropic material.
+
+    Returns
+    -------
+    :class:`knitcandela.LinearStatics`
+
+    Notes
+    -----
+    The material is used as stored by compas_fea2,
+    which converts quantities with units to plain numbers in the base units of their unit system.
+    With ``compas_fea2.units(system="SI_mm")``, these are N and mm.
+
+    """
+    xyz, connectivity = _part_arrays(part)
+    material = _material(part)
+    return LinearStatics(xyz, connectivity[:, :4], material.E, material.v, _fixed(model, part, len(xyz)))
+
+
+def _material(part: DeformablePart):
+    section = part.section_list[0] if isinstance(part, ArrayPart) else next(iter(part.elements)).section
+    return section.material
+
+
+def _fixed(model, part: DeformablePart, n: int) -> numpy.ndarray:
+    fixed = numpy.zeros((n, 3), dtype=bool)
+    for bc, nodes in model.bcs.items():
+        keys = [node.key for node in nodes if node.part is part]
+        fixed[keys] |= [bc.x, bc.y, bc.z]
+    return fixed
+
+
+def load_cases(step, part: DeformablePart) -> dict[str, numpy.ndarray]:
+    """Collect the node patterns of a step as nodal load arrays, per load case.
+
+    Parameters
+    ----------
+    step : :class:`compas_fea2.problem._Step`
+        The step with the load patterns.
+    part : :class:`compas_fea2.model.DeformablePart`
+        The part of the loaded nodes.
+
+    Returns
+    -------
+    dict[str, numpy.ndarray]
+        The (N, 3) nodal loads per load case, indexed by node key.
+        Patterns without load case are collected under ``"None"``.
+
+    Raises
+    ------
+    TypeError
+        If the step has load patterns that are not node load patterns.
+
+    """
+    n = len(part.nodes)
+    cases: dict[str, numpy.ndarray] = {}
+    for pattern in step.patterns:
+        if not isinstance(pattern, NodeLoadPattern):
+            raise TypeError(f"Load patterns of type {type(pattern).__name__} are not supported.")
+        loads = cases.setdefault(str(pattern.load_case), numpy.zeros((n, 3)))
+        keys = [node.key for node in pattern.nodes if node.part is part]
+        numpy.add.at(loads, keys, [pattern.x or 0.0, pattern.y or 0.0, pattern.z or 0.0])
+    return cases
+
+
+def write_opensees(model, step, part: DeformablePart, folder, stresses: bool = True, chunksize: int = 10_000) -> dict[str, pathlib.Path]:
+    """Write the OpenSees input file of a linear static step of a tetrahedral part, directly from arrays.
+
+    Parameters
+    ----------
+    model : :class:`compas_fea2.model.Model`
+        The model with the boundary conditions.
+    step : :class:`compas_fea2.problem._Step`
+        The step with the load patterns.
+        If the step has a load combination, the load cases are combined with its factors.
+    part : :class:`compas_fea2.model.DeformablePart`
+        A part with tetrahedral elements of one isotropic material,
+        preferably an :class:`knitcandela.parts.ArrayPart`.
+    folder : str | pathlib.Path
+        The folder of the input file and of the output files.
+    stresses : bool, optional
+        If True, record the element stresses.
+    chunksize : int, optional
+        The number of lines that are formatted at once.
+
+    Returns
+    -------
+    dict[str, pathlib.Path]
+        The input file under ``"input"``, and the output file per field.
+
+    Notes
+    -----
+    The material is written as stored by compas_fea2,
+    which converts quantities with units to plain numbers in the base units of their unit system.
+    With ``compas_fea2.units(system="SI_mm")``, these are N and mm, with the density in tonne/mm3.
+
+    """
+    folder = pathlib.Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    xyz, connectivity = _part_arrays(part)
+    material = _material(part)
+    cases = load_cases(step, part)
+    factors = step.combination.factors if step.combination else {name: 1.0 for name in cases}
+    loads = sum((factors.get(name, 0.0) * case for name, case in cases.items()), numpy.zeros((len(xyz), 3)))
+    filepath = folder / f"{step.name}.tcl"
+    with OpenSeesWriter(filepath, chunksize=chunksize) as writer:
+        writer.comment(f"{part.name} - {step.name}")
+        writer.model()
+        writer.nodes(xyz)
+        writer.material(1, material.E, material.v, material.density or 0.0)
+        writer.tetrahedra(connectivity[:, :4], material=1)
+        writer.fixes(_fixed(model, part, len(xyz)))
+        writer.pattern(1, loads)
+        files = writer.recorders(folder, nodes=len(xyz), elements=len(connectivity) if stresses else 0)
+        writer.static_analysis()
+    return {"input": filepath, **files}
+
+
+def store_opensees(files: dict[str, pathlib.Path], step, part: DeformablePart, path) -> ResultStore:
+    """Stream the output files of :func:`write_opensees` into a memory mapped result store.
+
+    Parameters
+    ----------
+    files : dict[str, pathlib.Path]
+        The files returned by :func:`write_opensees`.
+    step : :class:`compas_fea2.problem._Step`
+        The analysed step.
+    part : :class:`compas_fea2.model.DeformablePart`
+        The analysed part.
+    path : str | pathlib.Path
+        The folder of the result store.
+
+    Returns
+    -------
+    :class:`knitcandela.ResultStore`
+
+    """
+    store = ResultStore(path)
+    sizes = {"U": len(part.nodes), "RF": len(part.nodes), "S3D": len(part.elements)}
+    for field, filepath in files.items():
+        if field in sizes:
+            store_recorder(store, step.name, field, part.name, filepath, sizes[field])
+    return store
+
+
+def analyse_variant(model, problem, folder, fields: Optional[Iterable[str]] = None) -> ResultStore:
+    """Analyse a problem in a working directory of its own, and copy its results into a result store in the same directory.
+
+    This is the body of a task of :func:`knitcandela.run_variants`,
+    after the model of the variant is built.
+
+    Parameters
+    ----------
+    model : :class:`compas_fea2.model.Model`
+        The model of the variant.
+    problem : :class:`compas_fea2.problem.Problem`
+        The problem of the variant.
+    folder : str | pathlib.Path
+        The working directory of the variant.
+        The analysis files are written to ``folder / "analysis"``,
+        and the result store to ``folder / "results"``.
+    fields : Iterable[str], optional
+        The names of the fields to store.
+        Default is all fields.
+
+    Returns
+    -------
+    :class:`knitcandela.ResultStore`
+
+    Examples
+    --------
+    >>> def task(params, folder):
+    ...     model, problem = build(**params)
+    ...     store = analyse_variant(model, problem, folder, fields=["U", "RF"])
+    ...     return store_metrics(store, problem.steps_order[0].name)
+    >>> results = run_variants(task, {"E20": {"E": 20e3}, "E30": {"E": 30e3}}, "__temp/variants")
+
+    """
+    folder = pathlib.Path(folder)
+    model.analyse_and_extract(problems=[problem], path=str(folder / "analysis"))
+    return store_results(problem, folder / "results", fields=fields)
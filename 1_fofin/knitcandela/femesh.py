@@ -0,0 +1,221 @@
+from typing import Any
+from typing import NamedTuple
+
+import numpy
+from compas.datastructures import Mesh
+
+from .arrays import arrays_to_mesh
+
+# gmsh element type codes
+TRIANGLE = 2
+QUAD = 3
+TETRAHEDRON = 4
+
+# the faces of a tetrahedron, oriented outwards for positively oriented tetrahedra,
+# of which the fourth corner is on the side of the normal of the triangle of the first three
+TETRAHEDRON_FACES = numpy.array([[0, 2, 1], [0, 3, 2], [1, 2, 3], [0, 1, 3]])
+
+# the split of a hexahedron with corners ordered bottom then top, counterclockwise, into six tetrahedra around its diagonal 0-6
+# translated copies of the split are conforming on shared faces
+HEXAHEDRON_TETRAHEDRA = numpy.array([[0, 1, 2, 6], [0, 2, 3, 6], [0, 3, 7, 6], [0, 7, 4, 6], [0, 4, 5, 6], [0, 5, 1, 6]])
+
+
+class FEMesh(NamedTuple):
+    """Array representation of a finite element mesh.
+
+    Attributes
+    ----------
+    nodes : numpy.ndarray
+        The (N, 3) node coordinates.
+    tags : numpy.ndarray
+        The (N,) gmsh tags of the nodes.
+    triangles : numpy.ndarray
+        The (T, 3) node indices of the triangles.
+    quads : numpy.ndarray
+        The (Q, 4) node indices of the quads.
+    tetrahedra : numpy.ndarray
+        The (E, 4) node indices of the tetrahedra.
+
+    """
+
+    nodes: numpy.ndarray
+    tags: numpy.ndarray
+    triangles: numpy.ndarray
+    quads: numpy.ndarray
+    tetrahedra: numpy.ndarray
+
+    def faces(self) -> numpy.ndarray:
+        """Combine triangles and quads in one padded face array.
+
+        Returns
+        -------
+        numpy.ndarray
+            A (T + Q, K) int array, with the unused slot of triangles set to ``-1``.
+
+        """
+        if not len(self.quads):
+            return self.triangles
+        triangles = numpy.hstack([self.triangles, numpy.full((len(self.triangles), 1), -1, dtype=self.triangles.dtype)])
+        return numpy.vstack([triangles, self.quads])
+
+    def triangulated(self) -> numpy.ndarray:
+        """Combine triangles and quads in one triangle array, splitting every quad along its first diagonal.
+
+        Returns
+        -------
+        numpy.ndarray
+            A (T + 2Q, 3) int array.
+
+        """
+        return numpy.vstack([self.triangles, self.quads[:, [0, 1, 2]], self.quads[:, [0, 2, 3]]])
+
+    def boundary(self) -> numpy.ndarray:
+        """Compute the boundary triangles of the tetrahedra.
+
+        Returns
+        -------
+        numpy.ndarray
+            A (B, 3) int array of the tetrahedron faces that are not shared with another tetrahedron,
+            oriented outwards.
+
+        Notes
+        -----
+        The faces of negatively oriented tetrahedra are reversed,
+        such that the orientation does not depend on the corner order of the mesher.
+
+        """
+        faces = self.tetrahedra[:, TETRAHEDRON_FACES]
+        negative = self.signed_volumes() < 0
+        faces[negative] = faces[negative][:, :, ::-1]
+        faces = faces.reshape(-1, 3)
+        _, index, counts = numpy.unique(numpy.sort(faces, axis=1), axis=0, return_index=True, return_counts=True)
+        return faces[numpy.sort(index[counts == 1])]
+
+    def signed_volumes(self) -> numpy.ndarray:
+        """Compute the signed volumes of the tetrahedra.
+
+        Returns
+        -------
+        numpy.ndarray
+            A (E,) float array, positive for tetrahedra of which the fourth corner is on the side of the normal of the first three.
+
+        """
+        a, b, c, d = numpy.moveaxis(self.nodes[self.tetrahedra], 1, 0)
+        return numpy.einsum("ij,ij->i", b - a, numpy.cross(c - a, d - a)) / 6
+
+    def volumes(self) -> numpy.ndarray:
+        """Compute the volumes of the tetrahedra.
+
+        Returns
+        -------
+        numpy.ndarray
+            A (E,) float array.
+
+        """
+        return numpy.abs(self.signed_volumes())
+
+    def triangle_coordinates(self) -> numpy.ndarray:
+        """Compute the corner coordinates of the triangulated faces, for buffer based visualisation.
+
+        Returns
+        -------
+        numpy.ndarray
+            A (T + 2Q, 3, 3) float array.
+
+        """
+        return self.nodes[self.triangulated()]
+
+    def to_mesh(self) -> Mesh:
+        """Convert the faces to a COMPAS mesh.
+
+        Returns
+        -------
+        :class:`compas.datastructures.Mesh`
+
+        Notes
+        -----
+        If the mesh has no triangles or quads, the boundary of the tetrahedra is used.
+        Nodes that are not used by any face are not included.
+
+        """
+        faces = self.faces() if len(self.triangles) or len(self.quads) else self.boundary()
+        used = numpy.unique(faces[faces >= 0])
+        index = numpy.full(len(self.nodes), -1, dtype=numpy.int64)
+        index[used] = numpy.arange(len(used))
+        return arrays_to_mesh(self.nodes[used], numpy.where(faces >= 0, index[faces], -1))
+
+
+def femesh_from_gmsh(model: Any) -> FEMesh:
+    """Read the nodes and elements of the current mesh of a gmsh model directly into arrays.
+
+    Parameters
+    ----------
+    model : :class:`compas_gmsh.models.Model`
+        A model of which the mesh was generated with :meth:`generate_mesh`.
+
+    Returns
+    -------
+    :class:`FEMesh`
+
+    Notes
+    -----
+    This replaces :meth:`compas_gmsh.models.Model.mesh_to_compas` and :meth:`compas_gmsh.models.Model.mesh_to_tets`,
+    which construct a Python object per vertex and element.
+    Only linear triangles, quads and tetrahedra are exported.
+    Element types that are not present in the mesh result in empty arrays.
+
+    """
+    tags, coords, _ = model.mesh.get_nodes(returnParametricCoord=False)
+    tags = numpy.asarray(tags, dtype=numpy.int64)
+    nodes = numpy.asarray(coords, dtype=float).reshape(-1, 3)
+
+    # gmsh node tags are positive, but not necessarily contiguous
+    index = numpy.full(int(tags.max()) + 1 if len(tags) else 1, -1, dtype=numpy.int64)
+    index[tags] = numpy.arange(len(tags))
+
+    types = set(numpy.asarray(model.mesh.get_element_types()).tolist())
+
+    def elements(element_type: int, size: int) -> numpy.ndarray:
+        if element_type not in types:
+            return numpy.zeros((0, size), dtype=numpy.int64)
+        _, nodetags = model.mesh.get_elements_by_type(element_type)
+        return index[numpy.asarray(nodetags, dtype=numpy.int64).reshape(-1, size)]
+
+    return FEMesh(nodes, tags, elements(TRIANGLE, 3), elements(QUAD, 4), elements(TETRAHEDRON, 4))
+
+
+def femesh_box(size: tuple[float, float, float], divisions: tuple[int, int, int]) -> FEMesh:
+    """Construct a structured tetrahedral mesh of a box, for example as a stand-in for a gmsh mesh in benchmarks.
+
+    Parameters
+    ----------
+    size : tuple[float, float, float]
+        The dimensions of the box, with its minimum corner at the origin.
+    divisions : tuple[int, int, int]
+        The number of cells along every axis.
+        Every cell is split into six tetrahedra.
+
+    Returns
+    -------
+    :class:`FEMesh`
+        The mesh, with the boundary of the tetrahedra as triangles.
+
+    """
+    nx, ny, nz = divisions
+    x, y, z = numpy.meshgrid(*[numpy.linspace(0, length, n + 1) for length, n in zip(size, divisions)], indexing="ij")
+    nodes = numpy.stack([x.ravel(), y.ravel(), z.ravel()], axis=1)
+    index = numpy.arange(len(nodes)).reshape(nx + 1, ny + 1, nz + 1)
+    corners = [
+        index[:-1, :-1, :-1],
+        index[1:, :-1, :-1],
+        index[1:, 1:, :-1],
+        index[:-1, 1:, :-1],
+        index[:-1, :-1, 1:],
+        index[1:, :-1, 1:],
+        index[1:, 1:, 1:],
+        index[:-1, 1:, 1:],
+    ]
+    cells = numpy.stack(corners, axis=-1).reshape(-1, 8)
+    tetrahedra = cells[:, HEXAHEDRON_TETRAHEDRA].reshape(-1, 4)
+    femesh = FEMesh(nodes, numpy.arange(1, len(nodes) + 1), numpy.zeros((0, 3), dtype=numpy.int64), numpy.zeros((0, 4), dtype=numpy.int64), tetrahedra)
+    return femesh._replace(triangles=femesh.boundary())
@@ -0,0 +1,300 @@
+from typing import Iterable
+from typing import Optional
+
+import numpy
+import scipy.linalg
+import scipy.sparse
+import scipy.sparse.linalg
+from compas.datastructures import Mesh
+from compas_fd.constraints import Constraint
+from compas_fd.solvers.result import Result
+
+
+def connectivity_matrix(edges: numpy.ndarray, n: int) -> scipy.sparse.csr_matrix:
+    """Construct the sparse branch-node connectivity matrix of a set of edges.
+
+    Parameters
+    ----------
+    edges : numpy.ndarray
+        The (E, 2) vertex indices of the edges.
+    n : int
+        The number of vertices.
+
+    Returns
+    -------
+    scipy.sparse.csr_matrix
+        The (E, N) matrix, with ``-1`` at the start and ``+1`` at the end vertex of every edge.
+
+    """
+    edges = numpy.asarray(edges, dtype=numpy.int64).reshape(-1, 2)
+    rows = numpy.repeat(numpy.arange(len(edges)), 2)
+    data = numpy.tile([-1.0, 1.0], len(edges))
+    return scipy.sparse.csr_matrix((data, (rows, edges.ravel())), shape=(len(edges), n))
+
+
+class ForceDensity:
+    """Sparse force density form finding, with a factorization that is reused between solves.
+
+    The stiffness of the free vertices is factorized once.
+    Iterations of the constraints only change the right-hand side,
+    and changes of a few force densities are applied as a low-rank update of the factorization,
+    such that design iterations do not require a new factorization.
+
+    Parameters
+    ----------
+    vertices : numpy.ndarray
+        The (N, 3) start coordinates of the vertices.
+        The coordinates of the previous equilibrium are a warm start for the constraint iterations.
+    edges : numpy.ndarray
+        The (E, 2) vertex indices of the edges.
+    forcedensities : numpy.ndarray
+        The (E,) force densities of the edges.
+    fixed : Iterable[int]
+        The indices of the anchored vertices.
+    loads : numpy.ndarray, optional
+        The (N, 3) loads on the vertices.
+    constraints : dict[int, :class:`compas_fd.constraints.Constraint`], optional
+        The constraints of anchored vertices, per vertex index.
+        Constrained vertices are anchored in every solve,
+        and move along their constraint between solves.
+    maxrank : int, optional
+        The maximum number of edges with a modified force density before the stiffness is factorized again.
+
+    Attributes
+    ----------
+    xyz : numpy.ndarray
+        The current coordinates of the vertices.
+    q : numpy.ndarray
+        The current force densities of the edges.
+
+    """
+
+    def __init__(
+        self,
+        vertices: numpy.ndarray,
+        edges: numpy.ndarray,
+        forcedensities: numpy.ndarray,
+        fixed: Iterable[int],
+        loads: Optional[numpy.ndarray] = None,
+        constraints: Optional[dict[int, Constraint]] = None,
+        maxrank: int = 64,
+    ) -> None:
+        self.xyz = numpy.array(vertices, dtype=float).reshape(-1, 3)
+        self.edges = numpy.asarray(edges, dtype=numpy.int64).reshape(-1, 2)
+        self.q = numpy.array(forcedensities, dtype=float).reshape(-1)
+        self.loads = numpy.zeros_like(self.xyz) if loads is None else numpy.asarray(loads, dtype=float).reshape(-1, 3)
+        self.constraints = dict(constraints or {})
+        self.maxrank = maxrank
+
+        n = len(self.xyz)
+        anchored = numpy.zeros(n, dtype=bool)
+        anchored[numpy.fromiter(fixed, dtype=numpy.int64)] = True
+        anchored[list(self.constraints)] = True
+        self.fixed = numpy.flatnonzero(anchored)
+        self.free = numpy.flatnonzero(~anchored)
+
+        self.C = connectivity_matrix(self.edges, n)
+        self.Ci = self.C[:, self.free].tocsr()
+        self.Cf = self.C[:, self.fixed].tocsr()
+
+        self._q0: numpy.ndarray
+        self._lu = None
+        self._update: Optional[tuple] = None
+        self.factorize()
+
+    @classmethod
+    def from_cablemesh(cls, cablemesh: Mesh, start: Optional[Mesh] = None, **kwargs) -> "ForceDensity":
+        """Set up a force density solver for a cablemesh.
+
+        Parameters
+        ----------
+        cablemesh : :class:`compas.datastructures.Mesh`
+            The cablemesh, with its current vertex coordinates as start geometry,
+            the force densities as edge attribute ``"q"`` (default ``1.0``),
+            the loads as vertex attributes ``"px"``, ``"py"``, ``"pz"`` (default ``0.0``),
+            the anchors as vertex attribute ``"is_anchor"`` or ``"is_support"``,
+            and the constraints as vertex attribute ``"constraint"``.
+        start : :class:`compas.datastructures.Mesh`, optional
+            A cablemesh with the same vertices, for example the form found cablemesh of the previous session,
+            of which the coordinates replace the coordinates of the cablemesh as start geometry.
+            It is ignored if its vertices differ.
+        **kwargs : dict, optional
+            Additional parameters of the solver.
+
+        Returns
+        -------
+        :class:`ForceDensity`
+
+        Notes
+        -----
+        The vertices are renumbered to consecutive indices in the order of ``cablemesh.vertices()``,
+        and the edges are ordered as ``cablemesh.edges()``.
+
+        """
+        vertex_index = cablemesh.vertex_index()
+        vertices = cablemesh.vertices_attributes("xyz")
+        if start is not None and list(start.vertices()) == list(cablemesh.vertices()):
+            vertices = start.vertices_attributes("xyz")
+        edges = [(vertex_index[u], vertex_index[v]) for u, v in cablemesh.edges()]
+        q = [1.0 if value is None else value for value in cablemesh.edges_attribute("q")]
+        loads = [[value or 0.0 for value in load] for load in cablemesh.vertices_attributes(["px", "py", "pz"])]
+        fixed = [vertex_index[vertex] for vertex in cablemesh.vertices() if cablemesh.vertex_attribute(vertex, "is_anchor") or cablemesh.vertex_attribute(vertex, "is_support")]
+        constraints = {}
+        for vertex in cablemesh.vertices():
+            constraint = cablemesh.vertex_attribute(vertex, "constraint")
+            if constraint is not None:
+                constraints[vertex_index[vertex]] = constraint if isinstance(constraint, Constraint) else Constraint(constraint)
+        return cls(vertices, edges, q, fixed, loads=loads, constraints=constraints, **kwargs)
+
+    # =============================================================================
+    # Factorization
+    # =============================================================================
+
+    def factorize(self) -> None:
+        """Factorize the stiffness of the free vertices for the current force densities.
+
+        Returns
+        -------
+        None
+
+        """
+        A = (self.Ci.T @ scipy.sparse.diags(self.q) @ self.Ci).tocsc()
+        self._lu = scipy.sparse.linalg.splu(A, permc_spec="MMD_AT_PLUS_A", diag_pivot_thresh=0.0, options={"SymmetricMode": True})
+        self._q0 = self.q.copy()
+        self._update = None
+
+    def set_forcedensities(self, edges: Iterable[int], forcedensities: Iterable[float]) -> None:
+        """Modify the force densities of a subset of the edges.
+
+        Parameters
+        ----------
+        edges : Iterable[int]
+            The indices of the edges.
+        forcedensities : Iterable[float]
+            The new force densities.
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        If the force densities of at most :attr:`maxrank` edges differ from those of the factorization,
+        the modification is a rank-k update of the stiffness,
+        and the next solve uses the existing factorization with the Woodbury identity,
+        at the cost of k additional substitutions here.
+        Otherwise, the stiffness is factorized again.
+
+        """
+        self.q[numpy.fromiter(edges, dtype=numpy.int64)] = numpy.fromiter(forcedensities, dtype=float)
+        changed = numpy.flatnonzero(self.q != self._q0)
+        if len(changed) > self.maxrank:
+            self.factorize()
+            return
+        if not len(changed):
+            self._update = None
+            return
+        # A = A0 + Ck^T D Ck
+        # A^-1 b = y - W (I + D Ck W)^-1 D Ck y, with y = A0^-1 b and W = A0^-1 Ck^T
+        Ck = self.Ci[changed]
+        D = self.q[changed] - self._q0[changed]
+        W = self._lu.solve(Ck.T.toarray())
+        S = numpy.eye(len(changed)) + D[:, None] * (Ck @ W)
+        self._update = (Ck, D, W, scipy.linalg.lu_factor(S))
+
+    def _solve_free(self, b: numpy.ndarray) -> numpy.ndarray:
+        y = self._lu.solve(b)
+        if self._update is not None:
+            Ck, D, W, S = self._update
+            y = y - W @ scipy.linalg.lu_solve(S, D[:, None] * (Ck @ y))
+        return y
+
+    # =============================================================================
+    # Solve
+    # =============================================================================
+
+    def residuals(self, xyz: Optional[numpy.ndarray] = None) -> numpy.ndarray:
+        """Compute the residual forces at the vertices.
+
+        Parameters
+        ----------
+        xyz : numpy.ndarray, optional
+            The (N, 3) vertex coordinates.
+            Default is the current coordinates.
+
+        Returns
+        -------
+        numpy.ndarray
+            The (N, 3) residuals, which are the reactions at the anchored vertices.
+
+        """
+        xyz = self.xyz if xyz is None else xyz
+        return self.loads - self.C.T @ (self.q[:, None] * (self.C @ xyz))
+
+    def solve(self, kmax: int = 100, tol_res: float = 1e-3, tol_disp: float = 1e-3, damping: float = 0.1) -> Result:
+        """Compute the equilibrium geometry for the current force densities, loads and anchors.
+
+        Parameters
+        ----------
+        kmax : int, optional
+            The maximum number of constraint iterations.
+        tol_res : float, optional
+            The tolerance for the tangential residual at the constrained vertices.
+        tol_disp : float, optional
+            The tolerance for the displacement of the vertices between two iterations.
+        damping : float, optional
+            The damping of the movement of constrained vertices along their constraint.
+
+        Returns
+        -------
+        :class:`compas_fd.solvers.result.Result`
+            The vertex coordinates, residuals, forces and lengths.
+            The coordinates are also stored in :attr:`xyz` as start geometry of the next solve.
+
+        Notes
+        -----
+        The constraint iterations follow :func:`compas_fd.solvers.fd_constrained_numpy`,
+        but every iteration is a substitution with the existing factorization instead of a new sparse solve.
+
+        """
+        xyz = self.xyz
+        residuals = self.residuals()
+        for _ in range(kmax):
+            previous = xyz.copy()
+            b = self.loads[self.free] - self.Ci.T @ (self.q[:, None] * (self.Cf @ xyz[self.fixed]))
+            xyz[self.free] = self._solve_free(b)
+            residuals = self.residuals()
+            if not self.constraints:
+                break
+            tangents = []
+            for vertex, constraint in self.constraints.items():
+                constraint.location = xyz[vertex]
+                constraint.residual = residuals[vertex]
+                constraint.update(damping=damping)
+                xyz[vertex] = constraint.location
+                tangents.append(constraint.tangent)
+            converged = numpy.linalg.norm(numpy.asarray(tangents, dtype=float), axis=1).max() < tol_res
+            if converged and numpy.linalg.norm(xyz - previous, axis=1).max() < tol_disp:
+                break
+        lengths = numpy.linalg.norm(self.C @ xyz, axis=1)
+        return Result(xyz.copy(), residuals, self.q * lengths, lengths)
+
+    def update_cablemesh(self, cablemesh: Mesh, result: Result) -> None:
+        """Write a form finding result to the cablemesh of which the solver was created.
+
+        Parameters
+        ----------
+        cablemesh : :class:`compas.datastructures.Mesh`
+            The cablemesh.
+        result : :class:`compas_fd.solvers.result.Result`
+            The result of :meth:`solve`.
+
+        Returns
+        -------
+        None
+
+        """
+        for vertex, xyz, residual in zip(cablemesh.vertices(), result.vertices.tolist(), result.residuals.tolist()):
+            cablemesh.vertex_attributes(vertex, ["x", "y", "z", "_rx", "_ry", "_rz"], xyz + residual)
+        for edge, q, force, length in zip(cablemesh.edges(), self.q.tolist(), result.forces.tolist(), result.lengths.tolist()):
+            cablemesh.edge_attributes(edge, ["q", "_f", "_l"], [q, force, length])
@@ -0,0 +1,431 @@
+"""Parallel volumetric meshing with gmsh.
+
+Importing gmsh loads the complete gmsh library,
+which the geometry stages of the pipeline do not need.
+Import this module explicitly as ``knitcandela.meshing``.
+
+"""
+
+import multiprocessing
+import pathlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from typing import Union
+
+import gmsh  # type: ignore
+import numpy
+from compas_gmsh.models import MeshModel
+
+from .adaptivity import element_sizes
+from .femesh import TETRAHEDRON
+from .femesh import TRIANGLE
+from .femesh import FEMesh
+from .femesh import femesh_from_gmsh
+from .waffle import patch_bounds
+
+# ==============================================================================
+# Workers
+# ==============================================================================
+
+
+def _init_worker() -> None:
+    gmsh.initialize()
+    gmsh.option.set_number("General.Terminal", 0)
+
+
+def _mesh_volume(task: tuple) -> tuple[numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    tags, coords, triangles, meshsize_min, meshsize_max, background = task
+
+    gmsh.clear()
+    gmsh.model.add("subdomain")
+
+    # the boundary of the subdomain is one discrete surface with a fixed mesh
+    # the tetrahedra are generated inside it without modifying the boundary triangles
+    surface = gmsh.model.add_discrete_entity(2)
+    gmsh.model.mesh.add_nodes(2, surface, tags, coords.ravel())
+    gmsh.model.mesh.add_elements_by_type(surface, TRIANGLE, [], triangles.ravel())
+    gmsh.model.add_discrete_entity(3, -1, [surface])
+
+    if meshsize_min:
+        gmsh.option.set_number("Mesh.MeshSizeMin", meshsize_min)
+    if meshsize_max:
+        gmsh.option.set_number("Mesh.MeshSizeMax", meshsize_max)
+    if background is not None:
+        _background_field(background)
+
+    gmsh.model.mesh.generate(3)
+
+    nodetags, nodecoords, _ = gmsh.model.mesh.get_nodes(returnParametricCoord=False)
+    _, tetrahedra = gmsh.model.mesh.get_elements_by_type(TETRAHEDRON)
+    return numpy.asarray(nodetags, dtype=numpy.int64), numpy.asarray(nodecoords, dtype=float).reshape(-1, 3), numpy.asarray(tetrahedra, dtype=numpy.int64).reshape(-1, 4)
+
+
+def _background_field(background: numpy.ndarray) -> tuple[int, int]:
+    # the target sizes are a post-processing view of scalar tetrahedra
+    # with per element the X, Y and Z coordinates of the four corners, followed by the four values
+    view = gmsh.view.add("sizes")
+    gmsh.view.add_list_data(view, "SS", len(background), background.ravel().tolist())
+    field = gmsh.model.mesh.field.add("PostView")
+    gmsh.model.mesh.field.set_number(field, "ViewTag", view)
+    gmsh.model.mesh.field.set_as_background_mesh(field)
+    return view, field
+
+
+# ==============================================================================
+# Decomposition
+# ==============================================================================
+
+
+def _decompose(model: MeshModel, patches: tuple[int, int]) -> list[tuple[int, int]]:
+    volumes = model.model.get_entities(3)
+    xmin, ymin, zmin, xmax, ymax, zmax = model.model.get_bounding_box(-1, -1)
+
+    boxes = []
+    for (x0, y0, z0), (x1, y1, z1) in patch_bounds(numpy.array([[xmin, ymin, zmin], [xmax, ymax, zmax]]), patches):
+        boxes.append((3, model.occ.add_box(x0, y0, z0, x1 - x0, y1 - y0, z1 - z0)))
+
+    # fragmenting makes the faces between neighbouring subdomains shared entities
+    # which therefore get one and the same surface mesh
+    _, parents = model.occ.fragment(volumes, boxes)
+
+    pieces = set()
+    for dimtags in parents[: len(volumes)]:
+        pieces.update(dimtags)
+    model.occ.remove([dimtag for dimtags in parents[len(volumes) :] for dimtag in dimtags if dimtag not in pieces], recursive=True)
+    model.occ.synchronize()
+    return sorted(pieces)
+
+
+def _subdomain_tasks(
+    model: MeshModel,
+    pieces: list[tuple[int, int]],
+    meshsize_min: Optional[float],
+    meshsize_max: Optional[float],
+) -> tuple[list[tuple], numpy.ndarray, numpy.ndarray, numpy.ndarray]:
+    nodetags, nodecoords, _ = model.mesh.get_nodes(returnParametricCoord=False)
+    nodetags = numpy.asarray(nodetags, dtype=numpy.int64)
+    nodecoords = numpy.asarray(nodecoords, dtype=float).reshape(-1, 3)
+    index = numpy.full(int(nodetags.max()) + 1, -1, dtype=numpy.int64)
+    index[nodetags] = numpy.arange(len(nodetags))
+
+    surface_triangles = {}
+    surface_count: dict[int, int] = {}
+    tasks = []
+    for piece in pieces:
+        surfaces = [tag for _, tag in model.model.get_boundary([piece], combined=False, oriented=False)]
+        for surface in surfaces:
+            if surface not in surface_triangles:
+                _, triangles = model.mesh.get_elements_by_type(TRIANGLE, surface)
+                surface_triangles[surface] = numpy.asarray(triangles, dtype=numpy.int64).reshape(-1, 3)
+            surface_count[surface] = surface_count.get(surface, 0) + 1
+        triangles = numpy.vstack([surface_triangles[surface] for surface in surfaces])
+        tags = numpy.unique(triangles)
+        tasks.append((tags, nodecoords[index[tags]], triangles, meshsize_min, meshsize_max, None))
+
+    # triangles of surfaces that belong to one subdomain only are on the boundary of the complete mesh
+    exterior = [surface_triangles[surface] for surface, count in surface_count.items() if count == 1]
+    exterior = numpy.vstack(exterior) if exterior else numpy.zeros((0, 3), dtype=numpy.int64)
+    return tasks, nodetags, nodecoords, exterior
+
+
+def _merge(results: list[tuple], tasks: list[tuple], nodetags: numpy.ndarray, nodecoords: numpy.ndarray, exterior: numpy.ndarray) -> FEMesh:
+    index = numpy.full(int(nodetags.max()) + 1, -1, dtype=numpy.int64)
+    index[nodetags] = numpy.arange(len(nodetags))
+
+    nodes = [nodecoords]
+    tags = [nodetags]
+    tetrahedra = []
+    count = len(nodetags)
+    nexttag = int(nodetags.max()) + 1
+
+    for (localtags, localcoords, localtets), task in zip(results, tasks):
+        # boundary nodes keep the tags of the shared surface mesh
+        # nodes created inside the subdomain get new global indices and tags
+        new = ~numpy.isin(localtags, task[0])
+        lookup = numpy.full(int(localtags.max()) + 1, -1, dtype=numpy.int64)
+        lookup[localtags[~new]] = index[localtags[~new]]
+        lookup[localtags[new]] = numpy.arange(count, count + new.sum())
+        nodes.append(localcoords[new])
+        tags.append(numpy.arange(nexttag, nexttag + new.sum()))
+        tetrahedra.append(lookup[localtets])
+        count += int(new.sum())
+        nexttag += int(new.sum())
+
+    return FEMesh(
+        numpy.vstack(nodes),
+        numpy.concatenate(tags),
+        index[exterior],
+        numpy.zeros((0, 4), dtype=numpy.int64),
+        numpy.vstack(tetrahedra) if tetrahedra else numpy.zeros((0, 4), dtype=numpy.int64),
+    )
+
+
+# ==============================================================================
+# Meshing
+# ==============================================================================
+
+
+def femesh_serial(filepath: Union[str, pathlib.Path], meshsize_max: Optional[float] = None, meshsize_min: Optional[float] = None) -> FEMesh:
+    """Mesh the volume of a STEP file with tetrahedra, in one gmsh model.
+
+    Parameters
+    ----------
+    filepath : str | pathlib.Path
+        The path of the STEP file.
+    meshsize_max : float, optional
+        The maximum size of the elements.
+    meshsize_min : float, optional
+        The minimum size of the elements.
+
+    Returns
+    -------
+    :class:`knitcandela.FEMesh`
+
+    """
+    model = MeshModel.from_step(str(filepath))
+    if meshsize_max:
+        model.options.mesh.meshsize_max = meshsize_max
+    if meshsize_min:
+        model.options.mesh.meshsize_min = meshsize_min
+    model.generate_mesh(3)
+    femesh = femesh_from_gmsh(model)
+    model.destroy()
+    return femesh
+
+
+def femesh_parallel(
+    filepath: Union[str, pathlib.Path],
+    meshsize_max: Optional[float] = None,
+    meshsize_min: Optional[float] = None,
+    patches: tuple[int, int] = (4, 4),
+    processes: Optional[int] = None,
+) -> FEMesh:
+    """Mesh the volume of a STEP file with tetrahedra, subdomain by subdomain, in a process pool.
+
+    The solid is split into a regular grid of subdomains in the XY plane.
+    The surfaces of all subdomains, including the interfaces between them, are meshed once, in the main process.
+    The tetrahedra of the subdomains are generated in parallel, inside the fixed surface meshes,
+    such that neighbouring subdomains have exactly the same nodes and triangles on their interface.
+
+    Parameters
+    ----------
+    filepath : str | pathlib.Path
+        The path of the STEP file.
+    meshsize_max : float, optional
+        The maximum size of the elements.
+    meshsize_min : float, optional
+        The minimum size of the elements.
+    patches : tuple[int, int], optional
+        The number of subdomains in the X and Y direction.
+    processes : int, optional
+        The number of worker processes.
+        Default is the number of CPUs.
+
+    Returns
+    -------
+    :class:`knitcandela.FEMesh`
+        One conforming mesh.
+        The triangles are the boundary of the complete solid, without the interfaces between the subdomains.
+
+    Notes
+    -----
+    The ribs of the waffle are not aligned with the axes.
+    The cuts between the subdomains therefore pass through ribs and shell alike.
+
+    See Also
+    --------
+    :func:`femesh_serial`
+
+    """
+    model = MeshModel.from_step(str(filepath))
+    if meshsize_max:
+        model.options.mesh.meshsize_max = meshsize_max
+    if meshsize_min:
+        model.options.mesh.meshsize_min = meshsize_min
+
+    pieces = _decompose(model, patches)
+    model.generate_mesh(2)
+    tasks, nodetags, nodecoords, exterior = _subdomain_tasks(model, pieces, meshsize_min, meshsize_max)
+    model.destroy()
+
+    # gmsh keeps global state and runs threads of its own
+    # worker processes are therefore started fresh instead of forked
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context, initializer=_init_worker) as executor:
+        results = list(executor.map(_mesh_volume, tasks))
+
+    return _merge(results, tasks, nodetags, nodecoords, exterior)
+
+
+# ==============================================================================
+# Adaptive refinement
+# ==============================================================================
+
+
+def _size_view(nodes: numpy.ndarray, tetrahedra: numpy.ndarray, sizes: numpy.ndarray) -> numpy.ndarray:
+    corners = numpy.swapaxes(nodes[tetrahedra], 1, 2).reshape(-1, 12)
+    return numpy.hstack([corners, numpy.repeat(sizes[:, None], 4, axis=1)])
+
+
+class AdaptiveMesher:
+    """Volume mesher of a STEP file by subdomains, that refines selected regions and keeps all other subdomains identical.
+
+    The solid is split into subdomains as in :func:`femesh_parallel`, and all subdomains are meshed once.
+    :meth:`refine` meshes only the subdomains with elements that are too large again,
+    with the target sizes as a gmsh background field.
+    The surfaces and curves of the model that are shared with other subdomains keep their mesh,
+    such that the tetrahedra of all other subdomains stay exactly the same.
+
+    Parameters
+    ----------
+    filepath : str | pathlib.Path
+        The path of the STEP file.
+    meshsize_max : float
+        The maximum size of the elements, and the size of the initial mesh.
+    meshsize_min : float, optional
+        The minimum size of the elements.
+    patches : tuple[int, int], optional
+        The number of subdomains in the X and Y direction.
+    processes : int, optional
+        The number of worker processes.
+        Default is the number of CPUs.
+
+    Notes
+    -----
+    The gmsh model stays open until :meth:`close` is called,
+    or until the end of the ``with`` block if the mesher is used as a context manager.
+
+    Examples
+    --------
+    >>> with AdaptiveMesher("waffle.stp", meshsize_max=600) as mesher:
+    ...     femesh, subdomains = mesher.femesh()
+    ...     sizes = element_sizes(femesh.nodes, femesh.tetrahedra)
+    ...     mesher.refine(femesh, subdomains, numpy.where(marked, sizes / 2, sizes))
+    ...     femesh, subdomains = mesher.femesh()
+
+    """
+
+    def __init__(
+        self,
+        filepath: Union[str, pathlib.Path],
+        meshsize_max: float,
+        meshsize_min: Optional[float] = None,
+        patches: tuple[int, int] = (4, 4),
+        processes: Optional[int] = None,
+    ) -> None:
+        self.meshsize_max = meshsize_max
+        self.meshsize_min = meshsize_min
+        self.processes = processes
+
+        self.model = MeshModel.from_step(str(filepath))
+        self.model.options.mesh.meshsize_max = meshsize_max
+        if meshsize_min:
+            self.model.options.mesh.meshsize_min = meshsize_min
+
+        self.pieces = _decompose(self.model, patches)
+        self.surfaces = [[tag for _, tag in self.model.model.get_boundary([piece], combined=False, oriented=False)] for piece in self.pieces]
+        self.model.generate_mesh(2)
+
+        self._tasks: list[tuple] = []
+        self._results: list[tuple] = [()] * len(self.pieces)
+        self._mesh_pieces({index: None for index in range(len(self.pieces))})
+
+    def __enter__(self) -> "AdaptiveMesher":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Close the gmsh model.
+
+        Returns
+        -------
+        None
+
+        """
+        self.model.destroy()
+
+    def _mesh_pieces(self, backgrounds: dict[int, Optional[numpy.ndarray]]) -> None:
+        self._tasks, self._nodetags, self._nodecoords, self._exterior = _subdomain_tasks(self.model, self.pieces, self.meshsize_min, self.meshsize_max)
+        jobs = [self._tasks[index][:5] + (background,) for index, background in backgrounds.items()]
+
+        # gmsh keeps global state and runs threads of its own
+        # worker processes are therefore started fresh instead of forked
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=self.processes, mp_context=context, initializer=_init_worker) as executor:
+            results = list(executor.map(_mesh_volume, jobs))
+
+        for index, result in zip(backgrounds, results):
+            self._results[index] = result
+
+    def femesh(self) -> tuple[FEMesh, numpy.ndarray]:
+        """Merge the meshes of the subdomains into one conforming mesh.
+
+        Returns
+        -------
+        tuple[:class:`knitcandela.FEMesh`, numpy.ndarray]
+            The mesh, and the (T,) subdomain of every tetrahedron.
+
+        """
+        femesh = _merge(self._results, self._tasks, self._nodetags, self._nodecoords, self._exterior)
+        subdomains = numpy.repeat(numpy.arange(len(self.pieces)), [len(result[2]) for result in self._results])
+        return femesh, subdomains
+
+    def refine(self, femesh: FEMesh, subdomains: numpy.ndarray, sizes: numpy.ndarray) -> list[int]:
+        """Mesh the subdomains with elements that are larger than their target size again.
+
+        Parameters
+        ----------
+        femesh : :class:`knitcandela.FEMesh`
+            The current mesh, as returned by :meth:`femesh`.
+        subdomains : numpy.ndarray
+            The (T,) subdomain of every tetrahedron, as returned by :meth:`femesh`.
+        sizes : numpy.ndarray
+            The (T,) target size of every tetrahedron, for example half the current size of the flagged elements,
+            and the current size of all others.
+
+        Returns
+        -------
+        list[int]
+            The subdomains that were meshed again.
+
+        Notes
+        -----
+        The surfaces and curves that only belong to refined subdomains are meshed again with the target sizes.
+        Interfaces with subdomains that are not refined keep their surface mesh,
+        such that the refinement fades out towards those interfaces.
+
+        """
+        current = element_sizes(femesh.nodes, femesh.tetrahedra)
+        if self.meshsize_min:
+            sizes = numpy.maximum(sizes, self.meshsize_min)
+        flagged = sorted(set(numpy.unique(subdomains[sizes < current]).tolist()))
+        if not flagged:
+            return []
+
+        owners: dict[int, set[int]] = {}
+        for index, surfaces in enumerate(self.surfaces):
+            for surface in surfaces:
+                owners.setdefault(surface, set()).add(index)
+        surfaces = [surface for surface, pieces in owners.items() if pieces <= set(flagged)]
+        curves = set()
+        for surface in surfaces:
+            curves.update(tag for _, tag in self.model.model.get_boundary([(2, surface)], combined=False, oriented=False))
+        curves = [curve for curve in sorted(curves) if set(self.model.model.get_adjacencies(1, curve)[0]) <= set(surfaces)]
+
+        # only the cleared entities are meshed again
+        # every other surface and curve keeps its nodes and elements
+        mask = numpy.isin(subdomains, flagged)
+        background = _size_view(femesh.nodes, femesh.tetrahedra[mask], sizes[mask])
+        self.model.mesh.clear([(2, surface) for surface in surfaces])
+        self.model.mesh.clear([(1, curve) for curve in curves])
+        view, field = _background_field(background)
+        self.model.options.mesh.mesh_only_empty = True
+        self.model.generate_mesh(2)
+        self.model.options.mesh.mesh_only_empty = False
+        gmsh.model.mesh.field.remove(field)
+        gmsh.view.remove(view)
+
+        self._mesh_pieces({index: _size_view(femesh.nodes, femesh.tetrahedra[subdomains == index], sizes[subdomains == index]) for index in flagged})
+        return flagged
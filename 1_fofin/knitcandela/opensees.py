@@ -0,0 +1,432 @@
+import io
+import os
+import pathlib
+from typing import Iterator
+from typing import Optional
+from typing import Union
+
+import numpy
+
+from .results import ResultStore
+
+# the number of values of the node and element recorders per node or element
+RECORDER_COMPONENTS = {"U": 3, "RF": 3, "S3D": 6}
+
+# the order of the stress components of the stress recorder of FourNodeTetrahedron elements
+STRESS_COLUMNS_OPENSEES = ["S11", "S22", "S33", "S12", "S23", "S13"]
+
+
+def _write_block(f: io.TextIOBase, template: str, columns: list[numpy.ndarray], chunksize: int, offsets: Optional[list[int]] = None, tags: bool = True) -> int:
+    # every chunk is assembled and formatted with a single string operation, instead of one per line
+    # such that only one chunk of lines is in memory at once
+    n = len(columns[0])
+    offsets = offsets or [0] * len(columns)
+    size = 0
+    for start in range(0, n, chunksize):
+        stop = min(n, start + chunksize)
+        chunk = [column[start:stop].reshape(stop - start, -1) + offset for column, offset in zip(columns, offsets)]
+        if tags:
+            chunk.insert(0, numpy.arange(start + 1, stop + 1).reshape(-1, 1))
+        values = numpy.hstack(chunk) if len(chunk) > 1 else chunk[0]
+        size += f.write((template * (stop - start)) % tuple(values.ravel().tolist()))
+    return size
+
+
+class OpenSeesWriter:
+    """Buffered writer of OpenSees Tcl input files, formatting nodes, elements, supports and loads in blocks from arrays.
+
+    Node and element tags are the keys plus one.
+    The arrays are formatted in chunks of a fixed number of lines,
+    such that memory use is bounded by the chunk size, and not by the size of the model.
+
+    Parameters
+    ----------
+    filepath : str | pathlib.Path
+        The path of the input file.
+    chunksize : int, optional
+        The number of lines that are formatted at once.
+    precision : int, optional
+        The number of significant digits of floating point values.
+    buffering : int, optional
+        The size of the write buffer of the file, in bytes.
+
+    Examples
+    --------
+    >>> with OpenSeesWriter("model.tcl") as writer:
+    ...     writer.model()
+    ...     writer.nodes(xyz)
+    ...     writer.material(1, E=30e3, v=0.17)
+    ...     writer.tetrahedra(tetrahedra, material=1)
+    ...     writer.fixes(supports)
+    ...     writer.pattern(1, loads)
+    ...     writer.recorders(folder, nodes=len(xyz), elements=len(tetrahedra))
+    ...     writer.static_analysis()
+
+    """
+
+    def __init__(self, filepath: Union[str, pathlib.Path], chunksize: int = 10_000, precision: int = 12, buffering: int = 1 << 20) -> None:
+        self.filepath = pathlib.Path(filepath)
+        self.chunksize = chunksize
+        self.precision = precision
+        self.size = 0
+        self._file = open(self.filepath, "w", buffering=buffering)
+
+    def __enter__(self) -> "OpenSeesWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Flush the buffer and close the file.
+
+        Returns
+        -------
+        None
+
+        """
+        self._file.close()
+
+    @property
+    def _float(self) -> str:
+        return f"%.{self.precision}g"
+
+    def write(self, text: str) -> None:
+        """Write literal text, for commands that are not generated from arrays.
+
+        Parameters
+        ----------
+        text : str
+
+        Returns
+        -------
+        None
+
+        """
+        self.size += self._file.write(text)
+
+    def comment(self, text: str) -> None:
+        """Write a comment line.
+
+        Parameters
+        ----------
+        text : str
+
+        Returns
+        -------
+        None
+
+        """
+        self.write(f"# {text}\n")
+
+    def model(self, ndm: int = 3, ndf: int = 3) -> None:
+        """Write the model builder command.
+
+        Parameters
+        ----------
+        ndm : int, optional
+            The number of dimensions.
+        ndf : int, optional
+            The number of degrees of freedom per node.
+
+        Returns
+        -------
+        None
+
+        """
+        self.write(f"wipe\nmodel BasicBuilder -ndm {ndm} -ndf {ndf}\n")
+
+    def nodes(self, xyz: numpy.ndarray) -> None:
+        """Write the node block.
+
+        Parameters
+        ----------
+        xyz : numpy.ndarray
+            The (N, 3) node coordinates, indexed by node key.
+
+        Returns
+        -------
+        None
+
+        """
+        xyz = numpy.asarray(xyz, dtype=float).reshape(-1, 3)
+        f = self._float
+        self.size += _write_block(self._file, f"node %d {f} {f} {f}\n", [xyz], self.chunksize)
+
+    def material(self, tag: int, E: float, v: float, density: float = 0.0) -> None:
+        """Write an isotropic elastic material for solid elements.
+
+        Parameters
+        ----------
+        tag : int
+            The tag of the material.
+        E : float
+            The Young's modulus.
+        v : float
+            The Poisson ratio.
+        density : float, optional
+            The density.
+
+        Returns
+        -------
+        None
+
+        """
+        f = self._float
+        self.write(f"nDMaterial ElasticIsotropic %d {f} {f} {f}\n" % (tag, E, v, density))
+
+    def tetrahedra(self, tetrahedra: numpy.ndarray, material: Union[int, numpy.ndarray]) -> None:
+        """Write the element block of linear tetrahedra.
+
+        Parameters
+        ----------
+        tetrahedra : numpy.ndarray
+            The (E, 4) node keys of the tetrahedra, indexed by element key.
+        material : int | numpy.ndarray
+            The tag of the material of all elements, or the (E,) tags per element.
+
+        Returns
+        -------
+        None
+
+        """
+        tetrahedra = numpy.asarray(tetrahedra, dtype=numpy.int64).reshape(-1, 4)
+        material = numpy.broadcast_to(numpy.asarray(material, dtype=numpy.int64), (len(tetrahedra),))
+        # node tags are keys plus one
+        self.size += _write_block(self._file, "element FourNodeTetrahedron %d %d %d %d %d %d\n", [tetrahedra, material], self.chunksize, offsets=[1, 0])
+
+    def fixes(self, fixed: numpy.ndarray) -> None:
+        """Write the supports.
+
+        Parameters
+        ----------
+        fixed : numpy.ndarray
+            The (N, 3) boolean mask of the supported translations, indexed by node key.
+
+        Returns
+        -------
+        None
+
+        """
+        fixed = numpy.asarray(fixed, dtype=bool).reshape(-1, 3)
+        keys = numpy.flatnonzero(fixed.any(axis=1))
+        self.size += _write_block(self._file, "fix %d %d %d %d\n", [keys + 1, fixed[keys].astype(numpy.int64)], self.chunksize, tags=False)
+
+    def pattern(self, tag: int, loads: numpy.ndarray) -> None:
+        """Write a plain load pattern with a linear time series, with the loaded nodes only.
+
+        Parameters
+        ----------
+        tag : int
+            The tag of the pattern and its time series.
+        loads : numpy.ndarray
+            The (N, 3) nodal loads, indexed by node key.
+
+        Returns
+        -------
+        None
+
+        """
+        loads = numpy.asarray(loads, dtype=float).reshape(-1, 3)
+        keys = numpy.flatnonzero(loads.any(axis=1))
+        f = self._float
+        self.write(f"timeSeries Linear {tag}\npattern Plain {tag} {tag} {{\n")
+        self.size += _write_block(self._file, f"    load %d {f} {f} {f}\n", [keys + 1, loads[keys]], self.chunksize, tags=False)
+        self.write("}\n")
+
+    def recorders(self, folder: Union[str, pathlib.Path], nodes: int, elements: int = 0) -> dict[str, pathlib.Path]:
+        """Write recorders of displacements, reactions and, optionally, element stresses.
+
+        Parameters
+        ----------
+        folder : str | pathlib.Path
+            The folder of the output files.
+        nodes : int
+            The number of nodes.
+        elements : int, optional
+            The number of tetrahedra.
+            If zero, no stresses are recorded.
+
+        Returns
+        -------
+        dict[str, pathlib.Path]
+            The output file per field.
+
+        """
+        folder = pathlib.Path(folder)
+        files = {"U": folder / "U.out", "RF": folder / "RF.out"}
+        self.write(f'recorder Node -file "{files["U"].as_posix()}" -nodeRange 1 {nodes} -dof 1 2 3 disp\n')
+        self.write(f'recorder Node -file "{files["RF"].as_posix()}" -nodeRange 1 {nodes} -dof 1 2 3 reaction\n')
+        if elements:
+            files["S3D"] = folder / "S3D.out"
+            self.write(f'recorder Element -file "{files["S3D"].as_posix()}" -eleRange 1 {elements} stresses\n')
+        return files
+
+    def static_analysis(self, system: str = "UmfPack") -> None:
+        """Write a linear static analysis of one step, followed by a recording of the reactions.
+
+        Parameters
+        ----------
+        system : str, optional
+            The linear system solver.
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        The recorders write one row after the analysis, and another one after the reactions have been computed.
+        The results are in the last row.
+
+        """
+        self.write(f"constraints Plain\nnumberer RCM\nsystem {system}\ntest NormDispIncr 1e-8 10\nalgorithm Linear\n")
+        self.write("integrator LoadControl 1.0\nanalysis Static\nanalyze 1\nreactions\nrecord\nwipe\n")
+
+
+def _last_row_offset(f: io.BufferedReader, blocksize: int = 1 << 16) -> int:
+    # search backwards for the start of the last non-empty line
+    position = f.seek(0, os.SEEK_END)
+    content = False
+    while position > 0:
+        start = max(0, position - blocksize)
+        f.seek(start)
+        block = f.read(position - start)
+        if not content:
+            # trailing whitespace and empty lines are skipped
+            block = block.rstrip()
+            content = bool(block)
+        if content:
+            index = block.rfind(b"\n")
+            if index >= 0:
+                return start + index + 1
+        position = start
+    return 0
+
+
+def read_recorder(filepath: Union[str, pathlib.Path], components: int, row: Optional[int] = -1, chunksize: int = 1 << 22) -> Iterator[numpy.ndarray]:
+    """Stream the values of an OpenSees recorder file into arrays, chunk by chunk.
+
+    Parameters
+    ----------
+    filepath : str | pathlib.Path
+        The path of the recorder file.
+    components : int
+        The number of values per node or element.
+    row : int | None, optional
+        The row of the file to read.
+        Only ``-1``, the last row, and ``None``, all rows, are supported.
+    chunksize : int, optional
+        The number of bytes that are parsed at once.
+
+    Yields
+    ------
+    numpy.ndarray
+        The values in chunks of (M, components), in the order of the nodes or elements of the recorder.
+        If all rows are read, the chunks of subsequent rows follow each other.
+
+    Notes
+    -----
+    Values are parsed with :func:`numpy.fromstring`, without splitting lines into Python strings.
+    Memory use is bounded by the chunk size, also if a row contains the values of millions of nodes.
+
+    """
+    if row not in (-1, None):
+        raise ValueError("Only the last row, or all rows, can be read.")
+    with open(filepath, "rb") as f:
+        f.seek(0 if row is None else _last_row_offset(f))
+        carry = b""
+        rest = numpy.zeros(0)
+        while True:
+            block = f.read(chunksize)
+            if not block:
+                text = carry
+            else:
+                text = carry + block
+                # a value can be split over two blocks
+                cut = max(text.rfind(b" "), text.rfind(b"\n"), text.rfind(b"\t"))
+                if cut < 0:
+                    carry = text
+                    continue
+                text, carry = text[:cut], text[cut + 1 :]
+            values = numpy.fromstring(text, sep=" ") if text.strip() else numpy.zeros(0)
+            values = numpy.concatenate([rest, values]) if len(rest) else values
+            n = len(values) // components * components
+            if n:
+                yield values[:n].reshape(-1, components)
+            rest = values[n:]
+            if not block:
+                break
+        if len(rest):
+            raise ValueError(f"The number of values of {filepath} is not a multiple of {components}.")
+
+
+def load_recorder(filepath: Union[str, pathlib.Path], components: int, row: Optional[int] = -1, chunksize: int = 1 << 22) -> numpy.ndarray:
+    """Load the values of an OpenSees recorder file into one array.
+
+    Parameters
+    ----------
+    filepath : str | pathlib.Path
+        The path of the recorder file.
+    components : int
+        The number of values per node or element.
+    row : int | None, optional
+        The row of the file to read.
+        Only ``-1``, the last row, and ``None``, all rows, are supported.
+    chunksize : int, optional
+        The number of bytes that are parsed at once.
+
+    Returns
+    -------
+    numpy.ndarray
+        The (N, components) values.
+
+    """
+    chunks = list(read_recorder(filepath, components, row=row, chunksize=chunksize))
+    return numpy.vstack(chunks) if chunks else numpy.zeros((0, components))
+
+
+def store_recorder(
+    store: ResultStore,
+    step: str,
+    field: str,
+    part: str,
+    filepath: Union[str, pathlib.Path],
+    n: int,
+    columns: Optional[list[str]] = None,
+    chunksize: int = 1 << 22,
+) -> None:
+    """Stream the last row of an OpenSees recorder file into a field of a result store.
+
+    Parameters
+    ----------
+    store : :class:`knitcandela.ResultStore`
+        The result store.
+    step : str
+        The name of the step.
+    field : str
+        The name of the field, for example ``"U"``, ``"RF"`` or ``"S3D"``.
+    part : str
+        The name of the part.
+    filepath : str | pathlib.Path
+        The path of the recorder file, with the values of all nodes or elements, in order of their keys.
+    n : int
+        The number of nodes or elements.
+    columns : list[str], optional
+        The names of the columns.
+        Default is the name of the field followed by the component number, or the stress components for ``"S3D"``.
+    chunksize : int, optional
+        The number of bytes that are parsed at once.
+
+    Returns
+    -------
+    None
+
+    """
+    if columns is None:
+        columns = STRESS_COLUMNS_OPENSEES if field == "S3D" else [f"{field}{i + 1}" for i in range(RECORDER_COMPONENTS[field])]
+    count = 0
+    with store.writer(step, field, part, columns, n) as writer:
+        for values in read_recorder(filepath, len(columns), row=-1, chunksize=chunksize):
+            writer.append(numpy.arange(count, count + len(values)), values)
+            count += len(values)
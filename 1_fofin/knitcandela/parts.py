@@ -0,0 +1,395 @@
+"""Array-backed deformable parts based on compas_fea2.
+
+compas_fea2 is not a requirement of the other modules of the package.
+This module is therefore not imported by the package itself,
+and has to be imported explicitly as ``knitcandela.parts``.
+
+"""
+
+from collections.abc import Set
+from typing import Iterable
+from typing import Iterator
+from typing import Optional
+
+import compas_fea2
+import numpy
+from compas.geometry import Box
+from compas.geometry import Point
+from compas.geometry import bounding_box
+from compas_fea2.model import DeformablePart
+from compas_fea2.model import Node
+from compas_fea2.model import TetrahedronElement
+from compas_fea2.problem import NodeLoad
+
+from .femesh import FEMesh
+
+
+class NodeView:
+    """View of a node of an :class:`ArrayPart`, without a node object.
+
+    The geometry of the node is read-only.
+    The loads that compas_fea2 assigns to the nodes of a load pattern are stored on the part,
+    in :attr:`ArrayPart.node_loads` and :attr:`ArrayPart.total_loads`,
+    such that views can be used as the nodes of a pattern.
+
+    Parameters
+    ----------
+    part : :class:`ArrayPart`
+        The part of the node.
+    key : int
+        The key of the node.
+
+    """
+
+    __slots__ = ("part", "key")
+
+    def __init__(self, part: "ArrayPart", key: int) -> None:
+        self.part = part
+        self.key = key
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.key})"
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, NodeView) and other.part is self.part and other.key == self.key
+
+    def __hash__(self) -> int:
+        return hash((id(self.part), self.key))
+
+    @property
+    def xyz(self) -> list[float]:
+        return self.part.xyz[self.key].tolist()
+
+    @property
+    def x(self) -> float:
+        return float(self.part.xyz[self.key, 0])
+
+    @property
+    def y(self) -> float:
+        return float(self.part.xyz[self.key, 1])
+
+    @property
+    def z(self) -> float:
+        return float(self.part.xyz[self.key, 2])
+
+    @property
+    def point(self) -> Point:
+        return Point(*self.xyz)
+
+    @property
+    def loads(self) -> dict:
+        return self.part.node_loads.setdefault(self.key, {})
+
+    @property
+    def total_load(self) -> Optional[NodeLoad]:
+        if not self.part._loaded[self.key]:
+            return None
+        return NodeLoad(*self.part.total_loads[self.key].tolist())
+
+    @total_load.setter
+    def total_load(self, load: Optional[NodeLoad]) -> None:
+        self.part._loaded[self.key] = load is not None
+        self.part.total_loads[self.key] = [value or 0.0 for value in load.components.values()] if load is not None else 0.0
+
+
+class ElementView:
+    """Read-only view of a tetrahedron of an :class:`ArrayPart`, without an element object.
+
+    Parameters
+    ----------
+    part : :class:`ArrayPart`
+        The part of the element.
+    key : int
+        The key of the element.
+
+    """
+
+    __slots__ = ("part", "key")
+
+    def __init__(self, part: "ArrayPart", key: int) -> None:
+        self.part = part
+        self.key = key
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.key})"
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, ElementView) and other.part is self.part and other.key == self.key
+
+    def __hash__(self) -> int:
+        return hash((id(self.part), self.key))
+
+    @property
+    def connectivity(self) -> numpy.ndarray:
+        return self.part.tetrahedra[self.key]
+
+    @property
+    def nodes(self) -> list[NodeView]:
+        return [NodeView(self.part, key) for key in self.connectivity.tolist()]
+
+    @property
+    def section(self):
+        return self.part.section_list[self.part.section_index[self.key]]
+
+    @property
+    def volume(self) -> float:
+        a, b, c, d = self.part.xyz[self.connectivity]
+        return abs(float(numpy.dot(b - a, numpy.cross(c - a, d - a)))) / 6
+
+
+class _LazyObjects(Set):
+    # the node or element objects of an array part
+    # counting is free, iterating creates the objects of all keys that do not have one yet
+
+    def __init__(self, part: "ArrayPart", kind: str) -> None:
+        self._part = part
+        self._kind = kind
+
+    def _size(self) -> int:
+        return len(self._part.xyz) if self._kind == "node" else len(self._part.tetrahedra)
+
+    def __len__(self) -> int:
+        return self._size()
+
+    def __iter__(self) -> Iterator:
+        get = self._part.node if self._kind == "node" else self._part.element
+        for key in range(self._size()):
+            yield get(key)
+
+    def __contains__(self, item) -> bool:
+        objects = self._part._node_objects if self._kind == "node" else self._part._element_objects
+        return getattr(item, "key", None) in objects and objects[item.key] is item
+
+    def add(self, item) -> None:
+        raise TypeError(f"The {self._kind}s of an array part are defined by its arrays, and cannot be added one by one.")
+
+
+class ArrayPart(DeformablePart):
+    """Deformable part of linear tetrahedra, stored in contiguous arrays.
+
+    Coordinates, connectivity, section assignment and node sets are arrays.
+    The node and element objects of compas_fea2 are only created when they are requested,
+    one key at a time with :meth:`node` and :meth:`element`,
+    or all at once by iterating over :attr:`nodes` or :attr:`elements`.
+    Counting nodes and elements, for example in :meth:`compas_fea2.model.Model.summary`, does not create any objects.
+    Geometric access without objects is available through :class:`NodeView` and :class:`ElementView`.
+    The loads of node views are stored in :attr:`node_loads`, per node key,
+    and in :attr:`total_loads`, the (N, 6) sums of the factored loads ``[x, y, z, xx, yy, zz]`` of the nodes.
+
+    Parameters
+    ----------
+    xyz : numpy.ndarray
+        The (N, 3) node coordinates, indexed by node key.
+    tetrahedra : numpy.ndarray
+        The (E, 4) node keys of the tetrahedra, indexed by element key.
+    sections : list[:class:`compas_fea2.model.SolidSection`]
+        The sections of the part.
+    section_index : numpy.ndarray, optional
+        The (E,) index of the section of every element.
+        Default is the first section for all elements.
+    name : str, optional
+        The name of the part.
+
+    Notes
+    -----
+    Nodes and elements cannot be added to an array part one by one.
+    If a backend is set, the part combines with the backend implementation of :class:`compas_fea2.model.DeformablePart`,
+    such that it can be written to the input files of the backend like any other part.
+
+    """
+
+    _backend_classes: dict[type, type] = {}
+
+    def __new__(cls, *args, **kwargs):
+        implementation = compas_fea2._get_backend_implementation(DeformablePart)
+        if not implementation:
+            return object.__new__(cls)
+        if implementation not in cls._backend_classes:
+            cls._backend_classes[implementation] = type(f"{cls.__name__}{implementation.__name__}", (cls, implementation), {"__module__": cls.__module__})
+        return object.__new__(cls._backend_classes[implementation])
+
+    def __init__(self, xyz: numpy.ndarray, tetrahedra: numpy.ndarray, sections: list, section_index: Optional[numpy.ndarray] = None, name: Optional[str] = None, **kwargs) -> None:
+        super().__init__(name=name, **kwargs)
+        self.xyz = numpy.ascontiguousarray(xyz, dtype=float).reshape(-1, 3)
+        self.tetrahedra = numpy.ascontiguousarray(tetrahedra, dtype=numpy.int64).reshape(-1, 4)
+        self.section_list = list(sections)
+        if section_index is None:
+            section_index = numpy.zeros(len(self.tetrahedra), dtype=numpy.int32)
+        self.section_index = numpy.asarray(section_index, dtype=numpy.int32)
+        self.nodesets: dict[str, numpy.ndarray] = {}
+        self.node_loads: dict[int, dict] = {}
+        self.total_loads = numpy.zeros((len(self.xyz), 6))
+        self._loaded = numpy.zeros(len(self.xyz), dtype=bool)
+        self.ndf = 3
+        self._node_objects: dict[int, Node] = {}
+        self._element_objects: dict[int, TetrahedronElement] = {}
+        self._nodes = _LazyObjects(self, "node")
+        self._elements = _LazyObjects(self, "element")
+        for section in self.section_list:
+            self._sections.add(section)
+            self._materials.add(section.material)
+
+    @classmethod
+    def from_femesh(cls, femesh: FEMesh, section, name: Optional[str] = None) -> "ArrayPart":
+        """Create an array part from the tetrahedra of a finite element mesh.
+
+        Parameters
+        ----------
+        femesh : :class:`knitcandela.FEMesh`
+            A finite element mesh with tetrahedra.
+        section : :class:`compas_fea2.model.SolidSection`
+            The section of all elements.
+        name : str, optional
+            The name of the part.
+
+        Returns
+        -------
+        :class:`ArrayPart`
+
+        """
+        part = cls(femesh.nodes, femesh.tetrahedra, [section], name=name)
+        part._discretized_boundary_mesh = femesh.to_mesh()
+        return part
+
+    # =============================================================================
+    # Objects
+    # =============================================================================
+
+    def node(self, key: int) -> Node:
+        """Get the node object of a key, and create it if it does not exist yet.
+
+        Parameters
+        ----------
+        key : int
+            The node key.
+
+        Returns
+        -------
+        :class:`compas_fea2.model.Node`
+
+        """
+        node = self._node_objects.get(key)
+        if node is None:
+            node = Node(self.xyz[key].tolist())
+            node._key = key
+            node._registration = self
+            self._node_objects[key] = node
+        return node
+
+    def element(self, key: int) -> TetrahedronElement:
+        """Get the element object of a key, and create it and its nodes if they do not exist yet.
+
+        Parameters
+        ----------
+        key : int
+            The element key.
+
+        Returns
+        -------
+        :class:`compas_fea2.model.TetrahedronElement`
+
+        """
+        element = self._element_objects.get(key)
+        if element is None:
+            nodes = [self.node(index) for index in self.tetrahedra[key].tolist()]
+            element = TetrahedronElement(nodes=nodes, section=self.section_list[self.section_index[key]])
+            element._key = key
+            element._registration = self
+            self._element_objects[key] = element
+        return element
+
+    def add_node(self, node):
+        raise TypeError("The nodes of an array part are defined by its arrays, and cannot be added one by one.")
+
+    def add_element(self, element):
+        raise TypeError("The elements of an array part are defined by its arrays, and cannot be added one by one.")
+
+    # =============================================================================
+    # Views
+    # =============================================================================
+
+    def node_views(self, keys: Optional[Iterable[int]] = None) -> list[NodeView]:
+        """Create views of nodes, without creating node objects.
+
+        Parameters
+        ----------
+        keys : Iterable[int], optional
+            The node keys.
+            Default is all nodes.
+
+        Returns
+        -------
+        list[:class:`NodeView`]
+
+        """
+        keys = range(len(self.xyz)) if keys is None else keys
+        return [NodeView(self, int(key)) for key in keys]
+
+    def element_views(self, keys: Optional[Iterable[int]] = None) -> list[ElementView]:
+        """Create views of elements, without creating element objects.
+
+        Parameters
+        ----------
+        keys : Iterable[int], optional
+            The element keys.
+            Default is all elements.
+
+        Returns
+        -------
+        list[:class:`ElementView`]
+
+        """
+        keys = range(len(self.tetrahedra)) if keys is None else keys
+        return [ElementView(self, int(key)) for key in keys]
+
+    # =============================================================================
+    # Sets
+    # =============================================================================
+
+    def add_node_set(self, name: str, keys: Iterable[int]) -> numpy.ndarray:
+        """Store a named set of nodes, for example of the supports or of a load pattern.
+
+        Parameters
+        ----------
+        name : str
+            The name of the set.
+        keys : Iterable[int]
+            The node keys.
+
+        Returns
+        -------
+        numpy.ndarray
+            The sorted unique keys of the set.
+
+        """
+        keys = numpy.unique(numpy.fromiter(keys, dtype=numpy.int64) if not isinstance(keys, numpy.ndarray) else keys.astype(numpy.int64))
+        self.nodesets[name] = keys
+        return keys
+
+    def node_set(self, name: str) -> list[Node]:
+        """Get the node objects of a named set of nodes.
+
+        Parameters
+        ----------
+        name : str
+            The name of the set.
+
+        Returns
+        -------
+        list[:class:`compas_fea2.model.Node`]
+
+        """
+        return [self.node(key) for key in self.nodesets[name].tolist()]
+
+    # =============================================================================
+    # Properties
+    # =============================================================================
+
+    @property
+    def bounding_box(self) -> Box:
+        return Box.from_bounding_box(bounding_box([self.xyz.min(axis=0).tolist(), self.xyz.max(axis=0).tolist()]))
+
+    @property
+    def volume(self) -> float:
+        a, b, c, d = numpy.moveaxis(self.xyz[self.tetrahedra], 1, 0)
+        return float(numpy.abs(numpy.einsum("ij,ij->i", b - a, numpy.cross(c - a, d - a))).sum() / 6)
@@ -0,0 +1,357 @@
+import json
+import os
+import pathlib
+import shutil
+from typing import Iterable
+from typing import Optional
+from typing import Union
+
+import numpy
+from numpy.lib.format import open_memmap
+
+
+class FieldView:
+    """Lazy view of one field of one part in one step of a :class:`ResultStore`.
+
+    Columns are memory mapped on first access.
+    Nothing is read from disk until the values are used.
+
+    Parameters
+    ----------
+    path : pathlib.Path
+        The folder of the field.
+    columns : list[str]
+        The names of the columns of the field.
+
+    """
+
+    def __init__(self, path: pathlib.Path, columns: list[str]) -> None:
+        self.path = path
+        self.columns = list(columns)
+        self._arrays: dict[str, numpy.ndarray] = {}
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({str(self.path)!r}, {self.columns!r})"
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __getitem__(self, column: str) -> numpy.ndarray:
+        if column != "key" and column not in self.columns:
+            raise KeyError(column)
+        array = self._arrays.get(column)
+        if array is None:
+            array = numpy.load(self.path / f"{column}.npy", mmap_mode="r")
+            self._arrays[column] = array
+        return array
+
+    @property
+    def keys(self) -> numpy.ndarray:
+        """The sorted keys of the nodes or elements of the rows."""
+        return self["key"]
+
+    def rows(self, keys: Iterable[int]) -> numpy.ndarray:
+        """Find the rows of a subset of nodes or elements.
+
+        Parameters
+        ----------
+        keys : Iterable[int]
+            The keys of the nodes or elements.
+
+        Returns
+        -------
+        numpy.ndarray
+            The row indices.
+
+        Raises
+        ------
+        KeyError
+            If a key has no row in the field.
+
+        """
+        keys = numpy.asarray(list(keys) if not isinstance(keys, numpy.ndarray) else keys, dtype=numpy.int64)
+        rows = numpy.searchsorted(self.keys, keys)
+        found = rows < len(self.keys)
+        found[found] = self.keys[rows[found]] == keys[found]
+        if not found.all():
+            raise KeyError(keys[~found].tolist())
+        return rows
+
+    def array(self, columns: Optional[list[str]] = None, keys: Optional[Iterable[int]] = None) -> numpy.ndarray:
+        """Load columns of the field into one array.
+
+        Parameters
+        ----------
+        columns : list[str], optional
+            The columns to load.
+            Default is all columns.
+        keys : Iterable[int], optional
+            The keys of the nodes or elements to load.
+            Default is all rows.
+
+        Returns
+        -------
+        numpy.ndarray
+            A (N, C) float array.
+
+        """
+        columns = columns or self.columns
+        rows = slice(None) if keys is None else self.rows(keys)
+        return numpy.stack([numpy.asarray(self[column][rows], dtype=float) for column in columns], axis=1)
+
+
+class ResultStore:
+    """On-disk columnar store of finite element results, with memory mapped access.
+
+    Every column of every field, per step and part, is a separate ``.npy`` file,
+    with the rows sorted by node or element key.
+    Only the columns that are accessed are mapped into memory,
+    and only the pages that are used are actually read.
+
+    Parameters
+    ----------
+    path : str | pathlib.Path
+        The folder of the store.
+        If the folder does not exist yet, the store starts empty.
+
+    Examples
+    --------
+    >>> store = ResultStore("__temp/results")
+    >>> displacements = store.field("SLS", "U")
+    >>> uz = displacements["U3"]
+
+    """
+
+    def __init__(self, path: Union[str, pathlib.Path]) -> None:
+        self.path = pathlib.Path(path)
+        self._manifest: dict[str, dict[str, dict[str, list[str]]]] = {}
+        if self._manifestpath.exists():
+            with open(self._manifestpath, "r") as f:
+                self._manifest = json.load(f)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({str(self.path)!r})"
+
+    @property
+    def _manifestpath(self) -> pathlib.Path:
+        return self.path / "manifest.json"
+
+    def _write_manifest(self) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+        tmp = self._manifestpath.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self._manifest, f, indent=4)
+        os.replace(tmp, self._manifestpath)
+
+    def _folder(self, step: str, field: str, part: str) -> pathlib.Path:
+        return self.path / step / field / part
+
+    # =============================================================================
+    # Access
+    # =============================================================================
+
+    def steps(self) -> list[str]:
+        """The names of the steps in the store."""
+        return list(self._manifest)
+
+    def fields(self, step: str) -> list[str]:
+        """The names of the fields of a step."""
+        return list(self._manifest[step])
+
+    def parts(self, step: str, field: str) -> list[str]:
+        """The names of the parts of a field."""
+        return list(self._manifest[step][field])
+
+    def field(self, step: str, field: str, part: Optional[str] = None) -> FieldView:
+        """Get a lazy view of a field.
+
+        Parameters
+        ----------
+        step : str
+            The name of the step.
+        field : str
+            The name of the field, for example ``"U"``, ``"RF"`` or ``"S3D"``.
+        part : str, optional
+            The name of the part.
+            Can be omitted if the field has only one part.
+
+        Returns
+        -------
+        :class:`FieldView`
+
+        """
+        parts = self._manifest[step][field]
+        if part is None:
+            if len(parts) != 1:
+                raise ValueError(f"Field {field} of step {step} has multiple parts: {list(parts)}")
+            part = next(iter(parts))
+        return FieldView(self._folder(step, field, part), parts[part])
+
+    # =============================================================================
+    # Writing
+    # =============================================================================
+
+    def writer(self, step: str, field: str, part: str, columns: list[str], n: int) -> "FieldWriter":
+        """Allocate a field of known size, to be filled in chunks.
+
+        Parameters
+        ----------
+        step : str
+            The name of the step.
+        field : str
+            The name of the field.
+        part : str
+            The name of the part.
+        columns : list[str]
+            The names of the value columns.
+        n : int
+            The number of rows.
+
+        Returns
+        -------
+        :class:`FieldWriter`
+
+        """
+        return FieldWriter(self, step, field, part, columns, n)
+
+    def write(self, step: str, field: str, part: str, keys: numpy.ndarray, values: dict[str, numpy.ndarray]) -> None:
+        """Write a complete field.
+
+        Parameters
+        ----------
+        step : str
+            The name of the step.
+        field : str
+            The name of the field.
+        part : str
+            The name of the part.
+        keys : numpy.ndarray
+            The (N,) node or element keys.
+        values : dict[str, numpy.ndarray]
+            The (N,) values per column.
+
+        Returns
+        -------
+        None
+
+        """
+        with self.writer(step, field, part, list(values), len(keys)) as writer:
+            writer.append(keys, numpy.stack([numpy.asarray(value, dtype=float) for value in values.values()], axis=1).reshape(len(keys), len(values)))
+
+    def _commit(self, step: str, field: str, part: str, columns: list[str], tmp: pathlib.Path) -> None:
+        folder = self._folder(step, field, part)
+        if folder.exists():
+            shutil.rmtree(folder)
+        folder.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(tmp, folder)
+        self._manifest.setdefault(step, {}).setdefault(field, {})[part] = columns
+        self._write_manifest()
+
+    def clear(self) -> None:
+        """Remove all results from the store.
+
+        Returns
+        -------
+        None
+
+        """
+        for step in self.steps():
+            shutil.rmtree(self.path / step, ignore_errors=True)
+        self._manifest = {}
+        self._write_manifest()
+
+    def summary(self) -> str:
+        """Summarize the fields and their sizes.
+
+        Returns
+        -------
+        str
+
+        """
+        lines = [f"results: {self.path}"]
+        for step, fields in self._manifest.items():
+            for field, parts in fields.items():
+                for part, columns in parts.items():
+                    folder = self._folder(step, field, part)
+                    size = sum(filepath.stat().st_size for filepath in folder.glob("*.npy"))
+                    lines.append(f"{step:<12} {field:<6} {part:<20} {' '.join(columns):<30} {size / 1024**2:>8.1f} MB")
+        return "\n".join(lines)
+
+
+class FieldWriter:
+    """Writer that fills the columns of a field chunk by chunk, without holding the field in memory.
+
+    The field becomes visible in the store when the writer is closed.
+    Use :meth:`ResultStore.writer` to create one, preferably as a context manager.
+
+    """
+
+    def __init__(self, store: ResultStore, step: str, field: str, part: str, columns: list[str], n: int) -> None:
+        self.store = store
+        self.step = step
+        self.field = field
+        self.part = part
+        self.columns = list(columns)
+        self.n = n
+        self.count = 0
+        self._tmp = store._folder(step, field, part).with_name(f"~{part}")
+        if self._tmp.exists():
+            shutil.rmtree(self._tmp)
+        self._tmp.mkdir(parents=True)
+        self._keys = open_memmap(self._tmp / "key.npy", mode="w+", dtype=numpy.int64, shape=(n,))
+        self._values = [open_memmap(self._tmp / f"{column}.npy", mode="w+", dtype=numpy.float64, shape=(n,)) for column in self.columns]
+
+    def __enter__(self) -> "FieldWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._keys = None
+            self._values = []
+            shutil.rmtree(self._tmp, ignore_errors=True)
+
+    def append(self, keys: numpy.ndarray, values: numpy.ndarray) -> None:
+        """Append a chunk of rows.
+
+        Parameters
+        ----------
+        keys : numpy.ndarray
+            The (M,) keys of the rows.
+        values : numpy.ndarray
+            The (M, C) values of the rows, in the order of the columns.
+
+        Returns
+        -------
+        None
+
+        """
+        m = len(keys)
+        self._keys[self.count : self.count + m] = keys
+        for i, column in enumerate(self._values):
+            column[self.count : self.count + m] = values[:, i]
+        self.count += m
+
+    def close(self) -> None:
+        """Sort the rows by key, flush the columns and add the field to the store.
+
+        Returns
+        -------
+        None
+
+        """
+        if self.count != self.n:
+            raise ValueError(f"Expected {self.n} rows, got {self.count}.")
+        keys = self._keys
+        if len(keys) > 1 and not (keys[1:] >= keys[:-1]).all():
+            order = numpy.argsort(keys, kind="stable")
+            keys[:] = keys[order]
+            for column in self._values:
+                column[:] = column[order]
+        keys.flush()
+        for column in self._values:
+            column.flush()
+        self._keys = None
+        self._values = []
+        self.store._commit(self.step, self.field, self.part, self.columns, self._tmp)
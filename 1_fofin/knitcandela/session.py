@@ -0,0 +1,243 @@
+import json
+import os
+import pathlib
+from collections.abc import MutableMapping
+from typing import Any
+from typing import Iterator
+from typing import Union
+
+import compas
+
+from .storage import dump_artifact
+from .storage import load_artifact
+
+_MISSING = object()
+
+
+class Session(MutableMapping):
+    """Work session of which every key is persisted as a separate file.
+
+    Values are loaded from disk on first access.
+    :meth:`save` writes only the keys that were assigned since the last save.
+
+    Parameters
+    ----------
+    path : str | pathlib.Path
+        The folder of the session.
+        If the folder does not exist yet, the session starts empty.
+
+    Notes
+    -----
+    Values that are modified in place, for example by scaling a mesh,
+    are not detected as changed. Assign them again, or use :meth:`touch`.
+
+    Examples
+    --------
+    >>> session = Session("data/session")
+    >>> cablemesh = session["cablemesh"]
+    >>> session["shell"] = shell
+    >>> session.save()
+
+    """
+
+    def __init__(self, path: Union[str, pathlib.Path]) -> None:
+        self.path = pathlib.Path(path)
+        self._manifest: dict[str, dict[str, str]] = {}
+        self._values: dict[str, Any] = {}
+        self._dirty: set[str] = set()
+        self._deleted: set[str] = set()
+        if self._manifestpath.exists():
+            with open(self._manifestpath, "r") as f:
+                self._manifest = json.load(f)
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({str(self.path)!r})"
+
+    @property
+    def _manifestpath(self) -> pathlib.Path:
+        return self.path / "manifest.json"
+
+    # =============================================================================
+    # Mapping
+    # =============================================================================
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._values.get(key, _MISSING)
+        if value is _MISSING:
+            if key not in self._manifest:
+                raise KeyError(key)
+            entry = self._manifest[key]
+            value = load_artifact(entry["kind"], self.path / entry["file"])
+            self._values[key] = value
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._values[key] = value
+        self._dirty.add(key)
+        self._deleted.discard(key)
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self._values and key not in self._manifest:
+            raise KeyError(key)
+        self._values.pop(key, None)
+        self._dirty.discard(key)
+        if key in self._manifest:
+            self._deleted.add(key)
+
+    def __iter__(self) -> Iterator[str]:
+        keys = [key for key in self._manifest if key not in self._deleted]
+        keys += [key for key in self._values if key not in self._manifest]
+        return iter(keys)
+
+    def __len__(self) -> int:
+        return len(list(iter(self)))
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._values or (key in self._manifest and key not in self._deleted)
+
+    # =============================================================================
+    # Persistence
+    # =============================================================================
+
+    @property
+    def dirty(self) -> set[str]:
+        """The keys that will be written by the next save."""
+        return set(self._dirty)
+
+    def is_loaded(self, key: str) -> bool:
+        """Check if the value of a key is in memory.
+
+        Parameters
+        ----------
+        key : str
+
+        Returns
+        -------
+        bool
+
+        """
+        return key in self._values
+
+    def touch(self, key: str) -> None:
+        """Mark a key as changed, after its value was modified in place.
+
+        Parameters
+        ----------
+        key : str
+
+        Returns
+        -------
+        None
+
+        """
+        self[key] = self[key]
+
+    def save(self) -> list[str]:
+        """Write the changed keys to disk.
+
+        Returns
+        -------
+        list[str]
+            The keys that were written.
+
+        """
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        for key in self._deleted:
+            entry = self._manifest.pop(key)
+            filepath = self.path / entry["file"]
+            if filepath.exists():
+                filepath.unlink()
+
+        written = sorted(self._dirty)
+        for key in written:
+            previous = self._manifest.get(key)
+            kind, filepath = dump_artifact(self._values[key], self.path / key)
+            if previous and previous["file"] != filepath.name:
+                oldpath = self.path / previous["file"]
+                if oldpath.exists():
+                    oldpath.unlink()
+            self._manifest[key] = {"file": filepath.name, "kind": kind}
+
+        tmp = self._manifestpath.with_suffix(".tmp")
+        with open(tmp, "w") as f:
+            json.dump(self._manifest, f, indent=4)
+        os.replace(tmp, self._manifestpath)
+
+        self._dirty.clear()
+        self._deleted.clear()
+        return written
+
+    # =============================================================================
+    # Compatibility
+    # =============================================================================
+
+    @classmethod
+    def from_json(cls, filepath: Union[str, pathlib.Path], path: Union[str, pathlib.Path]) -> "Session":
+        """Import a monolithic JSON session.
+
+        Parameters
+        ----------
+        filepath : str | pathlib.Path
+            The path of the JSON session file, as written by :func:`compas.json_dump`.
+        path : str | pathlib.Path
+            The folder of the new session.
+
+        Returns
+        -------
+        :class:`Session`
+
+        """
+        data = compas.json_load(filepath)
+        session = cls(path)
+        for key, value in data.items():
+            session[key] = value
+        session.save()
+        return session
+
+    def to_json(self, filepath: Union[str, pathlib.Path]) -> None:
+        """Export the session as one monolithic JSON file.
+
+        Parameters
+        ----------
+        filepath : str | pathlib.Path
+            The path of the JSON session file.
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        All keys are loaded for the export.
+        Values stored as arrays or STEP files cannot be written to JSON and are skipped.
+
+        """
+        data = {}
+        for key in self:
+            kind = self._manifest[key]["kind"] if key in self._manifest else "json"
+            if kind != "json":
+                continue
+            data[key] = self[key]
+        compas.json_dump(data, filepath)
+
+    @classmethod
+    def open(cls, path: Union[str, pathlib.Path], legacy: Union[str, pathlib.Path, None] = None) -> "Session":
+        """Open a session, importing a monolithic JSON session if the session does not exist yet.
+
+        Parameters
+        ----------
+        path : str | pathlib.Path
+            The folder of the session.
+        legacy : str | pathlib.Path, optional
+            The path of a JSON session file to import from.
+
+        Returns
+        -------
+        :class:`Session`
+
+        """
+        path = pathlib.Path(path)
+        if not (path / "manifest.json").exists() and legacy and pathlib.Path(legacy).exists():
+            return cls.from_json(legacy, path)
+        return cls(path)
@@ -0,0 +1,159 @@
+from typing import Union
+
+import numpy
+from scipy.spatial import cKDTree
+
+
+class SpatialIndex:
+    """Spatial index of a point set, for repeated selection queries.
+
+    The index combines a KD-tree, for nearest point and sphere queries,
+    with the sort order of the points along every coordinate axis,
+    for box queries and for planes parallel to the coordinate planes.
+    Both are built once, and all queries return indices into the original points.
+
+    Parameters
+    ----------
+    points : numpy.ndarray
+        The (N, 3) coordinates of the points, for example of the nodes or element centroids of a part.
+    leafsize : int, optional
+        The leaf size of the KD-tree.
+
+    Examples
+    --------
+    >>> index = SpatialIndex(node_coordinates(part))
+    >>> supports = index.on_plane([0, 0, 0], [0, 0, 1], tolerance=1)
+    >>> distances, probes = index.nearest([[0, 0, 1000], [2000, 0, 1000]])
+
+    """
+
+    def __init__(self, points: numpy.ndarray, leafsize: int = 16) -> None:
+        self.points = numpy.asarray(points, dtype=float).reshape(-1, 3)
+        self.tree = cKDTree(self.points, leafsize=leafsize)
+        self.order = numpy.argsort(self.points, axis=0, kind="stable")
+        self.sorted = numpy.take_along_axis(self.points, self.order, axis=0)
+
+    def __len__(self) -> int:
+        return len(self.points)
+
+    def _slab(self, axis: int, lower: float, upper: float) -> numpy.ndarray:
+        column = self.sorted[:, axis]
+        start = numpy.searchsorted(column, lower, side="left")
+        stop = numpy.searchsorted(column, upper, side="right")
+        return self.order[start:stop, axis]
+
+    def nearest(self, points: numpy.ndarray, k: int = 1, distance: float = numpy.inf) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """Find the nearest points to a batch of query points.
+
+        Parameters
+        ----------
+        points : numpy.ndarray
+            The (M, 3) query points.
+        k : int, optional
+            The number of neighbours per query point.
+        distance : float, optional
+            The maximum distance of a neighbour.
+
+        Returns
+        -------
+        tuple[numpy.ndarray, numpy.ndarray]
+            The (M,) or (M, k) distances and indices.
+            Missing neighbours have an infinite distance and the index ``len(self)``.
+
+        """
+        return self.tree.query(numpy.asarray(points, dtype=float).reshape(-1, 3), k=k, distance_upper_bound=distance)
+
+    def in_sphere(self, center: numpy.ndarray, radius: float) -> numpy.ndarray:
+        """Find the points within a distance of a location.
+
+        Parameters
+        ----------
+        center : numpy.ndarray
+            The (3,) center of the sphere.
+        radius : float
+            The radius of the sphere.
+
+        Returns
+        -------
+        numpy.ndarray
+            The sorted indices of the points.
+
+        """
+        return numpy.sort(numpy.asarray(self.tree.query_ball_point(numpy.asarray(center, dtype=float), radius), dtype=numpy.int64))
+
+    def in_spheres(self, centers: numpy.ndarray, radius: Union[float, numpy.ndarray]) -> list[numpy.ndarray]:
+        """Find the points within a distance of every location of a batch.
+
+        Parameters
+        ----------
+        centers : numpy.ndarray
+            The (M, 3) centers of the spheres.
+        radius : float | numpy.ndarray
+            The radius of all spheres, or the (M,) radii per sphere.
+
+        Returns
+        -------
+        list[numpy.ndarray]
+            The sorted indices of the points per sphere.
+
+        """
+        found = self.tree.query_ball_point(numpy.asarray(centers, dtype=float).reshape(-1, 3), radius)
+        return [numpy.sort(numpy.asarray(indices, dtype=numpy.int64)) for indices in found]
+
+    def in_box(self, lower: numpy.ndarray, upper: numpy.ndarray) -> numpy.ndarray:
+        """Find the points in an axis-aligned box.
+
+        Parameters
+        ----------
+        lower : numpy.ndarray
+            The (3,) minimum corner of the box.
+        upper : numpy.ndarray
+            The (3,) maximum corner of the box.
+
+        Returns
+        -------
+        numpy.ndarray
+            The sorted indices of the points, including points on the boundary of the box.
+
+        """
+        lower = numpy.asarray(lower, dtype=float)
+        upper = numpy.asarray(upper, dtype=float)
+        # the candidates are taken from the axis along which the box contains the fewest points
+        counts = [numpy.searchsorted(self.sorted[:, i], upper[i], side="right") - numpy.searchsorted(self.sorted[:, i], lower[i], side="left") for i in range(3)]
+        axis = int(numpy.argmin(counts))
+        candidates = self._slab(axis, lower[axis], upper[axis])
+        points = self.points[candidates]
+        inside = numpy.all((points >= lower) & (points <= upper), axis=1)
+        return numpy.sort(candidates[inside])
+
+    def on_plane(self, point: numpy.ndarray, normal: numpy.ndarray, tolerance: float = 1.0) -> numpy.ndarray:
+        """Find the points within a distance of a plane.
+
+        Parameters
+        ----------
+        point : numpy.ndarray
+            The (3,) base point of the plane.
+        normal : numpy.ndarray
+            The (3,) normal of the plane.
+        tolerance : float, optional
+            The maximum distance of a point to the plane.
+
+        Returns
+        -------
+        numpy.ndarray
+            The sorted indices of the points.
+
+        Notes
+        -----
+        Planes parallel to the coordinate planes are answered from the sorted coordinates, without scanning the points.
+        Other planes require a single vectorized pass over the points.
+
+        """
+        point = numpy.asarray(point, dtype=float)
+        normal = numpy.asarray(normal, dtype=float)
+        normal = normal / numpy.linalg.norm(normal)
+        axis = int(numpy.argmax(numpy.abs(normal)))
+        if numpy.count_nonzero(normal) == 1:
+            return numpy.sort(self._slab(axis, point[axis] - tolerance, point[axis] + tolerance))
+        distances = numpy.abs((self.points - point) @ normal)
+        return numpy.flatnonzero(distances <= tolerance)
@@ -0,0 +1,362 @@
+from typing import NamedTuple
+from typing import Optional
+
+import numpy
+import scipy.sparse
+import scipy.sparse.linalg
+
+from .stresses import stress_tensors
+
+
+def elasticity_matrix(E: float, v: float) -> numpy.ndarray:
+    """Construct the elasticity matrix of an isotropic material.
+
+    Parameters
+    ----------
+    E : float
+        The Young's modulus.
+    v : float
+        The Poisson ratio.
+
+    Returns
+    -------
+    numpy.ndarray
+        The (6, 6) matrix relating the strains ``[exx, eyy, ezz, gxy, gyz, gzx]`` to the stresses.
+
+    """
+    lame = E * v / ((1 + v) * (1 - 2 * v))
+    shear = E / (2 * (1 + v))
+    D = numpy.zeros((6, 6))
+    D[:3, :3] = lame
+    D[[0, 1, 2], [0, 1, 2]] += 2 * shear
+    D[[3, 4, 5], [3, 4, 5]] = shear
+    return D
+
+
+def tetrahedron_gradients(nodes: numpy.ndarray, tetrahedra: numpy.ndarray) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """Compute the gradients of the linear shape functions of a set of tetrahedra.
+
+    Parameters
+    ----------
+    nodes : numpy.ndarray
+        The (N, 3) node coordinates.
+    tetrahedra : numpy.ndarray
+        The (T, 4) node indices of the tetrahedra.
+
+    Returns
+    -------
+    tuple[numpy.ndarray, numpy.ndarray]
+        The (T, 4, 3) gradients of the shape functions of the corners, and the (T,) volumes.
+
+    """
+    corners = nodes[tetrahedra]
+    edges = corners[:, 1:] - corners[:, :1]
+    inverse = numpy.linalg.inv(edges)
+    # the columns of the inverse are the gradients of the last three shape functions
+    gradients = numpy.swapaxes(inverse, 1, 2)
+    gradients = numpy.concatenate([-gradients.sum(axis=1, keepdims=True), gradients], axis=1)
+    volumes = numpy.abs(numpy.linalg.det(edges)) / 6
+    return gradients, volumes
+
+
+def strain_displacement(gradients: numpy.ndarray) -> numpy.ndarray:
+    """Construct the strain-displacement matrices of a set of linear tetrahedra.
+
+    Parameters
+    ----------
+    gradients : numpy.ndarray
+        The (T, 4, 3) gradients of the shape functions.
+
+    Returns
+    -------
+    numpy.ndarray
+        The (T, 6, 12) matrices.
+
+    """
+    B = numpy.zeros((len(gradients), 6, 4, 3))
+    bx, by, bz = gradients[..., 0], gradients[..., 1], gradients[..., 2]
+    B[:, 0, :, 0] = bx
+    B[:, 1, :, 1] = by
+    B[:, 2, :, 2] = bz
+    B[:, 3, :, 0] = by
+    B[:, 3, :, 1] = bx
+    B[:, 4, :, 1] = bz
+    B[:, 4, :, 2] = by
+    B[:, 5, :, 0] = bz
+    B[:, 5, :, 2] = bx
+    return B.reshape(-1, 6, 12)
+
+
+def _element_dofs(tetrahedra: numpy.ndarray) -> numpy.ndarray:
+    return (3 * tetrahedra[:, :, None] + numpy.arange(3)).reshape(-1, 12)
+
+
+def element_stiffness(nodes: numpy.ndarray, tetrahedra: numpy.ndarray, E: float, v: float) -> numpy.ndarray:
+    """Compute the stiffness matrices of a set of linear tetrahedra.
+
+    Parameters
+    ----------
+    nodes : numpy.ndarray
+        The (N, 3) node coordinates.
+    tetrahedra : numpy.ndarray
+        The (T, 4) node indices of the tetrahedra.
+    E : float
+        The Young's modulus.
+    v : float
+        The Poisson ratio.
+
+    Returns
+    -------
+    numpy.ndarray
+        The (T, 12, 12) element matrices, with the degrees of freedom of corner ``i`` at ``3i``, ``3i + 1``, ``3i + 2``.
+
+    """
+    gradients, volumes = tetrahedron_gradients(nodes, tetrahedra)
+    B = strain_displacement(gradients)
+    return numpy.einsum("t,tai,ab,tbj->tij", volumes, B, elasticity_matrix(E, v), B, optimize=True)
+
+
+def assemble_stiffness(element_matrices: numpy.ndarray, tetrahedra: numpy.ndarray, n: int) -> scipy.sparse.csr_matrix:
+    """Assemble element stiffness matrices into the global stiffness matrix.
+
+    Parameters
+    ----------
+    element_matrices : numpy.ndarray
+        The (T, 12, 12) element matrices.
+    tetrahedra : numpy.ndarray
+        The (T, 4) node indices of the tetrahedra.
+    n : int
+        The number of nodes.
+
+    Returns
+    -------
+    scipy.sparse.csr_matrix
+        The (3N, 3N) stiffness matrix.
+
+    """
+    dofs = _element_dofs(tetrahedra)
+    rows = numpy.repeat(dofs, 12, axis=1).reshape(-1)
+    cols = numpy.tile(dofs, (1, 12)).reshape(-1)
+    return scipy.sparse.coo_matrix((element_matrices.reshape(-1), (rows, cols)), shape=(3 * n, 3 * n)).tocsr()
+
+
+def stiffness_matrix(nodes: numpy.ndarray, tetrahedra: numpy.ndarray, E: float, v: float) -> scipy.sparse.csr_matrix:
+    """Assemble the global stiffness matrix of a mesh of linear tetrahedra.
+
+    Parameters
+    ----------
+    nodes : numpy.ndarray
+        The (N, 3) node coordinates.
+    tetrahedra : numpy.ndarray
+        The (T, 4) node indices of the tetrahedra.
+    E : float
+        The Young's modulus.
+    v : float
+        The Poisson ratio.
+
+    Returns
+    -------
+    scipy.sparse.csr_matrix
+        The (3N, 3N) stiffness matrix, with the degrees of freedom of node ``i`` at ``3i``, ``3i + 1``, ``3i + 2``.
+
+    """
+    return assemble_stiffness(element_stiffness(nodes, tetrahedra, E, v), tetrahedra, len(nodes))
+
+
+def selfweight_loads(nodes: numpy.ndarray, tetrahedra: numpy.ndarray, weight: float) -> numpy.ndarray:
+    """Lump the self weight of a mesh of tetrahedra to its nodes.
+
+    Parameters
+    ----------
+    nodes : numpy.ndarray
+        The (N, 3) node coordinates.
+    tetrahedra : numpy.ndarray
+        The (T, 4) node indices of the tetrahedra.
+    weight : float
+        The weight per unit of volume, for example ``2.35e-5`` N/mm3 for concrete.
+
+    Returns
+    -------
+    numpy.ndarray
+        The (N, 3) nodal loads, in the negative Z direction,
+        with a quarter of the weight of every tetrahedron at each of its corners.
+
+    """
+    _, volumes = tetrahedron_gradients(nodes, tetrahedra)
+    loads = numpy.zeros((len(nodes), 3))
+    numpy.add.at(loads[:, 2], tetrahedra, -weight * volumes[:, None] / 4)
+    return loads
+
+
+class LoadCaseResults(NamedTuple):
+    """Displacements and reactions of a set of load cases solved against the same stiffness.
+
+    Attributes
+    ----------
+    names : list[str]
+        The names of the load cases.
+    displacements : numpy.ndarray
+        The (C, N, 3) nodal displacements per load case.
+    reactions : numpy.ndarray
+        The (C, N, 3) reaction forces per load case, zero at nodes without supports.
+
+    """
+
+    names: list[str]
+    displacements: numpy.ndarray
+    reactions: numpy.ndarray
+
+    def case(self, name: str) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """Get the results of a single load case.
+
+        Parameters
+        ----------
+        name : str
+            The name of the load case.
+
+        Returns
+        -------
+        tuple[numpy.ndarray, numpy.ndarray]
+            The (N, 3) displacements and reactions.
+
+        """
+        index = self.names.index(name)
+        return self.displacements[index], self.reactions[index]
+
+    def combination(self, factors: dict[str, float]) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """Superpose the load cases into the results of a load combination.
+
+        Parameters
+        ----------
+        factors : dict[str, float]
+            The factor per load case, as in :attr:`compas_fea2.problem.LoadCombination.factors`.
+            Load cases that were not solved are ignored.
+
+        Returns
+        -------
+        tuple[numpy.ndarray, numpy.ndarray]
+            The (N, 3) combined displacements and reactions.
+
+        Notes
+        -----
+        For a linear analysis, this is exact and does not require another solve.
+
+        """
+        weights = numpy.array([factors.get(name, 0.0) for name in self.names], dtype=float)
+        return numpy.tensordot(weights, self.displacements, axes=1), numpy.tensordot(weights, self.reactions, axes=1)
+
+
+class LinearStatics:
+    """Linear static analysis of a mesh of tetrahedra, with a stiffness matrix that is factorized only once.
+
+    Every call to :meth:`solve` reuses the factorization,
+    so additional load cases only cost a forward and backward substitution.
+
+    Parameters
+    ----------
+    nodes : numpy.ndarray
+        The (N, 3) node coordinates.
+    tetrahedra : numpy.ndarray
+        The (T, 4) node indices of the tetrahedra.
+    E : float
+        The Young's modulus.
+    v : float
+        The Poisson ratio.
+    fixed : numpy.ndarray
+        The (N, 3) boolean mask of the supported translations,
+        or the (S,) indices of the nodes that are supported in all directions.
+    element_matrices : numpy.ndarray, optional
+        The (T, 12, 12) element stiffness matrices, if they are already available,
+        for example from a :class:`knitcandela.StiffnessCache`.
+
+    Examples
+    --------
+    >>> statics = LinearStatics(femesh.nodes, femesh.tetrahedra, E=30e3, v=0.17, fixed=supports)
+    >>> results = statics.solve_cases({"DL": dead, "LL": snow})
+    >>> displacements, reactions = results.combination({"DL": 1.35, "LL": 1.5})
+
+    """
+
+    def __init__(self, nodes: numpy.ndarray, tetrahedra: numpy.ndarray, E: float, v: float, fixed: numpy.ndarray, element_matrices: Optional[numpy.ndarray] = None) -> None:
+        self.nodes = numpy.asarray(nodes, dtype=float).reshape(-1, 3)
+        self.tetrahedra = numpy.asarray(tetrahedra, dtype=numpy.int64).reshape(-1, 4)
+        self.D = elasticity_matrix(E, v)
+        fixed = numpy.asarray(fixed)
+        if fixed.dtype != bool:
+            mask = numpy.zeros((len(self.nodes), 3), dtype=bool)
+            mask[fixed.reshape(-1)] = True
+            fixed = mask
+        self.fixed = fixed.reshape(-1)
+        self.free = ~self.fixed
+        gradients, self.volumes = tetrahedron_gradients(self.nodes, self.tetrahedra)
+        self.B = strain_displacement(gradients)
+        if element_matrices is None:
+            element_matrices = numpy.einsum("t,tai,ab,tbj->tij", self.volumes, self.B, self.D, self.B, optimize=True)
+        self.stiffness = assemble_stiffness(element_matrices, self.tetrahedra, len(self.nodes))
+        # the reduced stiffness is symmetric positive definite
+        # a symmetric ordering without pivoting keeps the fill-in of the factors low
+        stiffness = self.stiffness[self.free][:, self.free].tocsc()
+        self._lu = scipy.sparse.linalg.splu(stiffness, permc_spec="MMD_AT_PLUS_A", diag_pivot_thresh=0.0, options={"SymmetricMode": True})
+
+    def solve(self, loads: numpy.ndarray) -> tuple[numpy.ndarray, numpy.ndarray]:
+        """Solve for one or more load vectors at once.
+
+        Parameters
+        ----------
+        loads : numpy.ndarray
+            The (N, 3) nodal loads, or a (C, N, 3) stack of nodal loads.
+
+        Returns
+        -------
+        tuple[numpy.ndarray, numpy.ndarray]
+            The displacements and reactions, with the same shape as the loads.
+
+        """
+        loads = numpy.asarray(loads, dtype=float)
+        shape = loads.shape
+        F = loads.reshape(-1, 3 * len(self.nodes)).T
+        U = numpy.zeros_like(F)
+        U[self.free] = self._lu.solve(numpy.ascontiguousarray(F[self.free]))
+        R = numpy.zeros_like(F)
+        R[self.fixed] = self.stiffness[self.fixed] @ U - F[self.fixed]
+        return U.T.reshape(shape), R.T.reshape(shape)
+
+    def solve_cases(self, cases: dict[str, numpy.ndarray]) -> LoadCaseResults:
+        """Solve a set of load cases as multiple right-hand sides of one system.
+
+        Parameters
+        ----------
+        cases : dict[str, numpy.ndarray]
+            The (N, 3) nodal loads per load case.
+
+        Returns
+        -------
+        :class:`LoadCaseResults`
+
+        """
+        names = list(cases)
+        loads = numpy.stack([numpy.asarray(cases[name], dtype=float).reshape(-1, 3) for name in names]) if names else numpy.zeros((0, len(self.nodes), 3))
+        displacements, reactions = self.solve(loads)
+        return LoadCaseResults(names, displacements, reactions)
+
+    def stresses(self, displacements: numpy.ndarray, keys: Optional[numpy.ndarray] = None) -> numpy.ndarray:
+        """Compute the (constant) stress tensors of the tetrahedra.
+
+        Parameters
+        ----------
+        displacements : numpy.ndarray
+            The (N, 3) nodal displacements.
+        keys : numpy.ndarray, optional
+            The indices of a subset of the tetrahedra.
+
+        Returns
+        -------
+        numpy.ndarray
+            The (T, 3, 3) stress tensors.
+
+        """
+        tetrahedra = self.tetrahedra if keys is None else self.tetrahedra[keys]
+        B = self.B if keys is None else self.B[keys]
+        strains = numpy.einsum("tij,tj->ti", B, displacements[tetrahedra].reshape(-1, 12))
+        s11, s22, s33, s12, s23, s13 = (strains @ self.D.T).T
+        return stress_tensors(s11, s22, s33, s12, s13, s23)
@@ -0,0 +1,102 @@
+import os
+import pathlib
+from typing import Any
+
+import compas
+import numpy
+from compas.geometry import Brep
+
+from .binary import dump_femesh
+from .binary import load_femesh
+from .cutters import CutterBuffer
+from .femesh import FEMesh
+
+
+def dump_artifact(value: Any, basepath: pathlib.Path) -> tuple[str, pathlib.Path]:
+    """Write a pipeline artifact to a file in the format that fits its type.
+
+    Parameters
+    ----------
+    value : Any
+        A Brep, a cutter buffer, a finite element mesh, a (tuple of) arrays,
+        or any other value supported by :func:`compas.json_dump`.
+    basepath : pathlib.Path
+        The path of the file, without suffix.
+
+    Returns
+    -------
+    tuple[str, pathlib.Path]
+        The kind of artifact, to be passed to :func:`load_artifact`, and the path of the file.
+
+    Notes
+    -----
+    The file is written to a temporary path first and then moved into place,
+    such that an interrupted write never leaves a partial file behind.
+    Finite element meshes are written with :func:`knitcandela.dump_femesh`,
+    and are loaded as memory maps.
+
+    """
+    if isinstance(value, Brep):
+        kind, suffix = "brep", ".stp"
+    elif isinstance(value, CutterBuffer):
+        kind, suffix = "cutters", ".npz"
+    elif isinstance(value, FEMesh):
+        kind, suffix = "femeshbin", ".femesh"
+    elif isinstance(value, numpy.ndarray):
+        kind, suffix = "array", ".npz"
+    elif isinstance(value, tuple) and value and all(isinstance(item, numpy.ndarray) for item in value):
+        kind, suffix = "arrays", ".npz"
+    else:
+        kind, suffix = "json", ".json"
+
+    filepath = basepath.with_suffix(suffix)
+    tmp = filepath.with_name(f"~{filepath.name}")
+
+    if kind == "brep":
+        value.to_step(str(tmp))
+    elif kind == "femeshbin":
+        dump_femesh(value, tmp)
+    elif kind == "array":
+        with open(tmp, "wb") as f:
+            numpy.savez(f, value)
+    elif kind in ("cutters", "arrays"):
+        with open(tmp, "wb") as f:
+            numpy.savez(f, *value)
+    else:
+        compas.json_dump(value, tmp)
+
+    os.replace(tmp, filepath)
+    return kind, filepath
+
+
+def load_artifact(kind: str, filepath: pathlib.Path) -> Any:
+    """Read a pipeline artifact written by :func:`dump_artifact`.
+
+    Parameters
+    ----------
+    kind : str
+        The kind of artifact.
+    filepath : pathlib.Path
+        The path of the file.
+
+    Returns
+    -------
+    Any
+
+    """
+    if kind == "brep":
+        return Brep.from_step(str(filepath))
+    if kind == "femeshbin":
+        return load_femesh(filepath)
+    # finite element meshes of earlier versions of the cache are stored as npz
+    if kind in ("cutters", "femesh", "array", "arrays"):
+        with numpy.load(filepath) as data:
+            arrays = tuple(data[f"arr_{i}"] for i in range(len(data.files)))
+        if kind == "cutters":
+            return CutterBuffer(*arrays)
+        if kind == "femesh":
+            return FEMesh(*arrays)
+        if kind == "array":
+            return arrays[0]
+        return arrays
+    return compas.json_load(filepath)
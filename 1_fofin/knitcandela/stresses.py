@@ -0,0 +1,120 @@
+from typing import NamedTuple
+
+import numpy
+
+
+class PrincipalStresses(NamedTuple):
+    """Principal stresses of a stress field, with one row per principal value.
+
+    Attributes
+    ----------
+    points : numpy.ndarray
+        The (M, 3) reference points of the principal values.
+    values : numpy.ndarray
+        The (M,) principal values.
+    directions : numpy.ndarray
+        The (M, 3) unit principal directions.
+
+    Notes
+    -----
+    For solid results, every result point has three consecutive rows,
+    sorted from low to high principal value.
+
+    """
+
+    points: numpy.ndarray
+    values: numpy.ndarray
+    directions: numpy.ndarray
+
+
+def stress_tensors(s11: numpy.ndarray, s22: numpy.ndarray, s33: numpy.ndarray, s12: numpy.ndarray, s13: numpy.ndarray, s23: numpy.ndarray) -> numpy.ndarray:
+    """Assemble symmetric stress tensors from their components.
+
+    Parameters
+    ----------
+    s11, s22, s33, s12, s13, s23 : numpy.ndarray
+        The (N,) components.
+
+    Returns
+    -------
+    numpy.ndarray
+        The (N, 3, 3) tensors.
+
+    """
+    return numpy.stack(
+        [
+            numpy.stack([s11, s12, s13], axis=-1),
+            numpy.stack([s12, s22, s23], axis=-1),
+            numpy.stack([s13, s23, s33], axis=-1),
+        ],
+        axis=-2,
+    ).astype(float)
+
+
+def principal_stresses(points: numpy.ndarray, tensors: numpy.ndarray) -> PrincipalStresses:
+    """Compute the principal stresses of a set of stress tensors, in one batched eigendecomposition.
+
+    Parameters
+    ----------
+    points : numpy.ndarray
+        The (N, 3) reference points of the tensors.
+    tensors : numpy.ndarray
+        The (N, 3, 3) symmetric stress tensors.
+
+    Returns
+    -------
+    :class:`PrincipalStresses`
+
+    """
+    points = numpy.asarray(points, dtype=float).reshape(-1, 3)
+    values, vectors = numpy.linalg.eigh(tensors)
+    # the eigenvectors are the columns of the result of eigh
+    directions = numpy.swapaxes(vectors, 1, 2)
+    return PrincipalStresses(numpy.repeat(points, 3, axis=0), values.reshape(-1), directions.reshape(-1, 3))
+
+
+def stress_glyphs(principal: PrincipalStresses, scale: float = 500.0) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """Construct line buffers visualising the principal stresses.
+
+    Every principal value is drawn as two lines from its reference point,
+    along and against its direction, with a length proportional to its magnitude.
+
+    Parameters
+    ----------
+    principal : :class:`PrincipalStresses`
+        The principal stresses.
+    scale : float, optional
+        The length of the lines per unit of stress.
+
+    Returns
+    -------
+    tuple[numpy.ndarray, numpy.ndarray]
+        The (C, 2, 3) compression lines and the (T, 2, 3) tension lines,
+        in the format of the ``lines`` of a :class:`compas_viewer.scene.BufferGeometry`.
+
+    """
+    vectors = principal.directions * (numpy.abs(principal.values) * scale)[:, None]
+    start = numpy.repeat(principal.points, 2, axis=0)
+    end = start + numpy.stack([vectors, -vectors], axis=1).reshape(-1, 3)
+    lines = numpy.stack([start, end], axis=1)
+    tension = numpy.repeat(principal.values > 0, 2)
+    return lines[~tension], lines[tension]
+
+
+def line_colors(lines: numpy.ndarray, color: tuple[float, float, float, float]) -> numpy.ndarray:
+    """Construct a uniform color buffer for a line buffer.
+
+    Parameters
+    ----------
+    lines : numpy.ndarray
+        The (L, 2, 3) lines.
+    color : tuple[float, float, float, float]
+        The RGBA color.
+
+    Returns
+    -------
+    numpy.ndarray
+        The (L, 8) colors of the start and end points of the lines.
+
+    """
+    return numpy.tile(numpy.asarray(color, dtype=float), (len(lines), 2))
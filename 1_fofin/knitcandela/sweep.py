@@ -0,0 +1,328 @@
+import csv
+import itertools
+import multiprocessing
+import pathlib
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+from typing import Callable
+from typing import NamedTuple
+from typing import Optional
+from typing import Union
+
+import numpy
+import scipy.stats
+
+from .cache import StageCache
+from .cache import geometric_hash
+from .storage import dump_artifact
+from .storage import load_artifact
+
+# ==============================================================================
+# Samplers
+# ==============================================================================
+
+
+def parameter_grid(grid: dict[str, list], base: Optional[dict] = None) -> list[dict]:
+    """Combine lists of parameter values into the samples of a full factorial grid.
+
+    Parameters
+    ----------
+    grid : dict[str, list]
+        The values per parameter.
+    base : dict, optional
+        Parameters that are the same for all samples.
+
+    Returns
+    -------
+    list[dict]
+        One parameter dict per combination of values, with the last parameter varying fastest.
+
+    Examples
+    --------
+    >>> parameter_grid({"thickness": [0.1, 0.15], "ribs": [0.05]})
+    [{'thickness': 0.1, 'ribs': 0.05}, {'thickness': 0.15, 'ribs': 0.05}]
+
+    """
+    names = list(grid)
+    return [{**(base or {}), **dict(zip(names, values))} for values in itertools.product(*(grid[name] for name in names))]
+
+
+def parameter_samples(bounds: dict[str, tuple[float, float]], n: int, base: Optional[dict] = None, seed: Optional[int] = None) -> list[dict]:
+    """Sample parameter values in a box with a Latin hypercube design.
+
+    Parameters
+    ----------
+    bounds : dict[str, tuple[float, float]]
+        The lower and upper bound per parameter.
+    n : int
+        The number of samples.
+    base : dict, optional
+        Parameters that are the same for all samples.
+    seed : int, optional
+        The seed of the random number generator.
+
+    Returns
+    -------
+    list[dict]
+
+    """
+    names = list(bounds)
+    lower, upper = numpy.array([bounds[name] for name in names], dtype=float).T
+    unit = scipy.stats.qmc.LatinHypercube(d=len(names), seed=seed).random(n)
+    values = scipy.stats.qmc.scale(unit, lower, upper) if len(names) else unit
+    return [{**(base or {}), **dict(zip(names, row))} for row in values.tolist()]
+
+
+# ==============================================================================
+# Stages
+# ==============================================================================
+
+
+class Stage(NamedTuple):
+    """A stage of a parametric sweep.
+
+    Attributes
+    ----------
+    name : str
+        The name of the stage, and of its artifacts in the stage cache.
+    func : Callable[[dict, dict], tuple[Any, dict[str, float]]]
+        A function defined at module level, such that it can be sent to the worker processes.
+        It is called with the values of the inputs per name, and with the parameters of the stage,
+        and returns the artifact of the stage and a dict of metrics.
+    inputs : tuple[str, ...]
+        The names of the upstream stages and of the shared data that the stage uses.
+    params : tuple[str, ...]
+        The names of the parameters that the stage depends on.
+
+    Notes
+    -----
+    The key of an artifact only depends on the keys of the inputs of the stage and on the values of its parameters.
+    Samples that only differ in the parameters of downstream stages therefore share the artifact.
+
+    """
+
+    name: str
+    func: Callable[[dict, dict], tuple[Any, dict[str, float]]]
+    inputs: tuple[str, ...] = ()
+    params: tuple[str, ...] = ()
+
+
+class SweepResults(NamedTuple):
+    """Metrics and timings of the samples of a parametric sweep, one row per sample.
+
+    Attributes
+    ----------
+    samples : list[dict]
+        The parameters of the samples.
+    metrics : dict[str, numpy.ndarray]
+        The (S,) values per metric, NaN for samples that do not have the metric.
+    durations : dict[str, numpy.ndarray]
+        The (S,) compute time of the artifact of every stage, in seconds,
+        also if the artifact was computed for another sample or in a previous sweep.
+    reused : dict[str, numpy.ndarray]
+        The (S,) flags per stage, True if the artifact was not computed for the sample itself.
+    errors : list[str | None]
+        The traceback of the first stage that failed for every sample, or None.
+
+    """
+
+    samples: list[dict]
+    metrics: dict[str, numpy.ndarray]
+    durations: dict[str, numpy.ndarray]
+    reused: dict[str, numpy.ndarray]
+    errors: list[Optional[str]]
+
+    def columns(self) -> dict[str, numpy.ndarray]:
+        """Collect parameters, metrics and durations as columns of one table.
+
+        Returns
+        -------
+        dict[str, numpy.ndarray]
+            The parameter columns first, then the metrics, then the durations as ``"time_<stage>"``.
+
+        """
+        names: dict[str, None] = {}
+        for sample in self.samples:
+            names.update(dict.fromkeys(sample))
+        columns = {name: numpy.array([sample.get(name, numpy.nan) for sample in self.samples]) for name in names}
+        columns.update(self.metrics)
+        columns.update({f"time_{stage}": durations for stage, durations in self.durations.items()})
+        return columns
+
+    def table(self, columns: Optional[list[str]] = None) -> str:
+        """Format the results as a table, one row per sample.
+
+        Parameters
+        ----------
+        columns : list[str], optional
+            The columns to include.
+            Default is all columns.
+
+        Returns
+        -------
+        str
+
+        """
+        data = self.columns()
+        columns = columns or list(data)
+        width = max([len(column) for column in columns] + [10]) + 2
+        lines = ["sample".rjust(6) + "".join(column.rjust(width) for column in columns)]
+        for i in range(len(self.samples)):
+            values = "".join(f"{data[column][i]:>{width}.6g}" if numpy.issubdtype(data[column].dtype, numpy.number) else f"{data[column][i]!s:>{width}}" for column in columns)
+            lines.append(f"{i:>6}{values}" + ("  failed" if self.errors[i] else ""))
+        return "\n".join(lines)
+
+    def to_csv(self, filepath: Union[str, pathlib.Path]) -> None:
+        """Write the results to a CSV file, one row per sample.
+
+        Parameters
+        ----------
+        filepath : str | pathlib.Path
+            The path of the file.
+
+        Returns
+        -------
+        None
+
+        """
+        data = self.columns()
+        with open(filepath, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["sample"] + list(data) + ["error"])
+            for i in range(len(self.samples)):
+                error = self.errors[i].strip().splitlines()[-1] if self.errors[i] else ""
+                writer.writerow([i] + [values[i].item() for values in data.values()] + [error])
+
+
+# ==============================================================================
+# Workers
+# ==============================================================================
+
+
+def _run_stage(job: tuple) -> tuple[Optional[str], Optional[str], dict[str, float], float, Optional[str]]:
+    func, data, artifacts, params, basepath = job
+    t0 = time.perf_counter()
+    try:
+        inputs = {**data, **{name: load_artifact(kind, filepath) for name, (kind, filepath) in artifacts.items()}}
+        value, metrics = func(inputs, params)
+        kind, filepath = dump_artifact(value, basepath)
+        return kind, str(filepath), {name: float(value) for name, value in metrics.items()}, time.perf_counter() - t0, None
+    except Exception:
+        return None, None, {}, time.perf_counter() - t0, traceback.format_exc()
+
+
+# ==============================================================================
+
+
+def run_sweep(
+    stages: list[Stage],
+    samples: list[dict],
+    cache: StageCache,
+    data: Optional[dict[str, Any]] = None,
+    processes: Optional[int] = None,
+) -> SweepResults:
+    """Run the stages of a pipeline for every sample of a parametric sweep, in a process pool.
+
+    The stages run one after the other.
+    The artifacts of one stage are computed in parallel,
+    and every distinct artifact is computed only once,
+    for all samples that share the inputs and parameters of the stage.
+    Artifacts that are already in the stage cache, for example of a previous sweep, are not computed again.
+
+    Parameters
+    ----------
+    stages : list[:class:`Stage`]
+        The stages, in the order in which they depend on each other.
+    samples : list[dict]
+        The parameters per sample, for example from :func:`parameter_grid` or :func:`parameter_samples`.
+    cache : :class:`knitcandela.StageCache`
+        The cache in which the artifacts are stored and shared between samples and sweeps.
+        Worker processes write the artifacts, and the index is managed by the calling process only.
+    data : dict[str, Any], optional
+        Shared inputs of the stages that do not depend on the parameters, for example the cablemesh.
+        The values are sent to the workers, and have to be picklable.
+    processes : int, optional
+        The number of worker processes.
+        Default is the number of CPUs.
+
+    Returns
+    -------
+    :class:`SweepResults`
+
+    Notes
+    -----
+    If a stage fails for a sample, the downstream stages of that sample are skipped,
+    and the traceback is returned in :attr:`SweepResults.errors`.
+
+    """
+    data = data or {}
+    datakeys = {name: geometric_hash(value) for name, value in data.items()}
+    n = len(samples)
+
+    keys: dict[str, list[str]] = {}
+    metrics: dict[str, dict[int, float]] = {}
+    durations: dict[str, numpy.ndarray] = {}
+    reused: dict[str, numpy.ndarray] = {}
+    errors: list[Optional[str]] = [None] * n
+    locations: dict[tuple[str, str], tuple[str, pathlib.Path]] = {}
+
+    # the workers only import the modules of the stage functions
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context) as executor:
+        for stage in stages:
+            keys[stage.name] = [
+                geometric_hash(stage.name, [keys[name][i] if name in keys else datakeys[name] for name in stage.inputs], {name: sample[name] for name in stage.params})
+                for i, sample in enumerate(samples)
+            ]
+            active = [i for i in range(n) if errors[i] is None]
+            first = {}
+            for i in active:
+                first.setdefault(keys[stage.name][i], i)
+
+            jobs = {}
+            summaries: dict[str, dict] = {}
+            for key, i in first.items():
+                location = cache.locate(stage.name, key)
+                summary = cache.get(f"{stage.name}-metrics", key) if location else None
+                if location and summary is not None:
+                    locations[stage.name, key] = location
+                    summaries[key] = {**summary, "reused": True}
+                    continue
+                artifacts = {name: locations[name, keys[name][i]] for name in stage.inputs if name in keys}
+                inputs = {name: data[name] for name in stage.inputs if name not in keys}
+                params = {name: samples[i][name] for name in stage.params}
+                jobs[key] = executor.submit(_run_stage, (stage.func, inputs, artifacts, params, cache.basepath(stage.name, key)))
+
+            for key, future in jobs.items():
+                kind, filepath, values, duration, error = future.result()
+                if error:
+                    summaries[key] = {"metrics": {}, "time": duration, "error": error}
+                    continue
+                cache.register(stage.name, key, kind, pathlib.Path(filepath))
+                summary = {"metrics": values, "time": duration}
+                cache.put(f"{stage.name}-metrics", key, summary)
+                locations[stage.name, key] = (kind, pathlib.Path(filepath))
+                summaries[key] = {**summary, "reused": False}
+
+            durations[stage.name] = numpy.full(n, numpy.nan)
+            reused[stage.name] = numpy.zeros(n, dtype=bool)
+            for i in active:
+                key = keys[stage.name][i]
+                summary = summaries[key]
+                if summary.get("error"):
+                    errors[i] = f"{stage.name}: {summary['error']}"
+                    continue
+                for name, value in summary["metrics"].items():
+                    metrics.setdefault(name, {})[i] = value
+                durations[stage.name][i] = summary["time"]
+                reused[stage.name][i] = summary["reused"] or first[key] != i
+
+    return SweepResults(
+        samples=[dict(sample) for sample in samples],
+        metrics={name: numpy.array([values.get(i, numpy.nan) for i in range(n)]) for name, values in metrics.items()},
+        durations=durations,
+        reused=reused,
+        errors=errors,
+    )
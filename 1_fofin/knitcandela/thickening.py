@@ -0,0 +1,123 @@
+from typing import Optional
+from typing import Union
+
+import numpy
+from compas.datastructures import Mesh
+
+from .arrays import arrays_to_mesh
+from .arrays import boundary_halfedges
+from .arrays import flip_faces
+from .arrays import mesh_to_arrays
+from .arrays import pad_faces
+from .arrays import vertex_normals
+
+
+def offset_vertices(vertices: numpy.ndarray, faces: numpy.ndarray, distance: float) -> numpy.ndarray:
+    """Offset all vertices of a mesh along their vertex normals.
+
+    Parameters
+    ----------
+    vertices : numpy.ndarray
+        The vertex coordinates.
+    faces : numpy.ndarray
+        The padded face vertex indices.
+    distance : float
+        The offset distance.
+        Negative values offset in the direction opposite to the normals.
+
+    Returns
+    -------
+    numpy.ndarray
+        The offset vertex coordinates.
+
+    """
+    return vertices + vertex_normals(vertices, faces) * distance
+
+
+def thicken(
+    vertices: numpy.ndarray,
+    faces: numpy.ndarray,
+    thickness: float,
+    support_height: Optional[float] = 0.1,
+) -> tuple[numpy.ndarray, numpy.ndarray]:
+    """Thicken a surface mesh into a closed shell.
+
+    Parameters
+    ----------
+    vertices : numpy.ndarray
+        The (V, 3) vertex coordinates of the surface.
+    faces : numpy.ndarray
+        The padded face vertex indices of the surface.
+    thickness : float
+        The offset distance of the extrados along the vertex normals.
+    support_height : float, optional
+        Vertices of the shell below this height are projected to ``z = 0``.
+        Use ``None`` to skip the projection.
+
+    Returns
+    -------
+    tuple[numpy.ndarray, numpy.ndarray]
+        The (2V, 3) vertex coordinates of the shell,
+        with the vertices of the surface first and the vertices of the extrados second,
+        and the padded face vertex indices of the shell,
+        with the flipped surface faces first, the extrados faces second, and the side faces last.
+
+    """
+    vertices = numpy.asarray(vertices, dtype=float)
+    faces = pad_faces(faces, width=4)
+    n = len(vertices)
+
+    edos = offset_vertices(vertices, faces, thickness)
+
+    top = numpy.where(faces >= 0, faces + n, -1)
+    bottom = flip_faces(faces)
+
+    edges = boundary_halfedges(faces)
+    sides = numpy.full((len(edges), faces.shape[1]), -1, dtype=numpy.int64)
+    sides[:, 0] = edges[:, 0]
+    sides[:, 1] = edges[:, 1]
+    sides[:, 2] = edges[:, 1] + n
+    sides[:, 3] = edges[:, 0] + n
+
+    xyz = numpy.vstack([vertices, edos])
+    if support_height is not None:
+        xyz[xyz[:, 2] < support_height, 2] = 0.0
+
+    return xyz, numpy.vstack([bottom, top, sides])
+
+
+def shell_from_cablemesh(
+    cablemesh: Mesh,
+    thickness: float,
+    support_height: Optional[float] = 0.1,
+    mesh: bool = False,
+) -> Union[tuple[numpy.ndarray, numpy.ndarray], Mesh]:
+    """Construct a closed shell by thickening a cablemesh along its vertex normals.
+
+    Parameters
+    ----------
+    cablemesh : :class:`compas.datastructures.Mesh`
+        The form found cablemesh.
+    thickness : float
+        The thickness of the shell.
+    support_height : float, optional
+        Vertices of the shell below this height are projected to ``z = 0``.
+        Use ``None`` to skip the projection.
+    mesh : bool, optional
+        If True, return the shell as a :class:`compas.datastructures.Mesh`
+        instead of as a vertex and face array.
+
+    Returns
+    -------
+    tuple[numpy.ndarray, numpy.ndarray] | :class:`compas.datastructures.Mesh`
+
+    See Also
+    --------
+    :func:`thicken`
+
+    """
+    vertices, faces = mesh_to_arrays(cablemesh)
+    vertices, faces = thicken(vertices, faces, thickness, support_height=support_height)
+    if mesh:
+        return arrays_to_mesh(vertices, faces)
+    return vertices, faces
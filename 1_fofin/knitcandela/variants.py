@@ -0,0 +1,241 @@
+import multiprocessing
+import os
+import pathlib
+import shutil
+import tempfile
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+from typing import Callable
+from typing import NamedTuple
+from typing import Optional
+from typing import Union
+
+import numpy
+
+from .contours import von_mises
+from .results import ResultStore
+from .stresses import stress_tensors
+
+# ==============================================================================
+# Workers
+# ==============================================================================
+
+
+def _run_variant(job: tuple) -> tuple[str, dict[str, float], float, Optional[str]]:
+    task, name, params, folder = job
+
+    # every variant runs in its own folder
+    # such that the input files, databases and temporary files of different variants never collide
+    shutil.rmtree(folder, ignore_errors=True)
+    tmp = folder / "tmp"
+    tmp.mkdir(parents=True)
+    os.chdir(folder)
+    os.environ["TMPDIR"] = str(tmp)
+    tempfile.tempdir = str(tmp)
+
+    t0 = time.perf_counter()
+    try:
+        metrics = {key: float(value) for key, value in task(params, folder).items()}
+        error = None
+    except Exception:
+        metrics = {}
+        error = traceback.format_exc()
+    return name, metrics, time.perf_counter() - t0, error
+
+
+# ==============================================================================
+
+
+class VariantResults(NamedTuple):
+    """Results of a set of independent analysis variants, gathered into one comparable set.
+
+    Attributes
+    ----------
+    names : list[str]
+        The names of the variants.
+    params : list
+        The parameters of the variants.
+    folders : list[pathlib.Path]
+        The working directories of the variants.
+    metrics : dict[str, numpy.ndarray]
+        The (V,) values per metric, NaN for variants that did not report the metric.
+    durations : numpy.ndarray
+        The (V,) wall clock time of the task of every variant, in seconds.
+    errors : list[str | None]
+        The traceback of every variant that failed, or None.
+
+    """
+
+    names: list[str]
+    params: list
+    folders: list[pathlib.Path]
+    metrics: dict[str, numpy.ndarray]
+    durations: numpy.ndarray
+    errors: list[Optional[str]]
+
+    def variant(self, name: str) -> dict[str, float]:
+        """Get the metrics of a single variant.
+
+        Parameters
+        ----------
+        name : str
+            The name of the variant.
+
+        Returns
+        -------
+        dict[str, float]
+
+        """
+        index = self.names.index(name)
+        return {metric: float(values[index]) for metric, values in self.metrics.items()}
+
+    def store(self, name: str, path: str = "results") -> ResultStore:
+        """Open the result store that a variant wrote into its working directory.
+
+        Parameters
+        ----------
+        name : str
+            The name of the variant.
+        path : str, optional
+            The path of the store, relative to the working directory of the variant.
+
+        Returns
+        -------
+        :class:`knitcandela.ResultStore`
+
+        """
+        return ResultStore(self.folders[self.names.index(name)] / path)
+
+    def table(self, metrics: Optional[list[str]] = None) -> str:
+        """Format the metrics of all variants as a table, one row per variant.
+
+        Parameters
+        ----------
+        metrics : list[str], optional
+            The metrics to include.
+            Default is all metrics.
+
+        Returns
+        -------
+        str
+
+        """
+        metrics = metrics or list(self.metrics)
+        width = max([len(name) for name in self.names] + [7])
+        lines = [f"{'variant':<{width}} " + " ".join(f"{metric:>14}" for metric in metrics) + f" {'time':>9}"]
+        for i, name in enumerate(self.names):
+            values = " ".join(f"{self.metrics[metric][i]:>14.6g}" for metric in metrics)
+            status = f"{self.durations[i]:>8.2f}s" if self.errors[i] is None else "   failed"
+            lines.append(f"{name:<{width}} {values} {status}")
+        return "\n".join(lines)
+
+
+def run_variants(
+    task: Callable[[Any, pathlib.Path], dict[str, float]],
+    variants: dict[str, Any],
+    folder: Union[str, pathlib.Path],
+    processes: Optional[int] = None,
+) -> VariantResults:
+    """Run independent analysis variants concurrently, each in its own process and working directory.
+
+    Parameters
+    ----------
+    task : Callable[[Any, pathlib.Path], dict[str, float]]
+        A function defined at module level, such that it can be sent to the worker processes.
+        It is called with the parameters of one variant and its working directory,
+        builds and analyses the model of the variant,
+        and returns the metrics that are compared between variants.
+        Larger results, for example a :class:`knitcandela.ResultStore`, are written into the working directory.
+    variants : dict[str, Any]
+        The parameters per variant name, for example material properties, mesh sizes or support layouts.
+        The parameters are sent to the workers, and have to be picklable.
+    folder : str | pathlib.Path
+        The parent folder of the working directories.
+        The working directory of a variant is the subfolder with its name,
+        and is emptied before the variant runs.
+    processes : int, optional
+        The number of worker processes.
+        Default is the number of CPUs.
+
+    Returns
+    -------
+    :class:`VariantResults`
+        The results in the order of the variants.
+
+    Notes
+    -----
+    A variant that raises an exception does not stop the others.
+    Its traceback is returned in :attr:`VariantResults.errors`.
+    The working directory, ``TMPDIR`` and :data:`tempfile.tempdir` of the workers are changed for every variant,
+    such that analysis backends that write to the current or the temporary folder stay isolated as well.
+
+    See Also
+    --------
+    :func:`store_metrics`
+
+    """
+    folder = pathlib.Path(folder).resolve()
+    names = list(variants)
+    jobs = [(task, name, variants[name], folder / name) for name in names]
+
+    # analysis backends keep global state and may run threads of their own
+    # worker processes are therefore started fresh instead of forked
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context) as executor:
+        results = list(executor.map(_run_variant, jobs))
+
+    keys: dict[str, None] = {}
+    for _, metrics, _, _ in results:
+        keys.update(dict.fromkeys(metrics))
+    metrics = {key: numpy.array([values.get(key, numpy.nan) for _, values, _, _ in results], dtype=float) for key in keys}
+
+    return VariantResults(
+        names=names,
+        params=[variants[name] for name in names],
+        folders=[job[3] for job in jobs],
+        metrics=metrics,
+        durations=numpy.array([duration for _, _, duration, _ in results]),
+        errors=[error for _, _, _, error in results],
+    )
+
+
+def store_metrics(store: ResultStore, step: str, part: Optional[str] = None) -> dict[str, float]:
+    """Summarize the fields of one step of a result store into scalar metrics that can be compared between variants.
+
+    Parameters
+    ----------
+    store : :class:`knitcandela.ResultStore`
+        The result store.
+    step : str
+        The name of the step.
+    part : str, optional
+        The name of the part.
+        Default is the only part of every field.
+
+    Returns
+    -------
+    dict[str, float]
+        The maximum displacement magnitude and component under ``"U"``, ``"U1"``, ...,
+        the sum of the reactions under ``"RF1"``, ...,
+        and the maximum von Mises stress under ``"S_vm"``.
+        Only the metrics of the fields in the store are included.
+
+    """
+    fields = store.fields(step)
+    metrics: dict[str, float] = {}
+    if "U" in fields:
+        displacements = store.field(step, "U", part).array(["U1", "U2", "U3"])
+        metrics["U"] = float(numpy.linalg.norm(displacements, axis=1).max())
+        for i in range(3):
+            metrics[f"U{i + 1}"] = float(numpy.abs(displacements[:, i]).max())
+    if "RF" in fields:
+        reactions = store.field(step, "RF", part).array(["RF1", "RF2", "RF3"])
+        for i in range(3):
+            metrics[f"RF{i + 1}"] = float(reactions[:, i].sum())
+    if "S3D" in fields:
+        stresses = store.field(step, "S3D", part)
+        tensors = stress_tensors(*(numpy.asarray(stresses[column]) for column in ("S11", "S22", "S33", "S12", "S13", "S23")))
+        metrics["S_vm"] = float(von_mises(tensors).max())
+    return metrics
@@ -0,0 +1,275 @@
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+from typing import Union
+
+import numpy
+from compas.datastructures import Mesh
+from compas.geometry import Box
+from compas.geometry import Brep
+from compas.geometry import Frame
+from compas.geometry import Point
+from compas.geometry import offset_polygon
+from compas.itertools import pairwise
+
+from .arrays import pad_faces
+from .arrays import unpad_faces
+from .cutters import CutterBuffer
+
+# ==============================================================================
+# Workers
+# ==============================================================================
+
+_shell: Optional[Brep] = None
+
+
+def _init_worker(vertices: list, faces: list) -> None:
+    global _shell
+    _shell = Brep.from_mesh(Mesh.from_vertices_and_faces(vertices, faces))
+
+
+def _cut_patch(task: tuple) -> str:
+    bounds, cutters, filepath = task
+
+    (xmin, ymin, zmin), (xmax, ymax, zmax) = bounds
+    frame = Frame([0.5 * (xmin + xmax), 0.5 * (ymin + ymax), 0.5 * (zmin + zmax)])
+    box = Box(xmax - xmin, ymax - ymin, zmax - zmin, frame=frame)
+
+    patch = _shell & Brep.from_box(box)
+    if not cutters:
+        patch.to_step(filepath)
+        return filepath
+
+    tools = Brep.from_breps([Brep.from_mesh(Mesh.from_vertices_and_faces(vertices.tolist(), unpad_faces(faces))) for vertices, faces in cutters])
+    result = patch - tools
+    result.to_step(filepath)
+    return filepath
+
+
+# ==============================================================================
+# Cutters
+# ==============================================================================
+
+
+def waffle_cutters(idos: Mesh, ribs: float, thickness: float) -> list[Mesh]:
+    """Construct one tapered cutter box per face of the intrados.
+
+    Parameters
+    ----------
+    idos : :class:`compas.datastructures.Mesh`
+        The intrados mesh.
+    ribs : float
+        The width of the ribs between the boxes.
+    thickness : float
+        The height of the boxes along the vertex normals.
+
+    Returns
+    -------
+    list[:class:`compas.datastructures.Mesh`]
+
+    See Also
+    --------
+    :func:`knitcandela.cutters.cutter_buffer`
+
+    """
+    boxes: list[Mesh] = []
+
+    vertex_point = {vertex: idos.vertex_point(vertex) for vertex in idos.vertices()}
+    vertex_normal = {vertex: idos.vertex_normal(vertex) for vertex in idos.vertices()}
+
+    for face in idos.faces():
+        # vertices of the face
+        vertices = idos.face_vertices(face)
+
+        # coordinates and normals of the face vertices
+        points = [vertex_point[vertex] for vertex in vertices]
+        normals = [vertex_normal[vertex] for vertex in vertices]
+
+        # bottom face of the box as an inward offset of the face polygon
+        bottom = [Point(*point) for point in offset_polygon(points, distance=0.5 * ribs)]
+
+        # additional offset to create tapering
+        inset = [Point(*point) for point in offset_polygon(points, distance=0.5 * ribs)]
+
+        # top face of the box
+        top = [point + normal * thickness for point, normal in zip(inset, normals)]
+
+        # box sides
+        bottomloop = bottom + bottom[:1]
+        toploop = top + top[:1]
+        sides = []
+        for (a, b), (aa, bb) in zip(pairwise(bottomloop[::-1]), pairwise(toploop[::-1])):
+            sides.append([a, aa, bb, b])
+
+        # box mesh from polygons
+        polygons = [bottom[::-1], top] + sides
+        boxes.append(Mesh.from_polygons(polygons))
+
+    return boxes
+
+
+# ==============================================================================
+# Patches
+# ==============================================================================
+
+
+def patch_bounds(vertices: numpy.ndarray, patches: tuple[int, int], margin: float = 1.0) -> list[tuple[tuple[float, float, float], tuple[float, float, float]]]:
+    """Divide the bounding box of a point cloud into a regular grid of patches in the XY plane.
+
+    Parameters
+    ----------
+    vertices : numpy.ndarray
+        The point coordinates.
+    patches : tuple[int, int]
+        The number of patches in the X and Y direction.
+    margin : float, optional
+        Distance by which the outer boundaries of the grid are extended.
+
+    Returns
+    -------
+    list[tuple[tuple[float, float, float], tuple[float, float, float]]]
+        The min and max corners of the patches.
+
+    """
+    vertices = numpy.asarray(vertices, dtype=float)
+    lower = vertices.min(axis=0) - margin
+    upper = vertices.max(axis=0) + margin
+    xs = numpy.linspace(lower[0], upper[0], patches[0] + 1)
+    ys = numpy.linspace(lower[1], upper[1], patches[1] + 1)
+    bounds = []
+    for i in range(patches[0]):
+        for j in range(patches[1]):
+            bounds.append(((xs[i], ys[j], lower[2]), (xs[i + 1], ys[j + 1], upper[2])))
+    return bounds
+
+
+def _cutter_arrays(cutters: Union[list[Mesh], CutterBuffer]) -> tuple[list[tuple[numpy.ndarray, numpy.ndarray]], numpy.ndarray, numpy.ndarray]:
+    if isinstance(cutters, CutterBuffer):
+        lower, upper = cutters.bounds()
+        return list(cutters.cutters()), lower, upper
+
+    buffers = []
+    for cutter in cutters:
+        vertices, faces = cutter.to_vertices_and_faces()
+        buffers.append((numpy.asarray(vertices, dtype=float), pad_faces(faces)))
+    lower = numpy.array([vertices.min(axis=0) for vertices, _ in buffers]).reshape(-1, 3)
+    upper = numpy.array([vertices.max(axis=0) for vertices, _ in buffers]).reshape(-1, 3)
+    return buffers, lower, upper
+
+
+def _overlapping(bounds: tuple, lower: numpy.ndarray, upper: numpy.ndarray) -> numpy.ndarray:
+    (xmin, ymin, _), (xmax, ymax, _) = bounds
+    return (lower[:, 0] <= xmax) & (upper[:, 0] >= xmin) & (lower[:, 1] <= ymax) & (upper[:, 1] >= ymin)
+
+
+# ==============================================================================
+# Booleans
+# ==============================================================================
+
+
+def waffle_boolean_serial(shell: Mesh, cutters: Union[list[Mesh], CutterBuffer]) -> Brep:
+    """Subtract the cutters from the shell in one boolean operation.
+
+    Parameters
+    ----------
+    shell : :class:`compas.datastructures.Mesh`
+        The closed shell mesh.
+    cutters : list[:class:`compas.datastructures.Mesh`] | :class:`CutterBuffer`
+        The closed cutters.
+
+    Returns
+    -------
+    :class:`compas.geometry.Brep`
+
+    """
+    if isinstance(cutters, CutterBuffer):
+        cutters = [Mesh.from_vertices_and_faces(vertices.tolist(), unpad_faces(faces)) for vertices, faces in cutters.cutters()]
+    A = Brep.from_mesh(shell)
+    return A - [Brep.from_mesh(cutter) for cutter in cutters]
+
+
+def waffle_boolean(
+    shell: Mesh,
+    cutters: Union[list[Mesh], CutterBuffer],
+    patches: tuple[int, int] = (4, 4),
+    processes: Optional[int] = None,
+    simplify: bool = True,
+) -> Brep:
+    """Subtract the cutters from the shell patch by patch, in a process pool.
+
+    The shell is split into a regular grid of patches in the XY plane.
+    Per patch, the cutters that overlap the patch are combined into one compound tool,
+    and subtracted from the intersection of the shell and the patch box in a single boolean operation.
+    The cut patches are stitched back together with one boolean union.
+
+    Parameters
+    ----------
+    shell : :class:`compas.datastructures.Mesh`
+        The closed shell mesh.
+    cutters : list[:class:`compas.datastructures.Mesh`] | :class:`CutterBuffer`
+        The closed cutters.
+    patches : tuple[int, int], optional
+        The number of patches in the X and Y direction.
+    processes : int, optional
+        The number of worker processes.
+        Default is the number of CPUs.
+    simplify : bool, optional
+        If True, merge the faces that were split along the patch boundaries.
+
+    Returns
+    -------
+    :class:`compas.geometry.Brep`
+
+    Raises
+    ------
+    ValueError
+        If nothing is left of the shell in any of the patches.
+
+    See Also
+    --------
+    :func:`waffle_boolean_serial`
+    :func:`knitcandela.cutters.cutter_buffer`
+
+    """
+    vertices, faces = shell.to_vertices_and_faces()
+    buffers, lower, upper = _cutter_arrays(cutters)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tasks = []
+        for index, bounds in enumerate(patch_bounds(vertices, patches)):
+            selection = numpy.nonzero(_overlapping(bounds, lower, upper))[0]
+            tasks.append((bounds, [buffers[i] for i in selection], os.path.join(tmp, f"patch_{index}.stp")))
+
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(vertices, faces)) as executor:
+            filepaths = list(executor.map(_cut_patch, tasks))
+
+        parts = [Brep.from_step(filepath) for filepath in filepaths]
+
+    parts = [part for part in parts if part.volume > 0]
+    if not parts:
+        raise ValueError("The cutters remove the entire shell: all patches are empty.")
+    waffle = Brep.from_boolean_union(parts[0], parts[1:]) if len(parts) > 1 else parts[0]
+    if isinstance(waffle, list):
+        waffle = waffle[0]
+    if simplify:
+        waffle.simplify()
+    return waffle
+
+
+def compare_waffles(a: Brep, b: Brep, tol: float = 1e-3) -> bool:
+    """Check that two waffles have the same volume and surface area, up to a relative tolerance.
+
+    Parameters
+    ----------
+    a : :class:`compas.geometry.Brep`
+    b : :class:`compas.geometry.Brep`
+    tol : float, optional
+        The relative tolerance.
+
+    Returns
+    -------
+    bool
+
+    """
+    return abs(a.volume - b.volume) <= tol * abs(b.volume) and abs(a.area - b.area) <= tol * abs(b.area)
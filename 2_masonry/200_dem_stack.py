@@ -7,6 +7,7 @@ from compas.colors import Color
 from compas.geometry import Box
 from compas_masonry.models import BlockModel
 from compas_viewer import Viewer
+from dem import compute_contacts
 
 # =============================================================================
 # Block Geometry
@@ -33,7 +34,10 @@ for i in range(10):
 
 model = BlockModel.from_boxes(blocks)
 
-model.compute_contacts()
+# every pair of blocks with overlapping bounding boxes is tested for contact
+# instead of the k nearest neighbours of every block
+
+compute_contacts(model)
 
 # =============================================================================
 # Export
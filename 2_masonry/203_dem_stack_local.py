@@ -10,6 +10,7 @@ from compas.geometry import Translation
 from compas_masonry.elements import BlockElement
 from compas_masonry.models import BlockModel
 from compas_viewer import Viewer
+from dem import ContactTracker
 
 # =============================================================================
 # Block Geometry
@@ -46,7 +47,23 @@ for frame in frames:
     block.frame = frame
     model.add_element(block)
 
-model.compute_contacts()
+# every pair of blocks with overlapping bounding boxes is tested for contact
+# instead of the k nearest neighbours of every block
+# the tracker keeps the contacts up to date when blocks are moved afterwards
+
+tracker = ContactTracker(model)
+
+# =============================================================================
+# Local edits
+# =============================================================================
+
+# only the contacts of the moved block are recomputed
+# with the blocks of which the bounding boxes overlap its new bounding box
+
+block: BlockElement = list(model.elements())[5]
+block.frame = Frame.from_transformation(Translation.from_vector([0.05, 0, 0]) * Transformation.from_frame(block.frame))
+
+tracker.update()
 
 # =============================================================================
 # Viz
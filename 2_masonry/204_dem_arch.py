@@ -2,6 +2,7 @@ from compas.colors import Color
 from compas_masonry.models import BlockModel
 from compas_masonry.templates import ArchTemplate
 from compas_viewer import Viewer
+from dem import compute_contacts
 
 # =============================================================================
 # Template
@@ -15,7 +16,10 @@ template = ArchTemplate(rise=3, span=10, thickness=0.5, depth=0.5, n=200)
 
 model = BlockModel.from_template(template)
 
-model.compute_contacts(k=2)
+# every pair of blocks with overlapping bounding boxes is tested for contact
+# instead of the k nearest neighbours of every block
+
+compute_contacts(model)
 
 # =============================================================================
 # Viz
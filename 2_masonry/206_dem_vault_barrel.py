@@ -6,6 +6,7 @@ from compas_masonry.models import BlockModel
 from compas_masonry.templates import BarrelVaultTemplate
 from compas_viewer import Viewer
 from compas_viewer.config import Config
+from dem import compute_contacts
 
 # =============================================================================
 # Template
@@ -19,7 +20,10 @@ template = BarrelVaultTemplate(span=6000, length=6000, thickness=250, rise=600,
 
 model = BlockModel.from_barrelvault(template)
 
-model.compute_contacts(k=6)
+# every pair of blocks with overlapping bounding boxes is tested for contact
+# instead of the k nearest neighbours of every block
+
+compute_contacts(model)
 
 # =============================================================================
 # Export
@@ -1,12 +1,12 @@
 import pathlib
 
 import compas
-from compas_masonry.analysis import cra_penalty_solve
 
 # from compas_masonry.analysis import rbe_solve
 from compas_masonry.elements import BlockElement
 from compas_masonry.models import BlockModel
 from compas_masonry.viewers import BlockModelViewer
+from dem import cra_penalty_solve
 
 # =============================================================================
 # Load model
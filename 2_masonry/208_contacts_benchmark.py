@@ -0,0 +1,44 @@
+import time
+
+import numpy
+from dem import BVH
+from scipy.spatial import cKDTree
+
+# ==============================================================================
+# Benchmark
+# ==============================================================================
+
+# A wall of bricks in running bond stands in for a block model,
+# such that the benchmark does not depend on compas_masonry.
+# Every brick touches its two neighbours in the same course,
+# and two bricks of the course below and two of the course above.
+# Contacts are the candidate pairs of which the boxes share a face of positive area.
+# The k-nearest-neighbour search of compute_contacts(k=...) is compared by the contacts it misses.
+
+length, height = 0.4, 0.2
+margin = 1e-6
+
+for courses, bricks in ((30, 30), (100, 100), (300, 300)):
+    rows, columns = numpy.meshgrid(numpy.arange(courses), numpy.arange(bricks), indexing="ij")
+    x = columns.ravel() * length + (rows.ravel() % 2) * length / 2
+    z = rows.ravel() * height
+    lower = numpy.stack([x, numpy.zeros_like(x), z], axis=1)
+    boxes = numpy.stack([lower - margin, lower + [length, 0.2, height] + margin], axis=1)
+
+    t0 = time.perf_counter()
+    pairs = BVH(boxes).pairs()
+    duration = time.perf_counter() - t0
+
+    overlap = numpy.minimum(boxes[pairs[:, 0], 1], boxes[pairs[:, 1], 1]) - numpy.maximum(boxes[pairs[:, 0], 0], boxes[pairs[:, 1], 0])
+    contacts = {tuple(pair) for pair in pairs[(overlap > 10 * margin).sum(axis=1) >= 2].tolist()}
+
+    print(f"blocks: {len(boxes):>7}  bvh: {duration:7.3f}s  candidates: {len(pairs):>8}  contacts: {len(contacts):>8}")
+
+    centroids = boxes.mean(axis=1)
+    tree = cKDTree(centroids)
+    for k in (2, 6, 12):
+        t0 = time.perf_counter()
+        _, nbrs = tree.query(centroids, k + 1)
+        duration = time.perf_counter() - t0
+        found = {(min(i, j), max(i, j)) for i, row in enumerate(nbrs.tolist()) for j in row if i != j}
+        print(f"  k: {k:>3}  knn: {duration:7.3f}s  candidates: {len(found):>8}  missed contacts: {len(contacts - found):>8}")
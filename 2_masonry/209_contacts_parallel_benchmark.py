@@ -0,0 +1,78 @@
+import math
+import os
+import time
+
+from compas.geometry import Box
+from compas_masonry.models import BlockModel
+from compas_masonry.templates import ArchTemplate
+from compas_masonry.templates import BarrelVaultTemplate
+from dem import compute_contacts
+
+# ==============================================================================
+# Models
+# ==============================================================================
+
+# Every run gets a new model, because computing contacts modifies the interaction graph.
+# The time of building the model is not included.
+
+
+def stack(n):
+    box = Box.from_corner_corner_height([0, 0, 0], [1, 1, 0], 1)
+    blocks = []
+    for i in range(n):
+        block = box.copy()
+        block.translate([0.1 * (i % 2), 0.1 * (i % 3), i * box.zsize])
+        block.rotate(math.radians(5 * (-1) ** i), box.frame.zaxis, box.frame.point)
+        blocks.append(block)
+    return BlockModel.from_boxes(blocks)
+
+
+def arch(n):
+    return BlockModel.from_template(ArchTemplate(rise=3, span=10, thickness=0.5, depth=0.5, n=n))
+
+
+def vault(n):
+    return BlockModel.from_barrelvault(BarrelVaultTemplate(span=6000, length=6000, thickness=250, rise=600, vou_span=n, vou_length=n))
+
+
+def signature(model):
+    # the edges and contact areas, in graph order, to compare the results of serial and parallel runs
+    return [(edge, [round(contact.size, 6) for contact in model.graph.edge_attribute(edge, "contacts")]) for edge in model.graph.edges()]
+
+
+# The contacts are computed in a process pool,
+# and the worker processes re-import this script.
+
+if __name__ == "__main__":
+    # ==============================================================================
+    # Benchmark
+    # ==============================================================================
+
+    # The broad phase is the same for all runs.
+    # The candidate pairs are divided over the workers in chunks along the Morton order of the blocks,
+    # and the contacts are merged into the graph in the order of the pairs,
+    # such that the graph is identical for any number of processes.
+
+    processes = sorted({1, 2, 4, os.cpu_count() or 1})
+
+    cases = [
+        ("stack", stack, 1000),
+        ("arch", arch, 2000),
+        ("vault", vault, 40),
+    ]
+
+    for name, build, n in cases:
+        model = build(n)
+        t0 = time.perf_counter()
+        pairs = compute_contacts(model)
+        serial = time.perf_counter() - t0
+        reference = signature(model)
+
+        print(f"{name}: blocks: {len(list(model.elements())):>6}  pairs: {pairs:>7}  contacts: {len(reference):>7}  serial: {serial:8.3f}s")
+
+        for count in processes:
+            model = build(n)
+            t0 = time.perf_counter()
+            compute_contacts(model, processes=count)
+            duration = time.perf_counter() - t0
+            print(f"  processes: {count:>3}  time: {duration:8.3f}s  speedup: {serial / duration:6.2f}  identical: {signature(model) == reference}")
@@ -0,0 +1,129 @@
+import contextlib
+import io
+import time
+
+import numpy
+import scipy.sparse
+from compas_assembly.datastructures import Assembly
+from compas_assembly.datastructures import Block
+from compas_assembly.datastructures import Interface
+from compas_cra.equilibrium.cra_native import cra_penalty_solve_native
+from compas_cra.equilibrium.cra_nlp import cra_penalty_problem as cra_penalty_problem_reference
+from compas_masonry.models import BlockModel
+from compas_masonry.templates import ArchTemplate
+from compas_masonry.templates import BarrelVaultTemplate
+from dem import ContactSystem
+from dem import compute_contacts
+from dem import cra_penalty_problem
+from dem import cra_penalty_solve
+
+# ==============================================================================
+# Models
+# ==============================================================================
+
+
+def arch(n):
+    model = BlockModel.from_template(ArchTemplate(rise=4, span=10, thickness=0.25, depth=0.5, n=n))
+    compute_contacts(model)
+    for element in model.elements():
+        if model.graph.degree(element.graphnode) == 1:
+            element.is_support = True
+    return model
+
+
+def vault(n):
+    model = BlockModel.from_barrelvault(BarrelVaultTemplate(span=6000, length=6000, thickness=250, rise=600, vou_span=n, vou_length=n))
+    compute_contacts(model, tolerance=1, minimum_area=1)
+    bottom = sorted(model.elements(), key=lambda e: e.point.z)[0]
+    bottom.is_support = True
+    return model
+
+
+def to_assembly(model):
+    # the same blocks and contacts as an assembly of compas_assembly, with the same order of nodes and edges,
+    # which is how the solver of compas_cra gets its input
+    assembly = Assembly()
+    blocks = {}
+    for node in model.graph.nodes():
+        element = model.graph.node_element(node)
+        blocks[node] = Block.from_vertices_and_faces(*element.modelgeometry.to_vertices_and_faces())
+        assembly.add_block(blocks[node], node=node, is_support=bool(element.is_support))
+    for u, v in model.graph.edges():
+        contacts = model.graph.edge_attribute((u, v), "contacts")
+        interfaces = [Interface(points=contact.points, frame=contact.frame, size=contact.size) for contact in contacts]
+        assembly.add_block_block_interfaces(blocks[u], blocks[v], interfaces)
+    return assembly
+
+
+def forces(interfaces):
+    # the forces of the vertices of the interfaces of compas_cra or the contacts of dem
+    return numpy.array([[force["c_np"], force["c_nn"], force["c_u"], force["c_v"]] for interface in interfaces for force in interface.forces])
+
+
+def jacobian(problem, x):
+    return scipy.sparse.csr_matrix((problem.jacobian(x), (problem.jac_rows, problem.jac_cols)), shape=(problem.m, problem.n))
+
+
+def hessian(problem, x, lam):
+    return scipy.sparse.csr_matrix((problem.hessian(x, 1.0, lam), (problem.hess_rows, problem.hess_cols)), shape=(problem.n, problem.n))
+
+
+# ==============================================================================
+# Benchmark
+# ==============================================================================
+
+# The reference is the penalty problem of compas_cra,
+# of which the helpers assemble the matrices per interface and per interface vertex.
+# The problem of dem is built from arrays of all contact vertices, in batched operations.
+# Both problems are evaluated at the same random point, to check that they are identical,
+# and both are solved, to compare the contact forces.
+# The helpers of compas_cra print the shapes of the matrices and the densities, which are suppressed.
+
+cases = [
+    ("arch", arch, 50),
+    ("arch", arch, 200),
+    ("vault", vault, 10),
+    ("vault", vault, 20),
+]
+
+for name, build, n in cases:
+    model = build(n)
+    assembly = to_assembly(model)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        t0 = time.perf_counter()
+        reference, _ = cra_penalty_problem_reference(assembly)
+        before = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    problem, layout = cra_penalty_problem(ContactSystem.from_model(model))
+    after = time.perf_counter() - t0
+
+    x = numpy.random.default_rng(0).normal(size=problem.n)
+    lam = numpy.random.default_rng(1).normal(size=problem.m)
+    identical = (
+        problem.m == reference.m
+        and numpy.allclose(problem.constraints(x), reference.constraints(x))
+        and numpy.allclose(problem.g_l, reference.g_l)
+        and abs(jacobian(problem, x) - jacobian(reference, x)).max() < 1e-9
+        and abs(hessian(problem, x, lam) - hessian(reference, x, lam)).max() < 1e-9
+    )
+
+    print(
+        f"{name}: blocks: {model.graph.number_of_nodes():>5}  vertices: {layout['nv']:>6}  "
+        f"assembly: {before:8.3f}s -> {after:7.3f}s  speedup: {before / after:7.1f}  identical: {identical}"
+    )
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        t0 = time.perf_counter()
+        cra_penalty_solve_native(assembly)
+        before = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    cra_penalty_solve(model)
+    after = time.perf_counter() - t0
+
+    expected = forces(assembly.interfaces())
+    result = forces(contact for edge in model.graph.edges() for contact in model.graph.edge_attribute(edge, "contacts"))
+    difference = numpy.abs(result - expected).max()
+    print(f"  solve: {before:8.3f}s -> {after:7.3f}s  max force: {numpy.abs(expected).max():10.4f}  max difference: {difference:.2e}")
@@ -0,0 +1,112 @@
+import math
+import time
+
+import numpy
+from compas.geometry import Box
+from compas_masonry.models import BlockModel
+from compas_masonry.templates import ArchTemplate
+from dem import WARM_START_OPTIONS
+from dem import ContactSystem
+from dem import CRAPenalty
+from dem import compute_contacts
+
+# =============================================================================
+# Models
+# =============================================================================
+
+# The stacks stand on their lowest block, the arches on their two end blocks.
+# In the scenario with other supports, the stacks stand on their second block,
+# and the arches on their two lowest blocks at either end.
+
+
+def stack(n):
+    box = Box.from_corner_corner_height([0, 0, 0], [1, 1, 0], 1)
+    blocks = []
+    for i in range(n):
+        block = box.copy()
+        block.translate([0.1 * (i % 2), 0.05 * (i % 3), i * box.zsize])
+        block.rotate(math.radians(5 * (-1) ** i), box.frame.zaxis, box.frame.point)
+        blocks.append(block)
+    model = BlockModel.from_boxes(blocks)
+    compute_contacts(model)
+    system = ContactSystem.from_model(model)
+    lowest = numpy.argsort(system.centers[:, 2])
+    supports = numpy.arange(len(lowest)) == lowest[0]
+    moved = numpy.arange(len(lowest)) == lowest[1]
+    return model, system, supports, moved
+
+
+def arch(n):
+    model = BlockModel.from_template(ArchTemplate(rise=4, span=10, thickness=0.25, depth=0.5, n=n))
+    compute_contacts(model)
+    system = ContactSystem.from_model(model)
+    supports = numpy.array([model.graph.degree(node) == 1 for node in system.nodes])
+    moved = supports | numpy.isin(numpy.arange(len(supports)), numpy.argsort(system.centers[:, 2])[:4])
+    return model, system, supports, moved
+
+
+# =============================================================================
+# Scenarios
+# =============================================================================
+
+# The contacts are the same in all scenarios of a model.
+# The scenarios differ in the density of the blocks, or in the supports,
+# and every scenario starts from the solution of self-weight.
+
+cases = [
+    ("stack", stack, 4),
+    ("stack", stack, 8),
+    ("arch", arch, 20),
+]
+
+for name, build, n in cases:
+    model, system, supports, moved = build(n)
+    cra = CRAPenalty(system)
+    state = cra.solve(supports=supports)
+
+    z = system.centers[:, 2]
+    scenarios = [
+        ("self-weight x 1.01", supports, 1.01),
+        ("self-weight x 1.5", supports, 1.5),
+        ("density graded with height", supports, 1.0 + (z - z.min()) / (z.max() - z.min())),
+        ("other supports", moved, 1.0),
+    ]
+
+    # =============================================================================
+    # Equilibrium
+    # =============================================================================
+
+    # Every scenario is solved from scratch, from the solution of self-weight,
+    # and from the solution of self-weight with the warm start options,
+    # which keep the solver close to the starting point.
+    # Whether a warm start needs fewer iterations depends on the model and on the size of the change.
+    # A solution of other supports is not used as starting point,
+    # so the scenario with other supports starts from scratch in all three cases.
+
+    print(f"{name} {n}")
+
+    for label, scenario, density in scenarios:
+        t0 = time.perf_counter()
+        cold = cra.solve(supports=scenario, density=density)
+        before = time.perf_counter() - t0
+
+        results = []
+        for options in (None, WARM_START_OPTIONS):
+            t0 = time.perf_counter()
+            warm = cra.solve(supports=scenario, density=density, state=state, options=options)
+            results.append((warm, time.perf_counter() - t0))
+
+        print(
+            f"{label:>30}: cold: {cold.iterations:>4} iterations {before:7.3f}s  "
+            + "  ".join(
+                f"{kind}: {warm.iterations:>4} iterations {after:7.3f}s difference: {numpy.abs(warm.forces - cold.forces).max():.2e}"
+                for kind, (warm, after) in zip(("warm", "warm with options"), results)
+            )
+        )
+
+    # The batch API solves a list of scenarios,
+    # with a warm start from the solution of the previous scenario if it has the same supports.
+    # The solution of the last scenario is stored on the model.
+
+    states = cra.solve_scenarios([(scenario, density) for _, scenario, density in scenarios], state=state, warm_start=True)
+    system.store(model, states[-1])
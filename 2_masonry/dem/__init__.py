@@ -0,0 +1,37 @@
+from .bvh import BVH
+from .bvh import morton_codes
+from .bvh import boxes_overlap
+from .contacts import element_boxes
+from .contacts import contact_pairs
+from .contacts import compute_contacts
+from .contacts import ContactTracker
+from .equilibrium import WARM_START_OPTIONS
+from .equilibrium import ContactSystem
+from .equilibrium import CRAState
+from .equilibrium import CRAPenalty
+from .equilibrium import equilibrium_matrix
+from .equilibrium import friction_matrix
+from .equilibrium import external_forces
+from .equilibrium import tangent_map
+from .equilibrium import cra_penalty_problem
+from .equilibrium import cra_penalty_solve
+
+__all__ = [
+    "BVH",
+    "morton_codes",
+    "boxes_overlap",
+    "element_boxes",
+    "contact_pairs",
+    "compute_contacts",
+    "ContactTracker",
+    "WARM_START_OPTIONS",
+    "ContactSystem",
+    "CRAState",
+    "CRAPenalty",
+    "equilibrium_matrix",
+    "friction_matrix",
+    "external_forces",
+    "tangent_map",
+    "cra_penalty_problem",
+    "cra_penalty_solve",
+]
@@ -0,0 +1,213 @@
+import numpy
+
+
+def _spread_bits(values: numpy.ndarray) -> numpy.ndarray:
+    # insert two zero bits between the lowest ten bits of every value
+    values = values.astype(numpy.uint32) & 0x3FF
+    values = (values | (values << 16)) & 0x030000FF
+    values = (values | (values << 8)) & 0x0300F00F
+    values = (values | (values << 4)) & 0x030C30C3
+    values = (values | (values << 2)) & 0x09249249
+    return values
+
+
+def morton_codes(points: numpy.ndarray) -> numpy.ndarray:
+    """Compute the 30-bit Morton codes of a set of points, on a grid of 1024 cells per axis over their bounding box.
+
+    Parameters
+    ----------
+    points : numpy.ndarray
+        The (N, 3) point coordinates.
+
+    Returns
+    -------
+    numpy.ndarray
+        The (N,) codes.
+        Points that are close in space tend to be close in the order of their codes.
+
+    """
+    points = numpy.asarray(points, dtype=float).reshape(-1, 3)
+    if not len(points):
+        return numpy.zeros(0, dtype=numpy.uint32)
+    lower = points.min(axis=0)
+    extent = numpy.maximum(points.max(axis=0) - lower, 1e-12)
+    cells = numpy.clip((points - lower) / extent * 1023, 0, 1023).astype(numpy.uint32)
+    return (_spread_bits(cells[:, 0]) << 2) | (_spread_bits(cells[:, 1]) << 1) | _spread_bits(cells[:, 2])
+
+
+def boxes_overlap(lower: numpy.ndarray, upper: numpy.ndarray, a: numpy.ndarray, b: numpy.ndarray) -> numpy.ndarray:
+    """Test pairs of axis-aligned boxes for overlap, touching boxes included.
+
+    Parameters
+    ----------
+    lower : numpy.ndarray
+        The (N, 3) minimum corners of the boxes.
+    upper : numpy.ndarray
+        The (N, 3) maximum corners of the boxes.
+    a : numpy.ndarray
+        The (P,) indices of the first box of every pair.
+    b : numpy.ndarray
+        The (P,) indices of the second box of every pair.
+
+    Returns
+    -------
+    numpy.ndarray
+        The (P,) boolean mask of the overlapping pairs.
+
+    """
+    return numpy.all(lower[a] <= upper[b], axis=1) & numpy.all(lower[b] <= upper[a], axis=1)
+
+
+class BVH:
+    """Bounding volume hierarchy of axis-aligned boxes, for finding all pairs of overlapping boxes.
+
+    The boxes are sorted along a Morton curve through their centres,
+    and every level of the hierarchy merges pairs of consecutive nodes of the level below,
+    such that the tree is complete and balanced, and is stored as one pair of corner arrays per level.
+    The tree is traversed against itself level by level,
+    with all node pairs of a level tested in one vectorized operation.
+
+    Parameters
+    ----------
+    boxes : numpy.ndarray
+        The (N, 2, 3) minimum and maximum corners of the boxes.
+
+    Attributes
+    ----------
+    order : numpy.ndarray
+        The (N,) indices of the boxes in the order of the leaves.
+    levels : list[tuple[numpy.ndarray, numpy.ndarray]]
+        The minimum and maximum corners of the nodes, per level, from the leaves to the root.
+
+    Notes
+    -----
+    Building the hierarchy takes O(n log n) time.
+    Finding all overlapping pairs takes O(n log n + k) time for boxes of similar size,
+    with k the number of pairs, and does not require a guess of the number of neighbours per box.
+    Moved boxes are updated with :meth:`refit`, which keeps the order of the leaves.
+
+    Examples
+    --------
+    >>> bvh = BVH(numpy.array([[[0, 0, 0], [1, 1, 1]], [[1, 0, 0], [2, 1, 1]], [[5, 5, 5], [6, 6, 6]]]))
+    >>> bvh.pairs().tolist()
+    [[0, 1]]
+
+    """
+
+    def __init__(self, boxes: numpy.ndarray) -> None:
+        boxes = numpy.asarray(boxes, dtype=float).reshape(-1, 2, 3)
+        self.order = numpy.argsort(morton_codes(boxes.mean(axis=1)), kind="stable")
+
+        lower = boxes[self.order, 0]
+        upper = boxes[self.order, 1]
+        self.levels = [(lower, upper)]
+        while len(lower) > 1:
+            m = len(lower) // 2 * 2
+            parents = numpy.minimum(lower[0:m:2], lower[1:m:2]), numpy.maximum(upper[0:m:2], upper[1:m:2])
+            if len(lower) % 2:
+                # the last node of an odd level is its own parent
+                parents = numpy.vstack([parents[0], lower[-1:]]), numpy.vstack([parents[1], upper[-1:]])
+            lower, upper = parents
+            self.levels.append((lower, upper))
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def pairs(self) -> numpy.ndarray:
+        """Find all pairs of overlapping boxes.
+
+        Returns
+        -------
+        numpy.ndarray
+            The (P, 2) indices of the boxes of every pair, with the smaller index first, sorted by the first and then the second index.
+
+        """
+        if len(self.order) < 2:
+            return numpy.zeros((0, 2), dtype=numpy.int64)
+
+        # node pairs with a <= b, starting with the root paired with itself
+        a = numpy.zeros(1, dtype=numpy.int64)
+        b = numpy.zeros(1, dtype=numpy.int64)
+        for lower, upper in reversed(self.levels[:-1]):
+            # the children of node p are the nodes 2p and 2p + 1 of the level below
+            # all children of a are smaller than those of b if a < b
+            # and of the four child pairs of a node with itself, one is a duplicate
+            ca = (2 * a[:, None] + [0, 0, 1, 1]).ravel()
+            cb = (2 * b[:, None] + [0, 1, 0, 1]).ravel()
+            keep = (ca <= cb) & (cb < len(lower))
+            ca, cb = ca[keep], cb[keep]
+            overlap = boxes_overlap(lower, upper, ca, cb)
+            a, b = ca[overlap], cb[overlap]
+
+        distinct = a != b
+        pairs = numpy.sort(numpy.stack([self.order[a[distinct]], self.order[b[distinct]]], axis=1), axis=1)
+        return pairs[numpy.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+    def query(self, boxes: numpy.ndarray) -> numpy.ndarray:
+        """Find the boxes of the hierarchy that overlap with a set of other boxes.
+
+        Parameters
+        ----------
+        boxes : numpy.ndarray
+            The (M, 2, 3) minimum and maximum corners of the query boxes.
+
+        Returns
+        -------
+        numpy.ndarray
+            The (P, 2) pairs of the index of a query box and the index of a box of the hierarchy,
+            sorted by the first and then the second index.
+
+        """
+        boxes = numpy.asarray(boxes, dtype=float).reshape(-1, 2, 3)
+        if not len(self.order) or not len(boxes):
+            return numpy.zeros((0, 2), dtype=numpy.int64)
+
+        # pairs of a query box and a node, starting with every query box paired with the root
+        q = numpy.arange(len(boxes))
+        nodes = numpy.zeros(len(boxes), dtype=numpy.int64)
+        levels = self.levels[::-1]
+        for depth, (lower, upper) in enumerate(levels):
+            if depth:
+                q = numpy.repeat(q, 2)
+                nodes = (2 * nodes[:, None] + [0, 1]).ravel()
+                keep = nodes < len(lower)
+                q, nodes = q[keep], nodes[keep]
+            overlap = numpy.all(boxes[q, 0] <= upper[nodes], axis=1) & numpy.all(lower[nodes] <= boxes[q, 1], axis=1)
+            q, nodes = q[overlap], nodes[overlap]
+
+        pairs = numpy.stack([q, self.order[nodes]], axis=1)
+        return pairs[numpy.lexsort((pairs[:, 1], pairs[:, 0]))]
+
+    def refit(self, indices: numpy.ndarray, boxes: numpy.ndarray) -> None:
+        """Replace some of the boxes, and update the bounds of the nodes above them.
+
+        Parameters
+        ----------
+        indices : numpy.ndarray
+            The (M,) indices of the boxes.
+        boxes : numpy.ndarray
+            The (M, 2, 3) new minimum and maximum corners of the boxes.
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        Only the nodes on the paths from the modified leaves to the root are updated.
+        The order of the leaves does not change,
+        such that the hierarchy becomes less tight if many boxes move far.
+
+        """
+        boxes = numpy.asarray(boxes, dtype=float).reshape(-1, 2, 3)
+        rank = numpy.empty(len(self.order), dtype=numpy.int64)
+        rank[self.order] = numpy.arange(len(self.order))
+        nodes = rank[numpy.asarray(indices, dtype=numpy.int64)]
+        self.levels[0][0][nodes] = boxes[:, 0]
+        self.levels[0][1][nodes] = boxes[:, 1]
+        for (lower, upper), (parent_lower, parent_upper) in zip(self.levels[:-1], self.levels[1:]):
+            nodes = numpy.unique(nodes // 2)
+            first = 2 * nodes
+            second = numpy.minimum(first + 1, len(lower) - 1)
+            parent_lower[nodes] = numpy.minimum(lower[first], lower[second])
+            parent_upper[nodes] = numpy.maximum(upper[first], upper[second])
@@ -0,0 +1,341 @@
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy
+from compas.datastructures import Mesh
+from compas_model.algorithms import mesh_mesh_contacts
+from compas_model.elements import Element
+from compas_model.interactions import Contact
+from compas_model.models import Model
+
+from .bvh import BVH
+
+
+def element_boxes(elements: list[Element], margin: float = 0.0) -> numpy.ndarray:
+    """Compute the inflated axis-aligned bounding boxes of the model geometry of a list of block elements.
+
+    Parameters
+    ----------
+    elements : list[:class:`compas_model.elements.Element`]
+        The elements, with a mesh as model geometry.
+    margin : float, optional
+        The distance by which every box is inflated in all directions.
+
+    Returns
+    -------
+    numpy.ndarray
+        The (N, 2, 3) minimum and maximum corners of the boxes.
+
+    """
+    boxes = numpy.zeros((len(elements), 2, 3))
+    for index, element in enumerate(elements):
+        xyz = numpy.asarray(element.modelgeometry.vertices_attributes("xyz"), dtype=float)
+        boxes[index, 0] = xyz.min(axis=0) - margin
+        boxes[index, 1] = xyz.max(axis=0) + margin
+    return boxes
+
+
+def contact_pairs(model: Model, margin: float = 1e-6) -> list[tuple[Element, Element]]:
+    """Find all pairs of elements of a model of which the inflated bounding boxes overlap.
+
+    Parameters
+    ----------
+    model : :class:`compas_model.models.Model`
+        A model of block elements.
+    margin : float, optional
+        The distance by which the bounding boxes are inflated.
+        Blocks in contact have touching bounding boxes,
+        and the margin catches contacts across gaps up to the margin.
+
+    Returns
+    -------
+    list[tuple[:class:`compas_model.elements.Element`, :class:`compas_model.elements.Element`]]
+        The candidate pairs, with the elements of every pair in the order of ``model.elements()``.
+
+    """
+    elements = list(model.elements())
+    pairs = BVH(element_boxes(elements, margin=margin)).pairs()
+    return [(elements[i], elements[j]) for i, j in pairs.tolist()]
+
+
+def _has_mesh_contacts(element: Element) -> bool:
+    # the contacts of the element are those of the base class, which uses mesh_mesh_contacts for mesh geometry
+    return type(element).contacts is Element.contacts and isinstance(element.modelgeometry, Mesh)
+
+
+def _pair_contacts(job: tuple) -> list[list[Contact]]:
+    meshes, pairs, tolerance, minimum_area = job
+    return [mesh_mesh_contacts(meshes[i], meshes[j], tolerance=tolerance, minimum_area=minimum_area) for i, j in pairs]
+
+
+def _contacts_parallel(
+    elements: list[Element],
+    bvh: BVH,
+    pairs: numpy.ndarray,
+    tolerance: float,
+    minimum_area: float,
+    processes: Optional[int],
+    chunks: Optional[int],
+) -> list[list[Contact]]:
+    # pairs are grouped along the Morton order of the hierarchy
+    # such that every chunk only needs the meshes of a compact region of the model
+    rank = numpy.empty(len(bvh), dtype=numpy.int64)
+    rank[bvh.order] = numpy.arange(len(bvh))
+    sequence = numpy.argsort(rank[pairs[:, 0]], kind="stable")
+
+    processes = processes or multiprocessing.cpu_count()
+    jobs = []
+    for indices in numpy.array_split(sequence, min(len(sequence), chunks or 4 * processes)):
+        chunk = pairs[indices]
+        meshes: dict[int, Mesh] = {index: elements[index].modelgeometry for index in numpy.unique(chunk).tolist()}
+        jobs.append((meshes, chunk.tolist(), tolerance, minimum_area))
+
+    # the workers only import this module and compas_model
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=processes, mp_context=context) as executor:
+        results = list(executor.map(_pair_contacts, jobs))
+
+    contacts: list[list[Contact]] = [[] for _ in range(len(pairs))]
+    for indices, values in zip(numpy.array_split(sequence, len(jobs)), results):
+        for index, value in zip(indices.tolist(), values):
+            contacts[index] = value
+    return contacts
+
+
+def compute_contacts(
+    model: Model,
+    tolerance: float = 1e-6,
+    minimum_area: float = 1e-2,
+    margin: Optional[float] = None,
+    processes: Optional[int] = 1,
+    chunks: Optional[int] = None,
+) -> int:
+    """Compute the contacts between the block elements of a model, with a bounding volume hierarchy as broad phase.
+
+    This is a replacement of ``model.compute_contacts(k=...)``,
+    which only tests the ``k`` elements with the nearest reference points,
+    and therefore misses contacts if ``k`` is too small, and tests too many pairs if it is too large.
+    Here, every pair of elements with overlapping bounding boxes is tested, and no other pair.
+
+    Parameters
+    ----------
+    model : :class:`compas_model.models.Model`
+        A model of block elements.
+    tolerance : float, optional
+        The distance tolerance of the contact test.
+    minimum_area : float, optional
+        The minimum contact size.
+    margin : float, optional
+        The distance by which the bounding boxes are inflated.
+        Default is the tolerance.
+    processes : int, optional
+        The number of worker processes of the contact tests.
+        With ``1``, the pairs are tested in this process.
+        With ``None``, the number of CPUs is used.
+    chunks : int, optional
+        The number of chunks in which the candidate pairs are divided over the workers.
+        Default is four chunks per process.
+
+    Returns
+    -------
+    int
+        The number of candidate pairs of the broad phase.
+
+    Notes
+    -----
+    Edges of the interaction graph are added and updated as by ``model.compute_contacts``:
+    an edge is added for every pair with contacts,
+    and existing edges only get contacts if they do not have any yet.
+
+    In parallel, the model geometry of the elements is sent to the workers,
+    and the contacts are computed with :func:`compas_model.algorithms.mesh_mesh_contacts`,
+    which is what ``Element.contacts`` does for elements with a mesh as model geometry.
+    Pairs with an element of a type that overrides ``contacts``, or that does not have a mesh as model geometry,
+    are tested in this process, with the ``contacts`` method of their first element.
+    The results are merged into the graph in the order of the pairs,
+    such that the graph does not depend on the number of processes or chunks.
+    Scripts that run in parallel need an ``if __name__ == "__main__":`` guard,
+    because the worker processes re-import the main script.
+
+    """
+    elements = list(model.elements())
+    bvh = BVH(element_boxes(elements, margin=tolerance if margin is None else margin))
+    pairs = bvh.pairs()
+
+    # pairs of which the edge already has contacts are not tested again
+    edges = []
+    for i, j in pairs.tolist():
+        u = elements[i].graphnode
+        v = elements[j].graphnode
+        edge = None
+        if model.graph.has_edge((u, v), directed=False):
+            edge = (u, v) if model.graph.has_edge((u, v)) else (v, u)
+            if model.graph.edge_attribute(edge, name="contacts"):
+                continue
+        edges.append((i, j, edge))
+
+    # only pairs of which both elements have the contacts of mesh_mesh_contacts are sent to the workers
+    # all other pairs are tested in this process, with the contacts method of their first element
+    contacts: list[Optional[list[Contact]]] = [None] * len(edges)
+    parallel = [] if processes == 1 else [index for index, (i, j, _) in enumerate(edges) if _has_mesh_contacts(elements[i]) and _has_mesh_contacts(elements[j])]
+    if len(parallel) > 1:
+        todo = numpy.array([edges[index][:2] for index in parallel], dtype=numpy.int64)
+        for index, values in zip(parallel, _contacts_parallel(elements, bvh, todo, tolerance, minimum_area, processes, chunks)):
+            contacts[index] = values
+    for index, (i, j, _) in enumerate(edges):
+        if contacts[index] is None:
+            contacts[index] = elements[i].contacts(elements[j], tolerance=tolerance, minimum_area=minimum_area)
+
+    for (i, j, edge), values in zip(edges, contacts):
+        if edge is not None:
+            model.graph.edge_attribute(edge, name="contacts", value=values)
+        elif values:
+            model.graph.add_edge(elements[i].graphnode, elements[j].graphnode, contacts=values)
+
+    return len(pairs)
+
+
+class ContactTracker:
+    """Contacts of a block model that are kept up to date while elements are moved.
+
+    The contacts of all elements are computed once.
+    After that, :meth:`update` only recomputes the contacts of the elements of which the model transformation changed,
+    with the elements of which the bounding boxes overlap their new bounding boxes.
+    All other edges of the interaction graph are not modified.
+
+    Parameters
+    ----------
+    model : :class:`compas_model.models.Model`
+        A model of block elements.
+    tolerance : float, optional
+        The distance tolerance of the contact test.
+    minimum_area : float, optional
+        The minimum contact size.
+    margin : float, optional
+        The distance by which the bounding boxes are inflated.
+        Default is the tolerance.
+    processes : int, optional
+        The number of worker processes of the initial contact computation.
+
+    Attributes
+    ----------
+    elements : list[:class:`compas_model.elements.Element`]
+        The elements of the model, in the order of ``model.elements()``.
+    bvh : :class:`BVH`
+        The hierarchy of the bounding boxes of the elements.
+
+    Notes
+    -----
+    The elements of the model should not be added or removed while the tracker is used.
+    In that case, a new tracker should be created.
+
+    Examples
+    --------
+    >>> tracker = ContactTracker(model)
+    >>> element.frame = frame
+    >>> tracker.update([element])
+
+    """
+
+    def __init__(
+        self,
+        model: Model,
+        tolerance: float = 1e-6,
+        minimum_area: float = 1e-2,
+        margin: Optional[float] = None,
+        processes: Optional[int] = 1,
+    ) -> None:
+        self.model = model
+        self.tolerance = tolerance
+        self.minimum_area = minimum_area
+        self.margin = tolerance if margin is None else margin
+
+        compute_contacts(model, tolerance=tolerance, minimum_area=minimum_area, margin=self.margin, processes=processes)
+
+        self.elements = list(model.elements())
+        self._index = {id(element): index for index, element in enumerate(self.elements)}
+        self._transformations = self._snapshot(self.elements)
+        self.bvh = BVH(element_boxes(self.elements, margin=self.margin))
+
+    @staticmethod
+    def _snapshot(elements: list[Element]) -> numpy.ndarray:
+        return numpy.array([element.modeltransformation.matrix for element in elements], dtype=float).reshape(-1, 4, 4)
+
+    def changed(self) -> list[Element]:
+        """Find the elements of which the model transformation changed since the last update.
+
+        Returns
+        -------
+        list[:class:`compas_model.elements.Element`]
+
+        """
+        moved = numpy.any(numpy.abs(self._snapshot(self.elements) - self._transformations) > 1e-12, axis=(1, 2))
+        return [self.elements[index] for index in numpy.flatnonzero(moved).tolist()]
+
+    def _clear(self, node: int) -> None:
+        graph = self.model.graph
+        for nbr in list(graph.neighbors(node)):
+            edge = (node, nbr) if graph.has_edge((node, nbr)) else (nbr, node)
+            attributes = graph.edge_attributes(edge)
+            if not attributes.get("contacts"):
+                continue
+            if any(value for name, value in attributes.items() if name != "contacts"):
+                # the edge also has other interactions, such as modifiers
+                graph.edge_attribute(edge, name="contacts", value=None)
+            else:
+                graph.delete_edge(edge)
+
+    def update(self, elements: Optional[list[Element]] = None) -> int:
+        """Recompute the contacts of moved elements.
+
+        Parameters
+        ----------
+        elements : list[:class:`compas_model.elements.Element`], optional
+            The moved elements.
+            Default is the elements returned by :meth:`changed`,
+            which compares the model transformations of all elements with those of the last update.
+
+        Returns
+        -------
+        int
+            The number of element pairs that were tested.
+
+        Notes
+        -----
+        The contacts of the moved elements are removed first.
+        Edges that only had contacts are deleted,
+        and edges with other interactions keep those.
+
+        """
+        elements = self.changed() if elements is None else list(elements)
+        if not elements:
+            return 0
+
+        indices = numpy.array([self._index[id(element)] for element in elements], dtype=numpy.int64)
+        for element in elements:
+            self._clear(element.graphnode)
+
+        boxes = element_boxes(elements, margin=self.margin)
+        self.bvh.refit(indices, boxes)
+        hits = self.bvh.query(boxes)
+        pairs = numpy.sort(numpy.stack([indices[hits[:, 0]], hits[:, 1]], axis=1), axis=1)
+        pairs = numpy.unique(pairs[pairs[:, 0] != pairs[:, 1]], axis=0)
+
+        graph = self.model.graph
+        for i, j in pairs.tolist():
+            element, nbr = self.elements[i], self.elements[j]
+            u, v = element.graphnode, nbr.graphnode
+            edge = None
+            if graph.has_edge((u, v), directed=False):
+                edge = (u, v) if graph.has_edge((u, v)) else (v, u)
+                if graph.edge_attribute(edge, name="contacts"):
+                    continue
+            contacts = element.contacts(nbr, tolerance=self.tolerance, minimum_area=self.minimum_area)
+            if edge is not None:
+                graph.edge_attribute(edge, name="contacts", value=contacts)
+            elif contacts:
+                graph.add_edge(u, v, contacts=contacts)
+
+        self._transformations[indices] = self._snapshot(elements)
+        return len(pairs)
@@ -0,0 +1,871 @@
+import math
+from typing import NamedTuple
+from typing import Optional
+from typing import Union
+
+import numpy
+import scipy.sparse
+from compas.geometry import centroid_polyhedron
+from compas.geometry import volume_polyhedron
+from compas_cra.nlp import NLPProblem
+from compas_cra.nlp import solve_nlp
+from compas_model.interactions import Contact
+from compas_model.models import Model
+
+# the infinity of IPOPT
+INF = 1e19
+
+# the options of the native penalty solver of compas_cra,
+# such that both solvers stop at the same point
+CRA_PENALTY_OPTIONS = {
+    "tol": 1e-8,
+    "constr_viol_tol": 1e-7,
+    "acceptable_tol": 1e-6,
+    "acceptable_constr_viol_tol": 1e-5,
+    "mu_strategy": "adaptive",
+}
+
+# options for a solve that starts from an earlier solution, which are not used by default
+# they keep the starting point close to that solution instead of pushing it into the interior of the bounds,
+# and start the barrier parameter close to where the earlier solve ended
+# with larger changes of the scenario, the solver then often needs more iterations, and can stop at a different solution
+# warm_start_init_point is not used, because the binding of IPOPT does not pass the multipliers of the earlier solve
+WARM_START_OPTIONS = {
+    "bound_push": 1e-10,
+    "bound_frac": 1e-10,
+    "mu_init": 1e-8,
+}
+
+# the tangential directions of the sides of the linearised friction cone
+_C8 = 1.0 / math.sqrt(2.0)
+_CONE = numpy.array([[1, 0], [-1, 0], [0, 1], [0, -1], [_C8, _C8], [-_C8, -_C8], [_C8, -_C8], [-_C8, _C8]])
+
+
+class ContactSystem:
+    """The contact vertices and the blocks of a block model, as arrays, for assembling its equilibrium problem.
+
+    Every contact vertex has a local frame, and a force with a normal and two tangential components in that frame.
+    The force acts in the direction of the frame on the second block of the vertex,
+    and in the opposite direction on the first.
+
+    Parameters
+    ----------
+    points : numpy.ndarray
+        The (V, 3) coordinates of the contact vertices.
+    frames : numpy.ndarray
+        The (V, 3, 3) x, y and z axes of the contact frame of every vertex.
+        The z axis is the normal of the contact.
+    pairs : numpy.ndarray
+        The (V, 2) indices of the two blocks of every vertex.
+    centers : numpy.ndarray
+        The (N, 3) centres of mass of the blocks.
+    volumes : numpy.ndarray
+        The (N,) volumes of the blocks.
+    supports : numpy.ndarray
+        The (N,) boolean mask of the supported blocks.
+
+    Attributes
+    ----------
+    free : numpy.ndarray
+        The (F,) indices of the blocks that are not supported.
+    contacts : list[:class:`compas_model.interactions.Contact`]
+        The contacts of the vertices, if the system was created from a model.
+    counts : numpy.ndarray
+        The number of vertices of every contact.
+    nodes : list[int]
+        The graph nodes of the blocks, if the system was created from a model.
+
+    Notes
+    -----
+    The vertices are ordered per contact, and the contacts per edge of the interaction graph,
+    as in the helpers of :mod:`compas_cra.equilibrium`,
+    such that all matrices are identical to those of compas_cra for the same blocks and contacts.
+
+    """
+
+    def __init__(
+        self,
+        points: numpy.ndarray,
+        frames: numpy.ndarray,
+        pairs: numpy.ndarray,
+        centers: numpy.ndarray,
+        volumes: numpy.ndarray,
+        supports: numpy.ndarray,
+    ) -> None:
+        self.points = numpy.asarray(points, dtype=float).reshape(-1, 3)
+        self.frames = numpy.asarray(frames, dtype=float).reshape(-1, 3, 3)
+        self.pairs = numpy.asarray(pairs, dtype=numpy.int64).reshape(-1, 2)
+        self.centers = numpy.asarray(centers, dtype=float).reshape(-1, 3)
+        self.volumes = numpy.asarray(volumes, dtype=float).reshape(-1)
+        self.supports = numpy.asarray(supports, dtype=bool).reshape(-1)
+        self.contacts: list[Contact] = []
+        self.counts = numpy.zeros(0, dtype=numpy.int64)
+        self.nodes: list[int] = list(range(len(self.centers)))
+
+    @property
+    def free(self) -> numpy.ndarray:
+        return numpy.flatnonzero(~self.supports)
+
+    @classmethod
+    def from_model(cls, model: Model) -> "ContactSystem":
+        """Collect the contacts and blocks of a model.
+
+        Parameters
+        ----------
+        model : :class:`compas_model.models.Model`
+            A model of block elements, with contacts on the edges of the interaction graph.
+            Elements with a true ``is_support`` attribute are supported.
+
+        Returns
+        -------
+        :class:`ContactSystem`
+
+        """
+        nodes = list(model.graph.nodes())
+        index = {node: i for i, node in enumerate(nodes)}
+
+        centers = numpy.zeros((len(nodes), 3))
+        volumes = numpy.zeros(len(nodes))
+        supports = numpy.zeros(len(nodes), dtype=bool)
+        for i, node in enumerate(nodes):
+            element = model.graph.node_element(node)
+            polyhedron = element.modelgeometry.to_vertices_and_faces()
+            centers[i] = centroid_polyhedron(polyhedron)
+            volumes[i] = volume_polyhedron(polyhedron)
+            supports[i] = bool(getattr(element, "is_support", False))
+
+        contacts = []
+        points = []
+        axes = []
+        pairs = []
+        for u, v in model.graph.edges():
+            for contact in model.graph.edge_attribute((u, v), "contacts") or []:
+                contacts.append(contact)
+                points.append(contact.points)
+                axes.append([contact.frame.xaxis, contact.frame.yaxis, contact.frame.zaxis])
+                pairs.append((index[u], index[v]))
+
+        counts = numpy.array([len(value) for value in points], dtype=numpy.int64)
+        system = cls(
+            numpy.array([point for value in points for point in value], dtype=float),
+            numpy.repeat(numpy.array(axes, dtype=float).reshape(-1, 3, 3), counts, axis=0),
+            numpy.repeat(numpy.array(pairs, dtype=numpy.int64).reshape(-1, 2), counts, axis=0),
+            centers,
+            volumes,
+            supports,
+        )
+        system.contacts = contacts
+        system.counts = counts
+        system.nodes = nodes
+        return system
+
+    def store(self, model: Model, state: "CRAState") -> None:
+        """Store a solution on the contacts and the graph nodes of the model of the system.
+
+        Parameters
+        ----------
+        model : :class:`compas_model.models.Model`
+            The model from which the system was created.
+        state : :class:`CRAState`
+            The solution.
+
+        Returns
+        -------
+        None
+
+        Notes
+        -----
+        The forces of the vertices of every contact are stored as ``contact.forces``,
+        with the components ``"c_np"``, ``"c_nn"``, ``"c_u"`` and ``"c_v"`` per vertex, as by compas_cra,
+        and the virtual displacements of the free blocks as the ``"displacement"`` attribute of their graph nodes.
+
+        """
+        offsets = numpy.concatenate([[0], numpy.cumsum(self.counts)])
+        for contact, start, stop in zip(self.contacts, offsets[:-1].tolist(), offsets[1:].tolist()):
+            contact.forces = [{"c_np": cnp, "c_nn": cnn, "c_u": u, "c_v": v} for cnp, cnn, u, v in state.forces[start:stop].tolist()]
+
+        for index in numpy.flatnonzero(~self.supports).tolist():
+            model.graph.node_attribute(self.nodes[index], "displacement", state.displacements[index].tolist())
+
+
+def _force_axes(frames: numpy.ndarray, penalty: bool) -> numpy.ndarray:
+    # the directions of the force components of every vertex
+    # [fn, fu, fv], or [fn+, fn-, fu, fv] with the normal force split in compression and tension
+    u, v, w = frames[:, 0], frames[:, 1], frames[:, 2]
+    return numpy.stack([w, -w, u, v] if penalty else [w, u, v], axis=1)
+
+
+def equilibrium_matrix(system: ContactSystem, penalty: bool = False, free: Optional[numpy.ndarray] = None) -> scipy.sparse.csr_matrix:
+    """Assemble the equilibrium matrix of the free blocks.
+
+    Parameters
+    ----------
+    system : :class:`ContactSystem`
+        The contact vertices and blocks.
+    penalty : bool, optional
+        If True, the normal force of every vertex is split in a compression and a tension component.
+    free : numpy.ndarray, optional
+        The (F,) indices of the blocks of which the rows are assembled.
+        Default is the blocks that are not supported.
+
+    Returns
+    -------
+    scipy.sparse.csr_matrix
+        The (6F, 3V) matrix, or (6F, 4V) with ``penalty``,
+        of the force and moment resultants per free block of the vertex forces.
+
+    Notes
+    -----
+    This is ``compas_cra.equilibrium.equilibrium_setup``,
+    with all blocks of all vertices computed at once instead of per contact and per vertex.
+
+    """
+    free = system.free if free is None else numpy.asarray(free, dtype=numpy.int64)
+    axes = _force_axes(system.frames, penalty)
+    count, shift = axes.shape[:2]
+
+    rank = numpy.full(len(system.centers), -1, dtype=numpy.int64)
+    rank[free] = numpy.arange(len(free))
+
+    cols = numpy.broadcast_to(shift * numpy.arange(count)[:, None, None] + numpy.arange(shift)[None, :, None], (count, shift, 6))
+    rows, columns, data = [], [], []
+    for side, sign in ((0, -1.0), (1, 1.0)):
+        blocks = system.pairs[:, side]
+        forces = sign * axes
+        moments = numpy.cross((system.points - system.centers[blocks])[:, None, :], forces)
+        values = numpy.concatenate([forces, moments], axis=2)
+        keep = (rank[blocks] >= 0)[:, None, None] & (values != 0)
+        rows.append(numpy.broadcast_to(6 * rank[blocks][:, None, None] + numpy.arange(6), values.shape)[keep])
+        columns.append(cols[keep])
+        data.append(values[keep])
+
+    shape = (6 * len(free), shift * count)
+    return scipy.sparse.csr_matrix((numpy.concatenate(data), (numpy.concatenate(rows), numpy.concatenate(columns))), shape=shape)
+
+
+def friction_matrix(count: int, mu: float, penalty: bool = False, friction_net: bool = False) -> scipy.sparse.csr_matrix:
+    """Assemble the constraints of the linearised friction cones of all vertices.
+
+    Parameters
+    ----------
+    count : int
+        The number of vertices.
+    mu : float
+        The friction coefficient.
+    penalty : bool, optional
+        If True, the normal force of every vertex is split in a compression and a tension component.
+    friction_net : bool, optional
+        If True, the cone of the penalty formulation is based on the net normal force instead of the compression.
+
+    Returns
+    -------
+    scipy.sparse.csr_matrix
+        The (8V, 3V) matrix, or (8V, 4V) with ``penalty``, of which the product with the forces is not positive.
+
+    Notes
+    -----
+    This is ``compas_cra.equilibrium.friction_setup`` with an eight-sided cone.
+    The pattern of one vertex is repeated on the diagonal.
+
+    """
+    shift = 4 if penalty else 3
+    fu = shift - 2
+
+    rows, cols, data = [], [], []
+    for row, (a, b) in enumerate(_CONE.tolist()):
+        entries = [(0, -mu)]
+        if penalty and friction_net:
+            entries.append((1, mu))
+        entries += [(fu + col, value) for col, value in ((0, a), (1, b)) if value]
+        for col, value in entries:
+            rows.append(row)
+            cols.append(col)
+            data.append(value)
+
+    offsets = numpy.arange(count)[:, None]
+    rows = (len(_CONE) * offsets + rows).ravel()
+    cols = (shift * offsets + cols).ravel()
+    data = numpy.tile(data, count)
+    return scipy.sparse.csr_matrix((data, (rows, cols)), shape=(len(_CONE) * count, shift * count))
+
+
+def external_forces(system: ContactSystem, density: Union[float, numpy.ndarray] = 1.0, free: Optional[numpy.ndarray] = None) -> numpy.ndarray:
+    """Compute the self-weight of the free blocks.
+
+    Parameters
+    ----------
+    system : :class:`ContactSystem`
+        The contact vertices and blocks.
+    density : float | numpy.ndarray, optional
+        The density of all blocks, or the (N,) densities per block.
+    free : numpy.ndarray, optional
+        The (F,) indices of the blocks of which the forces are computed.
+        Default is the blocks that are not supported.
+
+    Returns
+    -------
+    numpy.ndarray
+        The (6F,) forces and moments per free block.
+
+    """
+    free = system.free if free is None else numpy.asarray(free, dtype=numpy.int64)
+    density = numpy.broadcast_to(numpy.asarray(density, dtype=float), system.volumes.shape)
+    p = numpy.zeros((len(free), 6))
+    p[:, 2] = -system.volumes[free] * density[free]
+    return p.ravel()
+
+
+def tangent_map(system: ContactSystem, shift: int) -> scipy.sparse.csr_matrix:
+    """Assemble the map of the force or displacement components of the vertices to their tangential vectors.
+
+    Parameters
+    ----------
+    system : :class:`ContactSystem`
+        The contact vertices and blocks.
+    shift : int
+        The number of components per vertex.
+        ``3`` for ``[n, u, v]``, and ``4`` for ``[n+, n-, u, v]``.
+
+    Returns
+    -------
+    scipy.sparse.csr_matrix
+        The (3V, shift * V) matrix.
+
+    """
+    count = len(system.points)
+    values = system.frames[:, :2].transpose(0, 2, 1)
+    rows = numpy.broadcast_to(3 * numpy.arange(count)[:, None, None] + numpy.arange(3)[None, :, None], values.shape)
+    cols = numpy.broadcast_to(shift * numpy.arange(count)[:, None, None] + (shift - 2) + numpy.arange(2), values.shape)
+    keep = values != 0
+    return scipy.sparse.csr_matrix((values[keep], (rows[keep], cols[keep])), shape=(3 * count, shift * count))
+
+
+def _tilde_weights(count: int, w_comp: float, w_tens: float, w_fric: float) -> numpy.ndarray:
+    # the objective weights of compas_cra, including the rule that weights fv only if the index is a multiple of 3
+    i = numpy.arange(4 * count)
+    return numpy.select([i % 4 == 1, i % 4 == 0, (i % 4 == 2) | (i % 3 == 0)], [w_tens, w_comp, w_fric], 0.0)
+
+
+def _penalty_problem(
+    aeq: scipy.sparse.csr_matrix,
+    aeq_b: scipy.sparse.csr_matrix,
+    afr_b: scipy.sparse.csr_matrix,
+    p: numpy.ndarray,
+    Kf: scipy.sparse.csr_matrix,
+    KB: scipy.sparse.csr_matrix,
+    weights: numpy.ndarray,
+    d_bnd: float,
+    eps: float,
+    x0: Optional[numpy.ndarray] = None,
+) -> tuple[NLPProblem, dict]:
+    # the penalty problem of compas_cra, from the matrices of the free blocks
+    V = afr_b.shape[1] // 4
+    F = aeq.shape[0] // 6
+
+    B = aeq.T.tocsr()
+    Bn = B[0::3]
+
+    nf, nq, na = 4 * V, 6 * F, V
+    n = nf + nq + na
+    of, oq, oa = 0, nf, nf + nq
+
+    x_l = numpy.full(n, -INF)
+    x_u = numpy.full(n, INF)
+    x_l[of : of + nf][numpy.arange(nf) % 4 <= 1] = 0.0
+    x_l[oa:] = 0.0
+    x0 = numpy.zeros(n) if x0 is None else numpy.clip(x0, x_l, x_u)
+
+    # structurally empty equilibrium rows are skipped, as in compas_cra
+    aeq_keep = numpy.flatnonzero(numpy.diff(aeq_b.indptr))
+    aeq_k = aeq_b[aeq_keep]
+    m_eq = aeq_k.shape[0]
+    m_fr = afr_b.shape[0]
+
+    m = m_eq + m_fr + 3 * V + V + V + V + 3 * V
+    o_fr = m_eq
+    o_db = o_fr + m_fr
+    o_ct = o_db + 3 * V
+    o_np = o_ct + V
+    o_pm = o_np + V
+    o_ft = o_pm + V
+
+    g_l = numpy.empty(m)
+    g_u = numpy.empty(m)
+    g_l[:m_eq] = g_u[:m_eq] = -p[aeq_keep]
+    g_l[o_fr:o_db] = -INF
+    g_u[o_fr:o_db] = 0.0
+    g_l[o_db:o_ct] = -d_bnd
+    g_u[o_db:o_ct] = d_bnd
+    # fn+ (dn + eps) = 0
+    g_l[o_ct:o_np] = g_u[o_ct:o_np] = 0.0
+    # dn >= -eps
+    g_l[o_np:o_pm] = -eps
+    g_u[o_np:o_pm] = INF
+    # fn+ fn- = 0
+    g_l[o_pm:o_ft] = g_u[o_pm:o_ft] = 0.0
+    # Kf f + alpha (Kd B q) = 0
+    g_l[o_ft:] = g_u[o_ft:] = 0.0
+
+    aeq_coo = aeq_k.tocoo()
+    afr_coo = afr_b.tocoo()
+    b_coo = B.tocoo()
+    bn_coo = Bn.tocoo()
+    kf_coo = Kf.tocoo()
+    kb_coo = KB.tocoo()
+
+    fnp_idx = of + 4 * numpy.arange(V)
+    fnm_idx = fnp_idx + 1
+    alpha_rep = numpy.arange(3 * V) // 3
+    vertices = numpy.arange(V)
+
+    # the constant entries of the jacobian, followed by those that depend on the variables
+    jac_rows = numpy.concatenate(
+        [
+            aeq_coo.row,
+            o_fr + afr_coo.row,
+            o_db + b_coo.row,
+            o_np + bn_coo.row,
+            o_ft + kf_coo.row,
+            o_ct + vertices,
+            o_ct + bn_coo.row,
+            o_pm + vertices,
+            o_pm + vertices,
+            o_ft + kb_coo.row,
+            o_ft + numpy.arange(3 * V),
+        ]
+    )
+    jac_cols = numpy.concatenate(
+        [
+            of + aeq_coo.col,
+            of + afr_coo.col,
+            oq + b_coo.col,
+            oq + bn_coo.col,
+            of + kf_coo.col,
+            fnp_idx,
+            oq + bn_coo.col,
+            fnp_idx,
+            fnm_idx,
+            oq + kb_coo.col,
+            oa + alpha_rep,
+        ]
+    )
+    const_values = numpy.concatenate([aeq_coo.data, afr_coo.data, b_coo.data, bn_coo.data, kf_coo.data])
+
+    def split(x):
+        return x[of:oq], x[oq:oa], x[oa:]
+
+    def objective(x):
+        f, _, alpha = split(x)
+        return float(weights @ (f * f) + alpha @ alpha)
+
+    def gradient(x):
+        f, _, alpha = split(x)
+        grad = numpy.zeros(n)
+        grad[of:oq] = 2.0 * weights * f
+        grad[oa:] = 2.0 * alpha
+        return grad
+
+    def constraints(x):
+        f, q, alpha = split(x)
+        d = B @ q
+        dn = d[0::3]
+        fnp = f[0::4]
+        fnm = f[1::4]
+        g = numpy.empty(m)
+        g[:m_eq] = aeq_k @ f
+        g[o_fr:o_db] = afr_b @ f
+        g[o_db:o_ct] = d
+        g[o_ct:o_np] = fnp * (dn + eps)
+        g[o_np:o_pm] = dn
+        g[o_pm:o_ft] = fnp * fnm
+        g[o_ft:] = Kf @ f + alpha[alpha_rep] * (KB @ q)
+        return g
+
+    def jacobian(x):
+        f, q, alpha = split(x)
+        dn = Bn @ q
+        fnp = f[0::4]
+        fnm = f[1::4]
+        return numpy.concatenate(
+            [
+                const_values,
+                dn + eps,
+                fnp[bn_coo.row] * bn_coo.data,
+                fnm,
+                fnp,
+                alpha[alpha_rep][kb_coo.row] * kb_coo.data,
+                KB @ q,
+            ]
+        )
+
+    # the lower triangle of the hessian of the lagrangian, with the duplicate entries of the friction alignment merged
+    kb_pair = (kb_coo.row // 3).astype(numpy.int64) * nq + kb_coo.col
+    kb_unique, kb_inverse = numpy.unique(kb_pair, return_inverse=True)
+    w_nz = numpy.flatnonzero(weights)
+
+    hess_rows = numpy.concatenate([of + w_nz, oa + vertices, oq + bn_coo.col, fnm_idx, oa + kb_unique // nq])
+    hess_cols = numpy.concatenate([of + w_nz, oa + vertices, fnp_idx[bn_coo.row], fnp_idx, oq + kb_unique % nq])
+
+    def hessian(x, sigma, lam):
+        lam_ct = lam[o_ct:o_np]
+        lam_pm = lam[o_pm:o_ft]
+        lam_ft = lam[o_ft:]
+        ftdt = numpy.bincount(kb_inverse, weights=lam_ft[kb_coo.row] * kb_coo.data, minlength=len(kb_unique))
+        return numpy.concatenate(
+            [
+                2.0 * sigma * weights[w_nz],
+                numpy.full(V, 2.0 * sigma),
+                lam_ct[bn_coo.row] * bn_coo.data,
+                lam_pm,
+                ftdt,
+            ]
+        )
+
+    problem = NLPProblem(
+        n=n,
+        x_l=x_l,
+        x_u=x_u,
+        g_l=g_l,
+        g_u=g_u,
+        x0=x0,
+        objective=objective,
+        gradient=gradient,
+        constraints=constraints,
+        jac_rows=jac_rows,
+        jac_cols=jac_cols,
+        jacobian=jacobian,
+        hess_rows=hess_rows,
+        hess_cols=hess_cols,
+        hessian=hessian,
+    )
+    layout = {"nv": V, "nfree": F, "f": slice(of, oq), "q": slice(oq, oa), "alpha": slice(oa, n)}
+    return problem, layout
+
+
+class CRAState(NamedTuple):
+    """The solution of a CRA penalty problem, from which later solves of the same contacts can start.
+
+    Attributes
+    ----------
+    forces : numpy.ndarray
+        The (V, 4) compression, tension and tangential forces ``[fn+, fn-, fu, fv]`` of the contact vertices.
+    displacements : numpy.ndarray
+        The (N, 6) virtual displacements of the blocks, zero for supported blocks.
+    alpha : numpy.ndarray
+        The (V,) factors relating the tangential forces to the tangential displacements of the vertices.
+    active : numpy.ndarray
+        The (V,) boolean mask of the vertices in compression.
+    iterations : int
+        The number of iterations of the solver.
+    supports : numpy.ndarray
+        The (N,) boolean mask of the supported blocks of the solved scenario.
+
+    """
+
+    forces: numpy.ndarray
+    displacements: numpy.ndarray
+    alpha: numpy.ndarray
+    active: numpy.ndarray
+    iterations: int
+    supports: numpy.ndarray
+
+
+class CRAPenalty:
+    """The CRA penalty problem of a contact system, for solving scenarios of supports and loads on the same contacts.
+
+    The equilibrium matrices of all blocks, the friction cones and the tangential maps are assembled once.
+    A scenario only selects the rows and columns of its free blocks,
+    and computes the self-weight with its densities.
+
+    Parameters
+    ----------
+    system : :class:`ContactSystem`
+        The contact vertices and blocks.
+    mu : float, optional
+        The friction coefficient.
+    d_bnd : float, optional
+        The bound of the virtual displacements.
+    eps : float, optional
+        The tolerance of the contact penetration.
+
+    Notes
+    -----
+    The IPOPT binding of compas_cra does not keep the factorization of the linear solver between solves.
+    What is reused here is everything in front of it:
+    the assembled matrices, and the sparsity of the Jacobian and Hessian for a given set of supports.
+    A solve can start from the state of an earlier solve with the same supports,
+    with the forces of all vertices and the displacements of the blocks.
+    The options of the solver are the same as for a solve from scratch.
+    With small changes of the loads, the solver then needs fewer iterations,
+    but with larger changes it can also need more, and it can stop at a slightly different solution.
+    A state of other supports is not used, since starting from it is often much slower than a solve from scratch.
+    :data:`WARM_START_OPTIONS` can be passed as options to keep the solver closer to the starting point.
+
+    Examples
+    --------
+    >>> cra = CRAPenalty(ContactSystem.from_model(model))
+    >>> state = cra.solve()
+    >>> scaled = cra.solve(density=1.5, state=state)
+
+    """
+
+    def __init__(self, system: ContactSystem, mu: float = 0.84, d_bnd: float = 1e-3, eps: float = 1e-4) -> None:
+        self.system = system
+        self.mu = mu
+        self.d_bnd = d_bnd
+        self.eps = eps
+
+        blocks = numpy.arange(len(system.centers))
+        count = len(system.points)
+        self.aeq = equilibrium_matrix(system, penalty=False, free=blocks)
+        self.aeq_b = equilibrium_matrix(system, penalty=True, free=blocks)
+        self.afr_b = friction_matrix(count, mu, penalty=True)
+        self.Kf = tangent_map(system, shift=4)
+        self.KB = (tangent_map(system, shift=3) @ self.aeq.T).tocsr()
+        self.weights = _tilde_weights(count, w_comp=1e0, w_tens=1e6, w_fric=1e0)
+
+    def problem(
+        self,
+        supports: Optional[numpy.ndarray] = None,
+        density: Union[float, numpy.ndarray] = 1.0,
+        state: Optional[CRAState] = None,
+    ) -> tuple[NLPProblem, dict]:
+        """Build the problem of a scenario.
+
+        Parameters
+        ----------
+        supports : numpy.ndarray, optional
+            The (N,) boolean mask of the supported blocks.
+            Default is the supports of the system.
+        density : float | numpy.ndarray, optional
+            The density of all blocks, or the (N,) densities per block.
+        state : :class:`CRAState`, optional
+            The solution from which the solver starts.
+            A solution of other supports is not used.
+
+        Returns
+        -------
+        tuple[:class:`compas_cra.nlp.NLPProblem`, dict]
+            The problem, and the free blocks ``"free"``, the supported blocks ``"supports"``,
+            whether it starts from the state ``"warm"``, and the slices of the forces ``"f"``,
+            displacements ``"q"`` and ``"alpha"`` in its variables.
+
+        Raises
+        ------
+        ValueError
+            If there are no contacts or no free blocks.
+
+        """
+        supports = self.system.supports if supports is None else numpy.asarray(supports, dtype=bool)
+        free = numpy.flatnonzero(~supports)
+        if not len(self.system.points) or not len(free):
+            raise ValueError("The model has no contacts or no free blocks.")
+
+        rows = (6 * free[:, None] + numpy.arange(6)).ravel()
+        x0 = None
+        if state is not None:
+            if state.forces.shape != (len(self.system.points), 4):
+                raise ValueError("The state is not a solution of the contacts of this system.")
+            if numpy.array_equal(state.supports, supports):
+                x0 = numpy.concatenate([state.forces.ravel(), state.displacements[free].ravel(), state.alpha])
+
+        problem, layout = _penalty_problem(
+            self.aeq[rows],
+            self.aeq_b[rows],
+            self.afr_b,
+            external_forces(self.system, density, free=free),
+            self.Kf,
+            self.KB[:, rows],
+            self.weights,
+            self.d_bnd,
+            self.eps,
+            x0=x0,
+        )
+        layout["free"] = free
+        layout["supports"] = supports
+        layout["warm"] = x0 is not None
+        return problem, layout
+
+    def solve(
+        self,
+        supports: Optional[numpy.ndarray] = None,
+        density: Union[float, numpy.ndarray] = 1.0,
+        state: Optional[CRAState] = None,
+        options: Optional[dict] = None,
+        verbose: bool = False,
+    ) -> CRAState:
+        """Solve a scenario.
+
+        Parameters
+        ----------
+        supports : numpy.ndarray, optional
+            The (N,) boolean mask of the supported blocks.
+            Default is the supports of the system.
+        density : float | numpy.ndarray, optional
+            The density of all blocks, or the (N,) densities per block.
+        state : :class:`CRAState`, optional
+            The solution of an earlier scenario with the same supports, from which the solver starts.
+            A solution of other supports is not used.
+        options : dict, optional
+            Additional IPOPT options, for example :data:`WARM_START_OPTIONS` with a state.
+        verbose : bool, optional
+            If True, print the output of the solver.
+
+        Returns
+        -------
+        :class:`CRAState`
+
+        Raises
+        ------
+        ValueError
+            If the solver fails.
+
+        """
+        problem, layout = self.problem(supports=supports, density=density, state=state)
+        settings = {**CRA_PENALTY_OPTIONS, **(options or {})}
+        result = solve_nlp(problem, backend="native", options=settings, verbose=verbose)
+        if not result.success:
+            raise ValueError(f"The CRA penalty solve failed: {result.status} ({result.status_message}).")
+
+        forces = result.x[layout["f"]].reshape(-1, 4)
+        displacements = numpy.zeros((len(self.system.centers), 6))
+        displacements[layout["free"]] = result.x[layout["q"]].reshape(-1, 6)
+        active = forces[:, 0] > 1e-6 * max(forces[:, 0].max(), 1e-12)
+        return CRAState(forces, displacements, result.x[layout["alpha"]], active, result.iterations or 0, layout["supports"])
+
+    def solve_scenarios(
+        self,
+        scenarios: list[tuple[Optional[numpy.ndarray], Union[float, numpy.ndarray]]],
+        state: Optional[CRAState] = None,
+        options: Optional[dict] = None,
+        warm_start: bool = False,
+    ) -> list[CRAState]:
+        """Solve a sequence of scenarios.
+
+        Parameters
+        ----------
+        scenarios : list[tuple[numpy.ndarray | None, float | numpy.ndarray]]
+            The supports and the densities of every scenario.
+            Supports that are None are the supports of the system.
+        state : :class:`CRAState`, optional
+            The solution from which the first scenario starts, if ``warm_start`` is True.
+        options : dict, optional
+            Additional IPOPT options.
+        warm_start : bool, optional
+            If True, every scenario starts from the solution of the previous scenario, if it has the same supports.
+            Otherwise, every scenario is solved from scratch.
+
+        Returns
+        -------
+        list[:class:`CRAState`]
+            The solutions of the scenarios.
+
+        Notes
+        -----
+        A warm start changes the number of iterations, which is lower for small changes of the loads,
+        but can be much higher for larger changes.
+        The solver then also stops at a slightly different solution, within its tolerances.
+
+        """
+        states = []
+        for supports, density in scenarios:
+            state = self.solve(supports=supports, density=density, state=state if warm_start else None, options=options)
+            states.append(state)
+        return states
+
+
+def cra_penalty_problem(
+    system: ContactSystem,
+    mu: float = 0.84,
+    density: Union[float, numpy.ndarray] = 1.0,
+    d_bnd: float = 1e-3,
+    eps: float = 1e-4,
+) -> tuple[NLPProblem, dict]:
+    """Build the CRA penalty problem of a contact system.
+
+    Parameters
+    ----------
+    system : :class:`ContactSystem`
+        The contact vertices and blocks.
+    mu : float, optional
+        The friction coefficient.
+    density : float | numpy.ndarray, optional
+        The density of all blocks, or the (N,) densities per block.
+    d_bnd : float, optional
+        The bound of the virtual displacements.
+    eps : float, optional
+        The tolerance of the contact penetration.
+
+    Returns
+    -------
+    tuple[:class:`compas_cra.nlp.NLPProblem`, dict]
+        The problem, and the free blocks ``"free"`` and the slices of the forces ``"f"``,
+        displacements ``"q"`` and ``"alpha"`` in its variables.
+
+    Raises
+    ------
+    ValueError
+        If there are no contacts or no free blocks.
+
+    Notes
+    -----
+    The problem is identical to that of ``compas_cra.equilibrium.cra_nlp.cra_penalty_problem``,
+    with the variables ``[f (4V), q (6F), alpha (V)]``.
+    Only the matrices are assembled differently,
+    with array operations over all vertices instead of loops over the contacts and their vertices.
+
+    """
+    return CRAPenalty(system, mu=mu, d_bnd=d_bnd, eps=eps).problem(density=density)
+
+
+def cra_penalty_solve(
+    model: Model,
+    mu: float = 0.84,
+    density: Union[float, numpy.ndarray] = 1.0,
+    d_bnd: float = 1e-3,
+    eps: float = 1e-4,
+    state: Optional[CRAState] = None,
+    verbose: bool = False,
+    options: Optional[dict] = None,
+) -> CRAState:
+    """Compute the contact forces of a block model with the CRA penalty formulation.
+
+    Parameters
+    ----------
+    model : :class:`compas_model.models.Model`
+        A model of block elements, with contacts on the edges of the interaction graph.
+        Elements with a true ``is_support`` attribute are supported.
+    mu : float, optional
+        The friction coefficient.
+    density : float | numpy.ndarray, optional
+        The density of all blocks, or the densities per block in the order of the graph nodes.
+    d_bnd : float, optional
+        The bound of the virtual displacements.
+    eps : float, optional
+        The tolerance of the contact penetration.
+    state : :class:`CRAState`, optional
+        The solution of an earlier solve of the same contacts and supports, from which the solver starts.
+    verbose : bool, optional
+        If True, print the output of the solver.
+    options : dict, optional
+        Additional IPOPT options.
+
+    Returns
+    -------
+    :class:`CRAState`
+        The solution.
+
+    Raises
+    ------
+    ValueError
+        If the solver fails.
+
+    Notes
+    -----
+    The solution is stored on the model with :meth:`ContactSystem.store`.
+
+    """
+    system = ContactSystem.from_model(model)
+    state = CRAPenalty(system, mu=mu, d_bnd=d_bnd, eps=eps).solve(density=density, state=state, options=options, verbose=verbose)
+    system.store(model, state)
+    return state
@@ -0,0 +1,7 @@
+import pathlib
+import sys
+
+# the packages of the examples are imported from their folders, like the scripts do
+root = pathlib.Path(__file__).parent.parent
+sys.path.append(str(root / "1_fofin"))
+sys.path.append(str(root / "2_masonry"))
@@ -0,0 +1,24 @@
+from compas.datastructures import Mesh
+from knitcandela.binary import dump_binary
+from knitcandela.binary import load_binary
+from knitcandela.binary import load_mesh_buffers
+
+
+def test_mesh_roundtrip_integer_coordinates(tmp_path):
+    mesh = Mesh.from_vertices_and_faces([[0, 0, 0], [1, 0, 0], [1, 1, 0.5], [0, 1, 0]], [[0, 1, 2, 3]])
+    filepath = tmp_path / "mesh.bin"
+    dump_binary(mesh, filepath)
+
+    buffer = load_mesh_buffers(filepath)[0]
+    assert buffer.xyz.tolist() == [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [1.0, 1.0, 0.5], [0.0, 1.0, 0.0]]
+    assert load_binary(filepath).__data__ == mesh.__data__
+
+
+def test_mesh_roundtrip_float_coordinates(tmp_path):
+    mesh = Mesh.from_vertices_and_faces([[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [1.0, 1.0, 0.5], [0.0, 1.0, 0.0]], [[0, 1, 2, 3]])
+    filepath = tmp_path / "mesh.bin"
+    dump_binary(mesh, filepath)
+
+    buffer = load_mesh_buffers(filepath)[0]
+    assert buffer.xyz.tolist() == [[0.0, 0.0, 0.0], [1.0, 0.0, 0.0], [1.0, 1.0, 0.5], [0.0, 1.0, 0.0]]
+    assert load_binary(filepath).__data__ == mesh.__data__
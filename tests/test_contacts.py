@@ -0,0 +1,51 @@
+import math
+
+import pytest
+from compas.datastructures import Mesh
+from compas.geometry import Box
+
+# dem needs the algorithms of compas_model 0.6
+dem = pytest.importorskip("dem", exc_type=ImportError)
+Element = pytest.importorskip("compas_model.elements").Element
+Model = pytest.importorskip("compas_model.models").Model
+
+
+class BoxElement(Element):
+    def __init__(self, box, **kwargs):
+        super().__init__(**kwargs)
+        self.box = box
+
+    def compute_elementgeometry(self, include_features=False):
+        return Mesh.from_shape(self.box)
+
+
+class CustomContactsElement(BoxElement):
+    def contacts(self, other, tolerance=1e-6, minimum_area=1e-2):
+        return ["custom"]
+
+
+def wall(cls):
+    model = Model()
+    box = Box.from_corner_corner_height([0, 0, 0], [1, 1, 0], 1)
+    for i in range(12):
+        block = box.copy()
+        block.translate([1.0 * (i % 3), 0, i // 3])
+        block.rotate(math.radians(2 * (-1) ** i), box.frame.zaxis, box.frame.point)
+        model.add_element((cls if i % 2 else BoxElement)(block))
+    return model
+
+
+def signature(model):
+    return sorted((tuple(sorted(edge)), [str(contact)[:6] for contact in model.graph.edge_attribute(edge, "contacts")]) for edge in model.graph.edges())
+
+
+@pytest.mark.parametrize("cls", [BoxElement, CustomContactsElement])
+def test_parallel_contacts_equal_serial(cls):
+    serial = wall(cls)
+    dem.compute_contacts(serial)
+    parallel = wall(cls)
+    dem.compute_contacts(parallel, processes=2)
+
+    assert signature(parallel) == signature(serial)
+    if cls is CustomContactsElement:
+        assert any(contacts == ["custom"] for _, contacts in signature(parallel))
@@ -0,0 +1,70 @@
+import math
+
+import numpy
+import pytest
+from compas.datastructures import Mesh
+from compas.geometry import Box
+
+# dem needs the algorithms of compas_model 0.6, and the solver of compas_cra
+dem = pytest.importorskip("dem", exc_type=ImportError)
+Element = pytest.importorskip("compas_model.elements").Element
+Model = pytest.importorskip("compas_model.models").Model
+
+
+class BoxElement(Element):
+    def __init__(self, box, **kwargs):
+        super().__init__(**kwargs)
+        self.box = box
+
+    def compute_elementgeometry(self, include_features=False):
+        return Mesh.from_shape(self.box)
+
+
+@pytest.fixture(scope="module")
+def cra():
+    model = Model()
+    box = Box.from_corner_corner_height([0, 0, 0], [1, 1, 0], 1)
+    for i in range(4):
+        block = box.copy()
+        block.translate([0.1 * (i % 2), 0.05 * (i % 3), i])
+        block.rotate(math.radians(5 * (-1) ** i), box.frame.zaxis, box.frame.point)
+        element = BoxElement(block)
+        element.is_support = i == 0
+        model.add_element(element)
+    dem.compute_contacts(model)
+    return dem.CRAPenalty(dem.ContactSystem.from_model(model))
+
+
+def supported(cra, block):
+    return numpy.arange(len(cra.system.centers)) == block
+
+
+@pytest.mark.parametrize("block", [1, 2])
+def test_state_of_other_supports_is_not_used(cra, block):
+    state = cra.solve()
+    cold = cra.solve(supports=supported(cra, block))
+    warm = cra.solve(supports=supported(cra, block), state=state)
+
+    assert warm.iterations == cold.iterations
+    assert numpy.allclose(warm.forces, cold.forces)
+    assert numpy.array_equal(warm.supports, supported(cra, block))
+
+
+def test_state_of_same_supports_is_used(cra):
+    state = cra.solve()
+    cold = cra.solve(density=1.01)
+    warm = cra.solve(density=1.01, state=state)
+
+    assert warm.iterations < cold.iterations
+    assert numpy.allclose(warm.forces, cold.forces, atol=1e-4 * numpy.abs(cold.forces).max())
+
+
+def test_solve_scenarios_with_support_toggles(cra):
+    scenarios = [(supported(cra, 0), 1.0), (supported(cra, 1), 1.0), (supported(cra, 0), 1.0), (supported(cra, 2), 1.0)]
+    cold = [cra.solve(supports=supports, density=density) for supports, density in scenarios]
+
+    for warm_start in (False, True):
+        states = cra.solve_scenarios(scenarios, warm_start=warm_start)
+        assert [state.iterations for state in states] == [state.iterations for state in cold]
+        for state, reference in zip(states, cold):
+            assert numpy.allclose(state.forces, reference.forces)
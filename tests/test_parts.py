@@ -0,0 +1,40 @@
+from compas_fea2.model import ElasticIsotropic
+from compas_fea2.model import Model
+from compas_fea2.model import SolidSection
+from compas_fea2.problem import LoadCombination
+from compas_fea2.problem import Problem
+from knitcandela.fea import load_cases
+from knitcandela.femesh import femesh_box
+from knitcandela.parts import ArrayPart
+
+
+def loaded_step():
+    part = ArrayPart.from_femesh(femesh_box((2, 1, 1), (4, 2, 2)), SolidSection(material=ElasticIsotropic(E=30000, v=0.2, density=2.35e-9)))
+    model = Model()
+    model.add_part(part)
+    problem = Problem(name="problem")
+    model.add_problem(problem=problem)
+    step = problem.add_static_step(name="step")
+    return part, step
+
+
+def test_node_views_as_pattern_nodes():
+    part, step = loaded_step()
+    step.add_node_pattern(part.node_views(), load_case="DL", z=-1000)
+
+    loads = load_cases(step, part)["DL"]
+    assert loads[:, 2].sum() == -1000 * len(part.xyz)
+    assert not part._node_objects
+
+
+def test_combination_after_pattern():
+    part, step = loaded_step()
+    views = part.node_views()
+    step.add_node_pattern(views, load_case="DL", z=-1000)
+    step.add_node_pattern(views[:2], load_case="LL", z=-500)
+    step.combination = LoadCombination.SLS()
+
+    assert views[0].total_load.z == -1500
+    assert views[-1].total_load.z == -1000
+    assert part.total_loads[:, 2].sum() == -1000 * len(part.xyz) - 1000
+    assert len(views[0].loads[step][step.combination]) == 2
@@ -0,0 +1,20 @@
+import numpy
+from knitcandela.results import ResultStore
+
+
+def test_write_field(tmp_path):
+    store = ResultStore(tmp_path)
+    store.write("step", "U", "part", numpy.arange(2), {"U1": [1.0, 2.0], "U2": [3.0, 4.0]})
+
+    field = store.field("step", "U")
+    assert field.keys.tolist() == [0, 1]
+    assert field.array(["U1", "U2"]).tolist() == [[1.0, 3.0], [2.0, 4.0]]
+
+
+def test_write_empty_field(tmp_path):
+    store = ResultStore(tmp_path)
+    store.write("step", "RF", "part", numpy.zeros(0, dtype=int), {"RF1": [], "RF2": []})
+
+    field = store.field("step", "RF")
+    assert len(field.keys) == 0
+    assert field.array(["RF1", "RF2"]).shape == (0, 2)